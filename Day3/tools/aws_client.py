@@ -0,0 +1,233 @@
+"""
+공용 AWS API 클라이언트 래퍼
+API별 토큰 버킷으로 호출 속도를 제한하고, 스로틀링/일시 오류는 지터 포함 지수 백오프로 재시도
+재시도를 모두 실패하면 0 대신 MetricUnavailable을 발생시켜 호출자가 "지표 없음"으로 처리하게 함
+같은 계정에서 여러 도구를 동시에 실행할 때는 AWS_API_SHARE(기본 0.25)로 계정 한도 중 이 프로세스 몫을 정함
+"""
+
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import (ClientError, ConnectionClosedError, ConnectTimeoutError,
+                                 EndpointConnectionError, ReadTimeoutError)
+
+THROTTLING_CODES = {
+    'Throttling', 'ThrottlingException', 'ThrottledException', 'RequestLimitExceeded',
+    'TooManyRequestsException', 'RequestThrottled', 'RequestThrottledException',
+    'ProvisionedThroughputExceededException', 'LimitExceededException', 'SlowDown'
+}
+TRANSIENT_ERRORS = (EndpointConnectionError, ConnectionClosedError, ReadTimeoutError, ConnectTimeoutError)
+
+# API별 계정 초당 호출 한도 (대략값) - 없으면 DEFAULT_RATE
+ACCOUNT_RATES = {
+    ('cloudwatch', 'GetMetricData'): 50,
+    ('cloudwatch', 'GetMetricStatistics'): 50,
+    ('logs', 'StartQuery'): 5,
+    ('logs', 'GetQueryResults'): 5,
+    ('logs', 'FilterLogEvents'): 10,
+    ('logs', 'GetLogEvents'): 10,
+    ('logs', 'DescribeLogGroups'): 5,
+    ('ecs', 'DescribeServices'): 20,
+    ('ecs', 'UpdateService'): 5,
+    ('ec2', 'DescribeInstances'): 20,
+    ('autoscaling', 'DescribeAutoScalingGroups'): 10,
+    ('autoscaling', 'SetDesiredCapacity'): 2,
+}
+DEFAULT_RATE = 10
+API_SHARE = float(os.environ.get('AWS_API_SHARE', '0.25'))
+
+
+class MetricUnavailable(Exception):
+    """재시도 후에도 스로틀링/일시 오류로 조회하지 못함 (0으로 대체하지 말 것)"""
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: Optional[float] = None, min_fraction: float = 0.1):
+        """
+        AIMD 토큰 버킷 - 스로틀링이면 속도를 절반으로, 성공하면 조금씩 원래 속도로 회복
+
+        Args:
+            rate: 초당 토큰 수 (최대 속도)
+            burst: 버킷 크기 (기본값: rate, 최소 1)
+            min_fraction: 스로틀링으로 줄일 수 있는 최저 속도 비율
+        """
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = rate * min_fraction
+        self.burst = max(1.0, burst if burst is not None else rate)
+        self.tokens = self.burst
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 1개를 얻을 때까지 대기"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def throttled(self):
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def succeeded(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+def is_throttling(error: ClientError) -> bool:
+    return error.response.get('Error', {}).get('Code') in THROTTLING_CODES
+
+
+def is_server_error(error: ClientError) -> bool:
+    return error.response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0) >= 500
+
+
+class ApiLimiter:
+    def __init__(self, share: float = API_SHARE, max_attempts: int = 5,
+                 base_backoff: float = 0.2, max_backoff: float = 5.0):
+        """
+        API 호출 제한기 (프로세스 전체 공유)
+
+        Args:
+            share: 계정 한도 중 이 프로세스가 쓸 비율
+            max_attempts: 스로틀링/일시 오류시 최대 시도 횟수
+            base_backoff, max_backoff: 지수 백오프 기준/상한 (초, full jitter)
+        """
+        self.share = share
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.buckets = {}
+        self.counters = {}
+        self.observers = []   # observer((service, operation), 지연, 'ok' | 'throttled' | 'error')
+        self.lock = threading.Lock()
+
+    def bucket(self, key: tuple) -> TokenBucket:
+        with self.lock:
+            if key not in self.buckets:
+                self.buckets[key] = TokenBucket(ACCOUNT_RATES.get(key, DEFAULT_RATE) * self.share)
+                self.counters[key] = {'calls': 0, 'errors': 0, 'throttles': 0, 'retries': 0,
+                                      'unavailable': 0, 'latency_total': 0.0, 'latency_max': 0.0}
+            return self.buckets[key]
+
+    def record(self, key: tuple, latency: float, **increments):
+        with self.lock:
+            counters = self.counters[key]
+            counters['calls'] += 1
+            counters['latency_total'] += latency
+            counters['latency_max'] = max(counters['latency_max'], latency)
+            for name, value in increments.items():
+                counters[name] += value
+        outcome = 'throttled' if increments.get('throttles') else 'error' if increments.get('errors') else 'ok'
+        for observer in self.observers:
+            observer(key, latency, outcome)
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+
+    def call(self, service_name: str, operation: str, method, **kwargs):
+        """
+        제한/재시도를 적용해 API 호출
+
+        Raises:
+            MetricUnavailable: 스로틀링/일시 오류로 max_attempts번 모두 실패
+            ClientError 등: 그 밖의 오류는 그대로 전달
+        """
+        key = (service_name, operation)
+        bucket = self.bucket(key)
+        last_error = None
+        for attempt in range(self.max_attempts):
+            bucket.acquire()
+            started = time.monotonic()
+            try:
+                result = method(**kwargs)
+            except ClientError as e:
+                latency = time.monotonic() - started
+                if is_throttling(e):
+                    bucket.throttled()
+                    self.record(key, latency, throttles=1)
+                else:
+                    self.record(key, latency, errors=1)
+                    if not is_server_error(e):
+                        raise
+                last_error = e
+            except TRANSIENT_ERRORS as e:
+                self.record(key, time.monotonic() - started, errors=1)
+                last_error = e
+            else:
+                bucket.succeeded()
+                self.record(key, time.monotonic() - started)
+                return result
+
+            if attempt + 1 < self.max_attempts:
+                with self.lock:
+                    self.counters[key]['retries'] += 1
+                time.sleep(self.backoff(attempt))
+
+        with self.lock:
+            self.counters[key]['unavailable'] += 1
+        raise MetricUnavailable(f"{service_name}:{operation} 조회 불가 ({last_error})") from last_error
+
+    def stats(self) -> Dict[tuple, Dict]:
+        with self.lock:
+            return {key: dict(counters) for key, counters in self.counters.items()}
+
+    def format_stats(self) -> str:
+        stats = self.stats()
+        calls = sum(c['calls'] for c in stats.values())
+        throttles = sum(c['throttles'] for c in stats.values())
+        retries = sum(c['retries'] for c in stats.values())
+        unavailable = sum(c['unavailable'] for c in stats.values())
+        latency = sum(c['latency_total'] for c in stats.values())
+        average_ms = latency / calls * 1000 if calls else 0
+        return (f"API {calls}회 / 스로틀 {throttles} / 재시도 {retries} / 조회 불가 {unavailable} "
+                f"/ 평균 {average_ms:.0f}ms")
+
+
+LIMITER = ApiLimiter()
+
+
+class ThrottledClient:
+    """boto3 클라이언트 래퍼 - API 메서드 호출은 LIMITER를 거치고 나머지 속성은 그대로 전달"""
+
+    def __init__(self, client, limiter: ApiLimiter = LIMITER):
+        self.client = client
+        self.limiter = limiter
+        self.service_name = client.meta.service_model.service_name
+        self.operations = client.meta.method_to_api_mapping
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        operation = self.operations.get(name)
+        if operation is None:
+            return attr
+
+        def call(**kwargs):
+            return self.limiter.call(self.service_name, operation, attr, **kwargs)
+        call.__name__ = name
+        return call
+
+
+def api_client(service_name: str, region_name: Optional[str] = None, limiter: ApiLimiter = LIMITER,
+               endpoint_url: Optional[str] = None):
+    """
+    제한/재시도가 적용된 boto3 클라이언트 생성
+
+    botocore 자체 재시도는 끄고 (LIMITER가 재시도하면서 버킷 속도를 조절) 같은 프로세스의
+    모든 클라이언트가 API별 버킷을 공유한다. endpoint_url은 DynamoDB Local 같은 로컬 에뮬레이터용.
+    """
+    client = boto3.client(service_name, region_name=region_name, endpoint_url=endpoint_url,
+                          config=Config(retries={'mode': 'standard', 'max_attempts': 1}))
+    return ThrottledClient(client, limiter)
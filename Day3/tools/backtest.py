@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+스케일링 정책 오프라인 리플레이/백테스트
+기록된 메트릭 타임라인을 오토스케일러 결정 로직에 실시간보다 훨씬 빠르게 흘려보내고
+태스크 수에 반응하는 가상 ECS 서비스로 스케일링 지연, SLO 위반 시간, 태스크-분을 계산
+"""
+
+import argparse
+import bisect
+import csv
+from typing import Dict, List, Optional
+
+from decision_journal import read_journal
+
+# 타임라인 한 행: timestamp(초), service, cpu(%), memory(%), p95(초), tasks
+# 선택 컬럼 load(태스크 단위 부하), base_latency(무부하 응답시간)가 있으면 그대로 사용
+NUMERIC_FIELDS = ('timestamp', 'cpu', 'memory', 'p95', 'tasks', 'load', 'base_latency')
+
+# 대기열 근사에서 사용하는 최대 사용률 (응답시간 발산 방지)
+MAX_UTILIZATION = 0.95
+
+
+def load_timeline(path: str) -> Dict[str, List[Dict]]:
+    """
+    CSV 또는 JSONL 타임라인 로드
+
+    결정 저널(decision_journal.py)도 그대로 읽음 - 로테이션된 .gz 파일을 포함해 시간순으로 합치고
+    틱 요약 등 서비스가 없는 레코드는 건너뜀
+
+    Returns:
+        {서비스 이름: 시간순 행 리스트}
+    """
+    if path.endswith(('.jsonl', '.jsonl.gz')):
+        rows = list(read_journal(path))
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+
+    timeline = {}
+    for row in rows:
+        # 저널의 틱/리더/변화점 레코드는 제외 (CSV 행은 type이 없음)
+        if 'service' not in row or row.get('type', 'decision') != 'decision':
+            continue
+        record = {'service': row['service']}
+        for field in NUMERIC_FIELDS:
+            if row.get(field) not in (None, ''):
+                record[field] = float(row[field])
+        timeline.setdefault(record['service'], []).append(record)
+
+    for records in timeline.values():
+        records.sort(key=lambda r: r['timestamp'])
+    return timeline
+
+
+def synthetic_step_timeline(services: List[str], stages: List[tuple], load_per_vu: float = 0.02,
+                            base_latency: float = 0.05, memory: float = 30.0) -> Dict[str, List[Dict]]:
+    """
+    stress.js와 같은 계단형 부하 타임라인 생성
+
+    Args:
+        services: 서비스 이름 리스트
+        stages: [(지속 시간(초), VU 수), ...]
+        load_per_vu: VU 1명이 만드는 부하 (태스크 1개 = 1.0)
+        base_latency: 무부하 응답시간 (초)
+        memory: 메모리 사용률 (%)
+    """
+    timeline = {}
+    for service_name in services:
+        records = []
+        t = 0
+        for duration, vus in stages:
+            for offset in range(0, duration, 60):
+                load = vus * load_per_vu
+                records.append({
+                    'service': service_name,
+                    'timestamp': float(t + offset),
+                    'load': load,
+                    'base_latency': base_latency,
+                    'memory': memory
+                })
+            t += duration
+        timeline[service_name] = records
+    return timeline
+
+
+class SimulatedService:
+    """태스크 수에 반응하는 가상 ECS 서비스 (시작 지연 포함)"""
+
+    def __init__(self, name: str, tasks: int, startup_delay: float):
+        self.name = name
+        self.running = tasks
+        self.desired = tasks
+        self.startup_delay = startup_delay
+        self.pending = []  # 준비 완료 시각 리스트
+
+    def set_desired(self, desired: int, now: float):
+        if desired > self.desired:
+            self.pending.extend([now + self.startup_delay] * (desired - self.desired))
+        elif desired < self.desired:
+            # 대기 중인 태스크부터 취소하고 나머지는 즉시 종료
+            remove = self.desired - desired
+            cancelled = min(remove, len(self.pending))
+            self.pending = sorted(self.pending)[:len(self.pending) - cancelled]
+            self.running -= remove - cancelled
+        self.desired = desired
+
+    def advance(self, now: float):
+        ready = [t for t in self.pending if t <= now]
+        if ready:
+            self.running += len(ready)
+            self.pending = [t for t in self.pending if t > now]
+
+    def observe(self, record: Dict) -> Dict[str, float]:
+        """기록된 부하를 현재 태스크 수에 맞게 환산한 CPU/메모리/응답시간"""
+        if 'load' in record:
+            load = record['load']
+        else:
+            load = record.get('cpu', 0) / 100 * max(1, record.get('tasks', 1))
+
+        if 'base_latency' in record:
+            base_latency = record['base_latency']
+        else:
+            recorded_util = min(MAX_UTILIZATION, record.get('cpu', 0) / 100)
+            base_latency = record.get('p95', 0) * (1 - recorded_util)
+
+        utilization = load / max(1, self.running)
+        latency = base_latency / (1 - min(MAX_UTILIZATION, utilization))
+        return {
+            'cpu': utilization * 100,
+            'memory': record.get('memory', 0),
+            'response_time': latency
+        }
+
+
+class Backtester:
+    def __init__(self, scaler, timeline: Dict[str, List[Dict]], tick_interval: float,
+                 startup_delay: float = 60.0, slo: Optional[Dict[str, float]] = None):
+        """
+        백테스터 초기화
+
+        Args:
+            scaler: offline=True로 생성한 오토스케일러 (decide_scaling 제공)
+            timeline: load_timeline/synthetic_step_timeline 결과
+            tick_interval: 오토스케일러 평가 주기 (초)
+            startup_delay: 태스크 시작 지연 (초)
+            slo: {서비스 이름: 응답시간 SLO(초)} (없으면 서비스 response_time_threshold)
+        """
+        self.scaler = scaler
+        self.timeline = {name: records for name, records in timeline.items() if name in scaler.services}
+        self.tick_interval = tick_interval
+        self.startup_delay = startup_delay
+        self.slo = slo or {}
+
+    @staticmethod
+    def record_at(records: List[Dict], times: List[float], t: float) -> Dict:
+        """t 시점의 기록 (직전 값 유지)"""
+        index = bisect.bisect_right(times, t) - 1
+        return records[max(0, index)]
+
+    def run(self) -> Dict[str, Dict]:
+        results = {}
+        for service_name, records in self.timeline.items():
+            results[service_name] = self.run_service(service_name, records)
+        return results
+
+    def run_service(self, service_name: str, records: List[Dict]) -> Dict:
+        service_config = self.scaler.services[service_name]
+        slo = self.slo.get(service_name, service_config['response_time_threshold'])
+        times = [record['timestamp'] for record in records]
+        start, end = times[0], times[-1] + 60
+
+        initial_tasks = int(records[0].get('tasks', service_config['min_tasks']))
+        service = SimulatedService(service_name, initial_tasks, self.startup_delay)
+        # 시뮬레이션 시작 시점 기준으로 쿨다운 초기화
+        service_config['last_scale_time'] = start - 3600
+        service_config['violation_count'] = 0
+
+        summary = {
+            'slo_violation_minutes': 0.0,
+            'task_minutes': 0.0,
+            'scale_ups': 0,
+            'scale_downs': 0,
+            'scaling_lags': [],
+            'max_tasks': initial_tasks
+        }
+        episode_start = None
+        episode_scaled = False
+
+        now = start
+        while now < end:
+            service.advance(now)
+            observed = service.observe(self.record_at(records, times, now))
+            violated = observed['response_time'] > slo
+
+            if violated and episode_start is None:
+                episode_start, episode_scaled = now, False
+            elif not violated and episode_start is not None:
+                if not episode_scaled:
+                    summary['scaling_lags'].append(now - episode_start)
+                episode_start = None
+
+            decision = self.scaler.decide_scaling(
+                service_name, service.desired, observed['cpu'], observed['response_time'], now
+            )
+            new_count = decision['new_count']
+            if new_count is not None:
+                new_count = max(service_config['min_tasks'], min(service_config['max_tasks'], new_count))
+                if new_count > service.desired:
+                    summary['scale_ups'] += 1
+                    if episode_start is not None and not episode_scaled:
+                        summary['scaling_lags'].append(now - episode_start)
+                        episode_scaled = True
+                elif new_count < service.desired:
+                    summary['scale_downs'] += 1
+                service.set_desired(new_count, now)
+                service_config['last_scale_time'] = now
+
+            if violated:
+                summary['slo_violation_minutes'] += self.tick_interval / 60
+            summary['task_minutes'] += service.running * self.tick_interval / 60
+            summary['max_tasks'] = max(summary['max_tasks'], service.running)
+            now += self.tick_interval
+
+        lags = summary.pop('scaling_lags')
+        summary['episodes'] = len(lags)
+        summary['mean_scaling_lag'] = sum(lags) / len(lags) if lags else 0.0
+        summary['max_scaling_lag'] = max(lags) if lags else 0.0
+        summary['simulated_minutes'] = (end - start) / 60
+        return summary
+
+
+def format_results(results: Dict[str, Dict]) -> str:
+    lines = []
+    for service_name, summary in results.items():
+        lines.append(
+            f"🎯 {service_name}: SLO 위반 {summary['slo_violation_minutes']:.1f}분 / "
+            f"태스크-분 {summary['task_minutes']:.0f} / "
+            f"스케일링 지연 평균 {summary['mean_scaling_lag']:.0f}초, 최대 {summary['max_scaling_lag']:.0f}초 "
+            f"(위반 {summary['episodes']}회) / 업 {summary['scale_ups']}회, 다운 {summary['scale_downs']}회, "
+            f"최대 {summary['max_tasks']}개"
+        )
+    return "\n".join(lines)
+
+
+def build_scaler(name: str, target_tracking: bool = False, cluster_name: str = 'apdev-ecs-cluster',
+                 config_path: Optional[str] = None):
+    """오프라인 오토스케일러 생성 (AWS 호출 없음, 서비스 설정은 레지스트리의 cluster_name 기준)"""
+    if name == 'smart':
+        from ecs_svc_scaling import SmartTrafficAutoscaler
+        return SmartTrafficAutoscaler(cluster_name=cluster_name, offline=True, target_tracking=target_tracking,
+                                      config_path=config_path), 15
+    from ecs_svc_test_scaling import DualMetricAutoscaler
+    return DualMetricAutoscaler(cluster_name=cluster_name, offline=True, target_tracking=target_tracking,
+                                config_path=config_path), 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='스케일링 정책 오프라인 백테스트')
+    parser.add_argument('--timeline', help='메트릭 타임라인 (CSV, JSONL 또는 결정 저널). 없으면 stress.js 계단형 부하 사용')
+    parser.add_argument('--scaler', choices=['smart', 'dual'], default='smart',
+                        help='리플레이할 오토스케일러 (기본값: smart)')
+    parser.add_argument('--startup-delay', type=float, default=60,
+                        help='태스크 시작 지연 (초, 기본값: 60)')
+    parser.add_argument('--tick', type=float, help='평가 주기 (초, 기본값: smart 15 / dual 1)')
+    parser.add_argument('--cluster', default='apdev-ecs-cluster', help='서비스 설정을 가져올 레지스트리 클러스터')
+    parser.add_argument('--config', help='서비스 레지스트리 설정 파일 (기본값: services.json)')
+    parser.add_argument('--target-tracking', action='store_true',
+                        help='고정 증감 대신 목표 추적(메트릭/목표 비율) 스텝 사용')
+    args = parser.parse_args()
+
+    scaler, default_tick = build_scaler(args.scaler, args.target_tracking, args.cluster, args.config)
+    if args.timeline:
+        timeline = load_timeline(args.timeline)
+    else:
+        stages = [(300, 30), (300, 70), (300, 500), (300, 100), (300, 10), (300, 2)]
+        timeline = synthetic_step_timeline(list(scaler.services.keys()), stages)
+
+    backtester = Backtester(scaler, timeline, args.tick or default_tick, args.startup_delay)
+    print(format_results(backtester.run()))
+
+
+if __name__ == "__main__":
+    main()
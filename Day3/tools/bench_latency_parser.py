@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+응답시간 로그 파서 벤치마크
+합성 GIN/JSON 로그로 기존 줄 단위 정규식 루프와 LatencyParser의 초당 처리 줄 수를 비교
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+from typing import Callable, List
+
+from latency_parser import LatencyParser
+
+
+def make_gin_lines(count: int, seed: int = 1) -> List[str]:
+    """합성 GIN 액세스 로그 생성"""
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(count):
+        latency_ms = rng.lognormvariate(3, 1)
+        if latency_ms < 1:
+            duration = f"{latency_ms * 1000:.1f}µs"
+        else:
+            duration = f"{latency_ms:.6f}ms"
+        lines.append(
+            f"[GIN] 2025/06/01 - 12:00:00 | 200 | {duration:>13} | "
+            f"10.0.{rng.randint(0, 255)}.{rng.randint(0, 255)} | GET      \"/v1/product?id={rng.randint(1, 9999)}\""
+        )
+    return lines
+
+
+def make_json_lines(count: int, seed: int = 2) -> List[str]:
+    """합성 JSON 애플리케이션 로그 생성"""
+    rng = random.Random(seed)
+    return [
+        json.dumps({
+            'time': '2025-06-01T12:00:00Z',
+            'level': 'info',
+            'method': 'GET',
+            'path': f'/v1/user?email=user{rng.randint(1, 9999)}@example.com',
+            'status': 200,
+            'latency': round(rng.lognormvariate(-3, 1), 6)
+        })
+        for _ in range(count)
+    ]
+
+
+def legacy_parse(messages: List[str]) -> List[float]:
+    """기존 SmartTrafficAutoscaler.get_average_response_time 파싱 루프"""
+    response_times = []
+    patterns = [
+        (r'(\d+(?:\.\d+)?)ms\b', 1000),
+        (r'"response_time"\s*:\s*(\d+(?:\.\d+)?)', 1000),
+        (r'"latency"\s*:\s*(\d+(?:\.\d+)?)', 1000),
+    ]
+    for log_message in messages:
+        try:
+            if log_message.strip().startswith('{'):
+                log_data = json.loads(log_message)
+                for key in ['latency', 'response_time', 'duration']:
+                    if key in log_data:
+                        time_value = float(log_data[key])
+                        if 0.001 <= time_value <= 10:
+                            response_times.append(time_value)
+                            break
+        except Exception:
+            pass
+        for pattern, divisor in patterns:
+            match = re.search(pattern, log_message, re.IGNORECASE)
+            if match:
+                time_seconds = float(match.group(1)) / divisor
+                if 0.001 <= time_seconds <= 10:
+                    response_times.append(time_seconds)
+                    break
+    return response_times
+
+
+def measure(fn: Callable[[List[str]], List[float]], lines: List[str], repeat: int) -> float:
+    """가장 빠른 반복의 초당 처리 줄 수"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(lines)
+        best = min(best, time.perf_counter() - started)
+    return len(lines) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='응답시간 로그 파서 벤치마크')
+    parser.add_argument('--lines', type=int, default=100000, help='형식별 합성 로그 줄 수 (기본값: 100000)')
+    parser.add_argument('--repeat', type=int, default=5, help='반복 횟수 (기본값: 5)')
+    args = parser.parse_args()
+
+    datasets = {
+        'GIN': make_gin_lines(args.lines),
+        'JSON': make_json_lines(args.lines),
+    }
+
+    print(f"📊 합성 로그 {args.lines:,}줄 x {args.repeat}회 반복 (최고 기록)")
+    print("-" * 60)
+    for name, lines in datasets.items():
+        latency_parser = LatencyParser()
+        legacy_rate = measure(legacy_parse, lines, args.repeat)
+        parser_rate = measure(lambda batch: latency_parser.parse_batch(batch, stream=name), lines, args.repeat)
+        print(f"{name:>5}: 기존 {legacy_rate:>12,.0f} lines/s | LatencyParser {parser_rate:>12,.0f} lines/s "
+              f"({parser_rate / legacy_rate:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+적응형 폴링 스케줄러 예산 점검
+샤드 크기별로 ecs_svc_scaling.py와 같은 설정의 AdaptivePollScheduler를 가상 시계로 1시간 돌려
+시간당 평가 틱 수를 출력하고, 틱이 한 번도 돌지 않는 샤드 크기가 있으면 실패 (종료 코드 1)
+"""
+
+import argparse
+import sys
+import time
+
+from poll_scheduler import AdaptivePollScheduler
+from service_registry import tick_api_calls, tick_budget
+
+TICK_INTERVAL = 15
+
+
+def simulate(service_count: int, seconds: float, pattern: str = 'gradual', load_ratio: float = 0.6) -> int:
+    """가상 시계로 seconds초 동안 실행한 평가 틱 수"""
+    names = [f"svc-{index}" for index in range(service_count)]
+    calls_per_tick = tick_api_calls(service_count)
+    scheduler = AdaptivePollScheduler(
+        names, floor=5, ceiling=60, default=TICK_INTERVAL,
+        calls_per_minute=tick_budget(calls_per_tick, TICK_INTERVAL), calls_per_tick=calls_per_tick
+    )
+    start = time.time()
+    now, ticks = start, 0
+    while now < start + seconds:
+        due = scheduler.due(now)
+        if due:
+            ticks += 1
+            for name in due:
+                scheduler.update(name, pattern, load_ratio, False, now)
+        now += max(0.1, scheduler.next_wakeup(now))
+    return ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description='적응형 폴링 스케줄러 예산 점검')
+    parser.add_argument('--services', type=int, nargs='+', default=[10, 100, 300, 450, 500, 600, 1000],
+                        help='점검할 샤드당 서비스 수')
+    parser.add_argument('--seconds', type=float, default=3600, help='가상 실행 시간 (초, 기본값: 3600)')
+    args = parser.parse_args()
+
+    stalled = []
+    for count in args.services:
+        calls_per_tick = tick_api_calls(count)
+        budget = tick_budget(calls_per_tick, TICK_INTERVAL)
+        normal = simulate(count, args.seconds)
+        hot = simulate(count, args.seconds, pattern='spike', load_ratio=0.9)
+        print(f"{count:>5}개 서비스: 틱당 API {calls_per_tick:>3}회 | 분당 예산 {budget:>5.0f} "
+              f"| 시간당 틱 보통 {normal:>4} / 급증 {hot:>4}")
+        if not normal or not hot:
+            stalled.append(count)
+
+    if stalled:
+        print(f"❌ 평가가 멈춘 샤드 크기: {', '.join(map(str, stalled))}")
+        sys.exit(1)
+    print("✅ 모든 샤드 크기에서 평가 틱 실행")
+
+
+if __name__ == "__main__":
+    main()
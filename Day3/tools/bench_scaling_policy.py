@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+스케일링 정책 코어 벤치마크
+무작위 상태 스냅샷으로 단건 decide()와 배치 decide_batch()의 초당 결정 수를 비교하고 결과 일치를 확인
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from scaling_policy import SPIKE_HOLD, DualMetricPolicy, SmartTrafficPolicy, classify_shift, classify_shift_batch
+
+
+def random_states(count: int, seed: int = 7):
+    """무작위 서비스 설정/상태 배열 생성"""
+    rng = np.random.default_rng(seed)
+    config = {
+        'response_time_threshold': rng.choice([0.3, 0.5], count),
+        'min_tasks': np.ones(count, dtype=int),
+        'max_tasks': np.full(count, 6),
+        'violation_threshold': rng.integers(1, 4, count)
+    }
+    state = {
+        'current_tasks': rng.integers(1, 7, count),
+        'cpu': rng.uniform(0, 120, count),
+        'response_time': rng.exponential(0.25, count),
+        'violation_count': rng.integers(0, 4, count),
+        'last_scale_time': rng.uniform(0, 600, count),
+        'now': np.full(count, 600.0),
+        'cpu_threshold': rng.choice([40, 90, 95], count),
+        'spike': rng.random(count) < 0.3
+    }
+    return config, state
+
+
+def row(arrays, index):
+    return {key: (value[index].item() if hasattr(value[index], 'item') else value[index])
+            for key, value in arrays.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='스케일링 정책 코어 벤치마크')
+    parser.add_argument('--decisions', type=int, default=1000000, help='배치 결정 수 (기본값: 1000000)')
+    parser.add_argument('--scalar', type=int, default=100000, help='단건 결정 수 (기본값: 100000)')
+    args = parser.parse_args()
+
+    policies = [SmartTrafficPolicy(90, 300), DualMetricPolicy(30, 180),
+                SmartTrafficPolicy(90, 300, target_tracking=True), DualMetricPolicy(30, 180, target_tracking=True)]
+    for policy in policies:
+        config, state = random_states(args.decisions)
+
+        started = time.perf_counter()
+        batch = policy.decide_batch(config, state)
+        batch_rate = args.decisions / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        mismatches = 0
+        for i in range(args.scalar):
+            single = policy.decide(row(config, i), row(state, i))
+            expected = single['new_count'] if single['new_count'] is not None else state['current_tasks'][i]
+            if expected != batch['new_count'][i] or single['violation_count'] != batch['violation_count'][i]:
+                mismatches += 1
+        scalar_rate = args.scalar / (time.perf_counter() - started)
+
+        label = f"{policy.name}{'+tt' if policy.target_tracking else ''}"
+        print(f"{label:>8}: decide() {scalar_rate:>12,.0f}/s | decide_batch() {batch_rate:>14,.0f}/s "
+              f"| 불일치 {mismatches}건")
+
+    # 패턴 분류 (변화점 감지 결과 기반)
+    rng = np.random.default_rng(11)
+    count = args.decisions // 10
+    sample_count = rng.integers(0, 20, count)
+    # 절반은 상승 변화점 없음 (NaN)
+    shift_age = np.where(rng.random(count) < 0.5, np.nan, rng.uniform(0, 2 * SPIKE_HOLD, count))
+    shift_confidence = rng.uniform(0, 1, count)
+    trending = rng.random(count) < 0.3
+    started = time.perf_counter()
+    patterns = classify_shift_batch(sample_count, shift_age, shift_confidence, trending, 40, 90)
+    batch_rate = count / (time.perf_counter() - started)
+    mismatches = 0
+    now = 10000.0
+    for i in range(min(count, args.scalar // 10)):
+        last_shift = None
+        if not np.isnan(shift_age[i]):
+            last_shift = {'direction': 'up', 'timestamp': now - shift_age[i], 'confidence': shift_confidence[i]}
+        pattern, confidence, threshold = classify_shift(int(sample_count[i]), last_shift,
+                                                        'up' if trending[i] else None, now, 40, 90)
+        if ((pattern == 'spike') != patterns['spike'][i] or (pattern != 'unknown') != patterns['known'][i]
+                or threshold != patterns['cpu_threshold'][i] or confidence != patterns['confidence'][i]):
+            mismatches += 1
+    print(f"패턴 분류: classify_shift_batch() {batch_rate:>12,.0f}/s | 불일치 {mismatches}건")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""
+태스크/인스턴스 용량 계획
+태스크 정의의 CPU/메모리 예약량과 컨테이너 인스턴스의 남은 용량으로 태스크를 빈 패킹하고
+태스크 증가 전에 ASG desired capacity를 먼저 올리며, 패킹상 필요 없는 빈 인스턴스는 반납
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# DescribeContainerInstances 요청당 최대 인스턴스 수
+MAX_INSTANCES_PER_REQUEST = 100
+
+
+def resource_value(resources: List[Dict], name: str) -> int:
+    """registeredResources/remainingResources에서 CPU/MEMORY 값 추출"""
+    for resource in resources:
+        if resource['name'] == name:
+            return resource.get('integerValue', 0)
+    return 0
+
+
+def task_reservation(task_definition: Dict) -> Tuple[int, int]:
+    """
+    태스크 정의의 (CPU 유닛, 메모리 MiB) 예약량
+
+    태스크 수준 값이 있으면 사용하고, 없으면 컨테이너별 cpu/memory(또는 memoryReservation) 합계
+    """
+    containers = task_definition.get('containerDefinitions', [])
+    cpu = int(task_definition.get('cpu') or sum(c.get('cpu', 0) for c in containers))
+    memory = int(task_definition.get('memory') or
+                 sum(c.get('memory') or c.get('memoryReservation', 0) for c in containers))
+    return cpu, memory
+
+
+def first_fit_decreasing(tasks: List[Tuple[int, int]], bins: List[List[int]]) -> List[Tuple[int, int]]:
+    """
+    큰 태스크부터 첫 번째로 들어가는 인스턴스에 배치 (bins의 남은 용량을 차감)
+
+    Args:
+        tasks: [(CPU, 메모리), ...]
+        bins: [[남은 CPU, 남은 메모리], ...] - 호출 후 배치 결과가 반영됨
+
+    Returns:
+        배치하지 못한 태스크 리스트
+    """
+    unplaced = []
+    for cpu, memory in sorted(tasks, reverse=True):
+        for free in bins:
+            if free[0] >= cpu and free[1] >= memory:
+                free[0] -= cpu
+                free[1] -= memory
+                break
+        else:
+            unplaced.append((cpu, memory))
+    return unplaced
+
+
+def instances_needed(tasks: List[Tuple[int, int]], capacity: Tuple[int, int]) -> int:
+    """빈 인스턴스(capacity) 몇 대면 tasks를 모두 배치할 수 있는지 계산"""
+    bins = []
+    for task in sorted(tasks, reverse=True):
+        if task[0] > capacity[0] or task[1] > capacity[1]:
+            continue  # 인스턴스 1대에도 안 들어가는 태스크는 인스턴스 추가로 해결 불가
+        if first_fit_decreasing([task], bins):
+            bins.append([capacity[0] - task[0], capacity[1] - task[1]])
+    return len(bins)
+
+
+class CapacityPlanner:
+    def __init__(self, ecs, autoscaling, cluster_name: str, asg_name: str,
+                 min_size: int = 1, max_size: int = 10, scale_in_cooldown: float = 300,
+                 refresh_interval: float = 30, scale_in: bool = True):
+        """
+        용량 계획기 초기화
+
+        Args:
+            ecs: boto3 ECS 클라이언트
+            autoscaling: boto3 Auto Scaling 클라이언트
+            cluster_name: ECS 클러스터 이름
+            asg_name: 컨테이너 인스턴스 ASG 이름
+            min_size, max_size: ASG desired capacity 범위
+            scale_in_cooldown: 인스턴스 확장/반납 후 빈 인스턴스 반납까지 최소 간격 (초)
+            refresh_interval: 인스턴스 용량 재조회 주기 (초)
+            scale_in: 빈 인스턴스 반납 여부 (샤드 워커는 클러스터당 1개만 True)
+        """
+        self.ecs = ecs
+        self.autoscaling = autoscaling
+        self.cluster_name = cluster_name
+        self.asg_name = asg_name
+        self.min_size = min_size
+        self.max_size = max_size
+        self.scale_in_cooldown = scale_in_cooldown
+        self.refresh_interval = refresh_interval
+        self.scale_in = scale_in
+
+        self.reservations = {}      # {태스크 정의 ARN: (CPU, 메모리)}
+        self.service_tasks = {}     # {서비스 이름: 태스크 정의 ARN}
+        self.instances = []         # ACTIVE 컨테이너 인스턴스 요약
+        self.pending_bins = []      # 요청했지만 아직 등록되지 않은 인스턴스의 남은 용량
+        self.asg_desired = None
+        self.last_scale_in = 0
+        self.updated_at = 0
+        self.lock = threading.Lock()
+
+    def set_task_definitions(self, task_definitions: Dict[str, str]):
+        """DescribeServices 스냅샷의 서비스별 태스크 정의 ARN 반영 (배포 후 예약량이 바뀌도록 틱마다)"""
+        with self.lock:
+            self.service_tasks.update(task_definitions)
+
+    def task_size(self, service_name: str) -> Optional[Tuple[int, int]]:
+        """
+        서비스 태스크 1개의 (CPU, 메모리) 예약량 (태스크 정의는 ARN별로 1회만 조회)
+
+        서비스→ARN은 set_task_definitions()로 틱마다 갱신하고, 모르는 서비스만 직접 조회
+        """
+        arn = self.service_tasks.get(service_name)
+        if arn is None:
+            response = self.ecs.describe_services(cluster=self.cluster_name, services=[service_name])
+            if not response['services']:
+                return None
+            arn = response['services'][0]['taskDefinition']
+            self.service_tasks[service_name] = arn
+
+        if arn not in self.reservations:
+            response = self.ecs.describe_task_definition(taskDefinition=arn)
+            self.reservations[arn] = task_reservation(response['taskDefinition'])
+        return self.reservations[arn]
+
+    def refresh(self) -> bool:
+        """컨테이너 인스턴스 남은 용량과 ASG desired capacity 조회"""
+        try:
+            arns = []
+            params = {'cluster': self.cluster_name, 'status': 'ACTIVE'}
+            while True:
+                response = self.ecs.list_container_instances(**params)
+                arns.extend(response['containerInstanceArns'])
+                if not response.get('nextToken'):
+                    break
+                params['nextToken'] = response['nextToken']
+
+            instances = []
+            for offset in range(0, len(arns), MAX_INSTANCES_PER_REQUEST):
+                response = self.ecs.describe_container_instances(
+                    cluster=self.cluster_name,
+                    containerInstances=arns[offset:offset + MAX_INSTANCES_PER_REQUEST]
+                )
+                for instance in response['containerInstances']:
+                    instances.append({
+                        'instance_id': instance['ec2InstanceId'],
+                        'registered': (resource_value(instance['registeredResources'], 'CPU'),
+                                       resource_value(instance['registeredResources'], 'MEMORY')),
+                        'remaining': (resource_value(instance['remainingResources'], 'CPU'),
+                                      resource_value(instance['remainingResources'], 'MEMORY')),
+                        'tasks': instance.get('runningTasksCount', 0) + instance.get('pendingTasksCount', 0)
+                    })
+
+            response = self.autoscaling.describe_auto_scaling_groups(AutoScalingGroupNames=[self.asg_name])
+            groups = response['AutoScalingGroups']
+        except Exception as e:
+            print(f"  ⚠️ 용량 정보 조회 실패: {e}", flush=True)
+            return False
+
+        with self.lock:
+            self.instances = instances
+            self.updated_at = time.time()
+            if groups:
+                self.asg_desired = groups[0]['DesiredCapacity']
+            capacity = self.instance_capacity()
+            pending = max(0, (self.asg_desired or 0) - len(instances)) if capacity else 0
+            self.pending_bins = [list(capacity) for _ in range(pending)]
+        return True
+
+    def instance_capacity(self) -> Optional[Tuple[int, int]]:
+        """새 인스턴스 1대의 용량 (현재 등록된 인스턴스 중 최대값 기준)"""
+        if not self.instances:
+            return None
+        return max(instance['registered'] for instance in self.instances)
+
+    def plan_scale_up(self, tasks: List[Tuple[int, int]]) -> int:
+        """
+        tasks를 추가로 배치하려면 인스턴스가 몇 대 더 필요한지 계산
+
+        이미 요청했지만 아직 클러스터에 등록되지 않은 인스턴스의 남은 용량도 사용
+        """
+        capacity = self.instance_capacity()
+        if capacity is None:
+            return 0
+
+        bins = [list(instance['remaining']) for instance in self.instances]
+        bins.extend([list(free) for free in self.pending_bins])
+        unplaced = first_fit_decreasing(tasks, bins)
+        return instances_needed(unplaced, capacity)
+
+    def ensure_capacity(self, service_name: str, current_count: int, desired_count: int) -> bool:
+        """
+        태스크 증가 전에 필요한 인스턴스를 먼저 요청
+
+        Returns:
+            ASG desired capacity를 올렸으면 True
+        """
+        if desired_count <= current_count:
+            return False
+        try:
+            size = self.task_size(service_name)
+        except Exception as e:
+            print(f"  ⚠️ {service_name} 태스크 예약량 조회 실패: {e}", flush=True)
+            return False
+        if size is None:
+            return False
+
+        with self.lock:
+            if self.asg_desired is None:
+                return False
+            tasks = [size] * (desired_count - current_count)
+            target = min(self.max_size, self.asg_desired + self.plan_scale_up(tasks))
+            if target <= self.asg_desired:
+                # 기존 용량에 배치됨 - 같은 틱의 다른 서비스가 중복 계산하지 않도록 예약
+                self.reserve(tasks)
+                return False
+            try:
+                self.autoscaling.set_desired_capacity(
+                    AutoScalingGroupName=self.asg_name,
+                    DesiredCapacity=target,
+                    HonorCooldown=False
+                )
+            except Exception as e:
+                print(f"  ⚠️ ASG 확장 실패: {e}", flush=True)
+                return False
+            print(f"  🖥️ 인스턴스 선확장: {self.asg_desired} → {target}대 ({service_name} {current_count}→{desired_count}개 태스크)", flush=True)
+            capacity = self.instance_capacity()
+            self.pending_bins.extend([list(capacity) for _ in range(target - self.asg_desired)])
+            self.reserve(tasks)
+            self.asg_desired = target
+            # 새 인스턴스가 태스크를 받기 전에 빈 인스턴스로 반납되지 않도록
+            self.last_scale_in = time.time()
+            return True
+
+    def reserve(self, tasks: List[Tuple[int, int]]):
+        """다음 refresh 전까지 배치 예정 태스크만큼 남은 용량 차감"""
+        bins = [list(instance['remaining']) for instance in self.instances]
+        first_fit_decreasing(tasks, bins + self.pending_bins)
+        for instance, free in zip(self.instances, bins):
+            if tuple(free) != instance['remaining']:
+                instance['remaining'] = tuple(free)
+                instance['tasks'] += 1  # 배치 예정 인스턴스는 반납 대상에서 제외
+
+    def release_idle(self, demand: List[Tuple[int, int]]) -> int:
+        """
+        패킹상 필요 없는 빈 인스턴스 반납
+
+        Args:
+            demand: 클러스터 전체 desired 태스크 예약량 리스트
+
+        Returns:
+            반납한 인스턴스 수
+        """
+        now = time.time()
+        with self.lock:
+            capacity = self.instance_capacity()
+            if capacity is None or now - self.last_scale_in < self.scale_in_cooldown:
+                return 0
+            if self.pending_bins:
+                return 0  # 요청한 인스턴스가 아직 등록 중 - 다른 워커가 배치할 태스크가 있을 수 있음
+
+            required = max(self.min_size, instances_needed(demand, capacity))
+            idle = [instance for instance in self.instances if instance['tasks'] == 0]
+            surplus = min(len(idle), len(self.instances) - required)
+            if surplus <= 0:
+                return 0
+
+            released = []
+            for instance in idle[:surplus]:
+                try:
+                    self.autoscaling.terminate_instance_in_auto_scaling_group(
+                        InstanceId=instance['instance_id'],
+                        ShouldDecrementDesiredCapacity=True
+                    )
+                    released.append(instance['instance_id'])
+                except Exception as e:
+                    print(f"  ⚠️ 인스턴스 반납 실패 {instance['instance_id']}: {e}", flush=True)
+
+            if released:
+                self.last_scale_in = now
+                self.instances = [instance for instance in self.instances if instance['instance_id'] not in released]
+                if self.asg_desired is not None:
+                    self.asg_desired -= len(released)
+                print(f"  🖥️ 빈 인스턴스 {len(released)}대 반납 (필요 {required}대)", flush=True)
+            return len(released)
+
+    def tick(self, desired_counts: Optional[Dict[str, int]] = None,
+             task_definitions: Optional[Dict[str, str]] = None):
+        """
+        틱마다 호출 - refresh_interval마다 용량을 다시 조회하고 빈 인스턴스 반납
+
+        Args:
+            desired_counts: 클러스터 전체 서비스별 desired 카운트
+                (샤드 워커처럼 일부 서비스만 알면 None - 인스턴스 사용량 기준으로 계산)
+            task_definitions: 서비스별 현재 태스크 정의 ARN (ClusterSnapshot.task_definitions())
+        """
+        if task_definitions:
+            self.set_task_definitions(task_definitions)
+        if time.time() - self.updated_at < self.refresh_interval:
+            return
+        if self.refresh() and self.scale_in:
+            demand = self.cluster_demand(desired_counts) if desired_counts is not None else self.usage_demand()
+            if demand is None:
+                # 수요를 과소평가한 채 반납하면 곧 태스크가 PENDING - 이번 틱은 반납하지 않음
+                print("  ⚠️ 태스크 예약량 조회 실패 - 이번 틱 빈 인스턴스 반납 생략", flush=True)
+                return
+            self.release_idle(demand)
+
+    def usage_demand(self) -> List[Tuple[int, int]]:
+        """
+        인스턴스별 사용량(등록 - 남은 용량)을 하나의 태스크로 본 수요
+
+        사용량을 나눌 수 없는 덩어리로 패킹하므로 실제 태스크 단위 패킹보다 인스턴스를 많이(안전하게) 잡음
+        """
+        with_usage = []
+        for instance in self.instances:
+            used = (instance['registered'][0] - instance['remaining'][0],
+                    instance['registered'][1] - instance['remaining'][1])
+            if used[0] > 0 or used[1] > 0:
+                with_usage.append(used)
+        return with_usage
+
+    def cluster_demand(self, desired_counts: Dict[str, int]) -> Optional[List[Tuple[int, int]]]:
+        """서비스별 desired 카운트를 태스크 예약량 리스트로 변환 (태스크가 있는 서비스 하나라도 조회 실패하면 None)"""
+        demand = []
+        for service_name, count in desired_counts.items():
+            if count <= 0:
+                continue
+            try:
+                size = self.task_size(service_name)
+            except Exception as e:
+                print(f"  ⚠️ {service_name} 태스크 예약량 조회 실패: {e}", flush=True)
+                return None
+            if size is None:
+                return None
+            demand.extend([size] * count)
+        return demand
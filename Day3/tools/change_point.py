@@ -0,0 +1,222 @@
+"""
+온라인 변화점 감지 (양측 CUSUM)
+시계열마다 기준 수준(EWMA 평균/분산)과 상승/하강 누적합만 유지하므로 샘플 수와 무관한 고정 크기 상태
+표준화 잔차 z = (값 - 기준) / σ 중 허용 편차 k를 넘는 부분을 누적하다 임계값 h를 넘으면 수준 변화 이벤트 발생
+
+    - 변화 시작 추정: 누적합이 마지막으로 0이었던 직후 샘플 시각 → 감지 지연 = 감지 시각 - 변화 시작
+    - 새 수준 추정: 변화 구간 샘플 평균
+    - 신뢰도: 1 - (변화 구간 길이 / 도달한 누적합의 오경보 평균 간격(Siegmund 근사))
+    - z는 ±z_clip으로 자르므로 샘플 1개짜리 이상치로는 감지하지 않음 (기본값에서 최소 2개 연속)
+    - σ 하한 (min_std, 평균의 relative_std 비율, count_data면 √평균) - 트래픽이 적을 때 작은 흔들림에 반응하지 않음
+
+이벤트는 딕셔너리로 구독자(listener(event))에게 전달하고 update()도 반환
+"""
+
+import math
+import threading
+from typing import Callable, Dict, List, Optional
+
+
+def false_alarm_interval(score: float, drift: float) -> float:
+    """변화가 없을 때 누적합이 score를 넘기까지 평균 샘플 수 (Siegmund 근사)"""
+    if drift <= 0:
+        return math.inf
+    b = 2 * drift * (score + 1.166)
+    return (math.exp(b) - b - 1) / (2 * drift * drift)
+
+
+class SeriesState:
+    """시계열 1개의 CUSUM 상태 (고정 크기)"""
+
+    __slots__ = ('count', 'mean', 'var', 'up', 'down', 'up_count', 'down_count',
+                 'up_start', 'down_start', 'up_sum', 'down_sum', 'last_shift')
+
+    def __init__(self):
+        self.count = 0            # 워밍업 샘플 수 (warmup 이후엔 그대로)
+        self.mean = 0.0
+        self.var = 0.0            # 워밍업 중에는 편차 제곱합
+        self.up = 0.0             # 상승 누적합
+        self.down = 0.0           # 하강 누적합
+        self.up_count = 0         # 누적합이 0보다 큰 채로 이어진 샘플 수
+        self.down_count = 0
+        self.up_start = 0.0       # 해당 구간 첫 샘플 시각
+        self.down_start = 0.0
+        self.up_sum = 0.0         # 해당 구간 값 합 (새 수준 추정용)
+        self.down_sum = 0.0
+        self.last_shift = None    # 마지막 이벤트
+
+
+class ChangePointDetector:
+    def __init__(self, metric: str, drift: float = 0.5, threshold: float = 5.0, warmup: int = 5,
+                 alpha: float = 0.05, z_clip: float = 4.0, min_std: float = 1.0, relative_std: float = 0.05,
+                 count_data: bool = False):
+        """
+        변화점 감지기 초기화
+
+        Args:
+            metric: 이벤트에 붙일 메트릭 이름 (예: 'cpu', 'requests')
+            drift: 허용 편차 k (σ 단위) - 이보다 작은 변화는 누적하지 않음
+            threshold: 감지 임계값 h (σ 단위 누적합)
+            warmup: 기준 수준을 잡기 위해 감지 없이 받을 샘플 수
+            alpha: 기준 평균/분산 EWMA 가중치 (작을수록 기준이 천천히 따라감)
+            z_clip: 샘플 1개가 누적합에 더할 수 있는 최대 z
+            min_std: σ 절대 하한
+            relative_std: σ 하한 (기준 평균 대비 비율)
+            count_data: 요청 수 같은 카운트 데이터면 σ 하한에 √평균 (포아송 잡음) 적용
+        """
+        self.metric = metric
+        self.drift = drift
+        self.threshold = threshold
+        self.warmup = max(2, warmup)
+        self.alpha = alpha
+        self.z_clip = z_clip
+        self.min_std = min_std
+        self.relative_std = relative_std
+        self.count_data = count_data
+        self.series: Dict[str, SeriesState] = {}
+        self.listeners: List[Callable[[Dict], None]] = []
+        self.lock = threading.Lock()
+
+    def subscribe(self, listener: Callable[[Dict], None]):
+        self.listeners.append(listener)
+
+    def state(self, series: str) -> SeriesState:
+        state = self.series.get(series)
+        if state is None:
+            with self.lock:
+                state = self.series.setdefault(series, SeriesState())
+        return state
+
+    def reset(self, series: str):
+        self.series.pop(series, None)
+
+    def sigma(self, state: SeriesState) -> float:
+        sigma = max(math.sqrt(state.var), self.min_std, self.relative_std * abs(state.mean))
+        if self.count_data:
+            sigma = max(sigma, math.sqrt(abs(state.mean)))
+        return sigma
+
+    def update(self, series: str, timestamp: float, value: Optional[float], notify: bool = True) -> Optional[Dict]:
+        """
+        샘플 1개 반영 (O(1))
+
+        Args:
+            series: 시계열 키 (서비스/타겟 그룹 이름)
+            timestamp: 샘플 시각 (epoch 초)
+            value: 값 (None/NaN이면 무시)
+            notify: False면 구독자에게 알리지 않음 (히스토리 재생용)
+
+        Returns:
+            수준 변화를 감지했으면 이벤트, 아니면 None
+        """
+        if value is None or math.isnan(value):
+            return None
+        state = self.state(series)
+
+        if state.count < self.warmup:
+            # 워밍업: Welford로 기준 평균/분산 추정
+            state.count += 1
+            delta = value - state.mean
+            state.mean += delta / state.count
+            state.var += delta * (value - state.mean)
+            if state.count == self.warmup:
+                state.var /= state.count - 1
+            return None
+
+        sigma = self.sigma(state)
+        z = max(-self.z_clip, min(self.z_clip, (value - state.mean) / sigma))
+
+        up = state.up + z - self.drift
+        if up > 0:
+            if state.up == 0:
+                state.up_start, state.up_count, state.up_sum = timestamp, 0, 0.0
+            state.up, state.up_count, state.up_sum = up, state.up_count + 1, state.up_sum + value
+        else:
+            state.up, state.up_count = 0.0, 0
+
+        down = state.down - z - self.drift
+        if down > 0:
+            if state.down == 0:
+                state.down_start, state.down_count, state.down_sum = timestamp, 0, 0.0
+            state.down, state.down_count, state.down_sum = down, state.down_count + 1, state.down_sum + value
+        else:
+            state.down, state.down_count = 0.0, 0
+
+        event = None
+        if state.up > self.threshold:
+            event = self.level_shift(series, state, 'up', timestamp)
+        elif state.down > self.threshold:
+            event = self.level_shift(series, state, 'down', timestamp)
+        else:
+            # 기준은 잘린 편차로 천천히 갱신 (이상치 하나가 분산을 키우지 않도록)
+            deviation = z * sigma
+            state.mean += self.alpha * deviation
+            state.var = (1 - self.alpha) * (state.var + self.alpha * deviation * deviation)
+
+        if event is not None and notify:
+            for listener in self.listeners:
+                try:
+                    listener(event)
+                except Exception as e:
+                    print(f"⚠️ 변화점 이벤트 처리 실패: {e}", flush=True)
+        return event
+
+    def level_shift(self, series: str, state: SeriesState, direction: str, timestamp: float) -> Dict:
+        """이벤트 생성 후 새 수준을 기준으로 누적합 초기화"""
+        if direction == 'up':
+            score, samples, change_time, total = state.up, state.up_count, state.up_start, state.up_sum
+        else:
+            score, samples, change_time, total = state.down, state.down_count, state.down_start, state.down_sum
+
+        before = state.mean
+        after = total / samples
+        confidence = max(0.0, 1 - samples / false_alarm_interval(score, self.drift))
+
+        event = {
+            'metric': self.metric,
+            'series': series,
+            'direction': direction,
+            'timestamp': timestamp,
+            'change_time': change_time,
+            'latency': timestamp - change_time,
+            'samples': samples,
+            'before': before,
+            'after': after,
+            'magnitude': after - before,
+            'relative': (after - before) / before if before else None,
+            'confidence': confidence,
+            'score': score
+        }
+        state.mean = after
+        state.up = state.down = 0.0
+        state.up_count = state.down_count = 0
+        state.last_shift = event
+        return event
+
+    def last_shift(self, series: str) -> Optional[Dict]:
+        state = self.series.get(series)
+        return state.last_shift if state else None
+
+    def trend(self, series: str) -> Optional[str]:
+        """아직 감지 전이지만 누적합이 임계값 절반을 넘은 방향 ('up' | 'down' | None)"""
+        state = self.series.get(series)
+        if state is None:
+            return None
+        if state.up > self.threshold / 2:
+            return 'up'
+        if state.down > self.threshold / 2:
+            return 'down'
+        return None
+
+    def level(self, series: str) -> Optional[float]:
+        """현재 기준 수준 (워밍업 전이면 None)"""
+        state = self.series.get(series)
+        return state.mean if state and state.count >= self.warmup else None
+
+
+def format_shift(event: Dict) -> str:
+    """이벤트 한 줄 요약"""
+    arrow = '📈' if event['direction'] == 'up' else '📉'
+    relative = f" ({event['relative']:+.0%})" if event['relative'] is not None else ""
+    return (f"{arrow} {event['series']} {event['metric']} 수준 변화 {event['before']:.1f} → {event['after']:.1f}{relative}"
+            f" | 지연 {event['latency']:.0f}초 ({event['samples']}샘플), 신뢰도 {event['confidence']:.1%}")
@@ -0,0 +1,194 @@
+"""
+구조화된 스케일링 결정 저널
+평가마다 입력 메트릭/임계값/패턴/결정/API 지연을 한 줄짜리 JSON(JSONL)으로 남김
+기록은 큐에만 넣고 파일 쓰기/로테이션/gzip 압축은 백그라운드 스레드가 처리해 평가 루프가 디스크 I/O로 막히지 않음
+결정 레코드는 backtest.py 타임라인과 같은 필드(service, timestamp, cpu, memory, p95, tasks)를 써서 그대로 리플레이 가능
+"""
+
+import glob
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+MAX_BYTES = 10 * 1024 * 1024
+ROTATE_INTERVAL = 3600
+BACKUP_COUNT = 10
+
+
+def api_latency_delta(previous: Dict[tuple, Dict], current: Dict[tuple, Dict]) -> Dict[str, Dict]:
+    """
+    ApiLimiter.stats() 두 시점 사이의 API별 호출 수/평균 지연
+
+    Returns:
+        {'service:Operation': {'calls': 호출 수, 'avg_ms': 평균 지연, 'throttles': 스로틀 수}}
+    """
+    delta = {}
+    for key, counters in current.items():
+        before = previous.get(key, {})
+        calls = counters['calls'] - before.get('calls', 0)
+        if calls <= 0:
+            continue
+        latency = counters['latency_total'] - before.get('latency_total', 0.0)
+        delta[f"{key[0]}:{key[1]}"] = {
+            'calls': calls,
+            'avg_ms': round(latency / calls * 1000, 1),
+            'throttles': counters['throttles'] - before.get('throttles', 0)
+        }
+    return delta
+
+
+def rotated_files(path: str) -> List[str]:
+    """로테이션된 저널 파일 (오래된 순)"""
+    stem, suffix = os.path.splitext(path)
+    return sorted(glob.glob(f"{glob.escape(stem)}.*{suffix}") + glob.glob(f"{glob.escape(stem)}.*{suffix}.gz"))
+
+
+def read_journal(path: str, include_rotated: bool = True) -> Iterator[Dict]:
+    """
+    저널 레코드를 시간순으로 읽기 (로테이션된 .gz 파일 포함)
+
+    Args:
+        path: 현재 저널 파일 경로 (.gz 파일을 직접 지정해도 됨)
+        include_rotated: 로테이션된 이전 파일도 읽을지
+    """
+    paths = rotated_files(path) if include_rotated and not path.endswith('.gz') else []
+    if os.path.exists(path):
+        paths.append(path)
+    for file_path in paths:
+        opener = gzip.open if file_path.endswith('.gz') else open
+        with opener(file_path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # 종료 중 잘린 마지막 줄
+
+
+class DecisionJournal:
+    def __init__(self, path: str, max_bytes: int = MAX_BYTES, rotate_interval: float = ROTATE_INTERVAL,
+                 backup_count: int = BACKUP_COUNT, compress: bool = True, queue_size: int = 10000,
+                 flush_interval: float = 1.0):
+        """
+        저널 초기화 (백그라운드 쓰기 스레드 시작)
+
+        Args:
+            path: 저널 파일 경로 (JSONL)
+            max_bytes: 이 크기를 넘으면 로테이션
+            rotate_interval: 파일을 연 뒤 이 시간(초)이 지나면 로테이션 (0이면 크기 기준만)
+            backup_count: 보관할 로테이션 파일 수 (오래된 것부터 삭제)
+            compress: 로테이션된 파일을 gzip으로 압축할지
+            queue_size: 쓰기 대기 레코드 상한 (넘치면 버리고 dropped 증가)
+            flush_interval: 버퍼를 디스크로 내보내는 최대 간격 (초)
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
+        self.compress = compress
+        self.flush_interval = flush_interval
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.counters = {'written': 0, 'dropped': 0, 'rotations': 0, 'errors': 0}
+        self.file = None
+        self.size = 0
+        self.opened_at = 0
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self.writer_loop, name='journal', daemon=True)
+        self.thread.start()
+
+    def record(self, entry: Dict):
+        """레코드 추가 (대기 없음 - 큐가 가득 차면 버림)"""
+        entry.setdefault('timestamp', time.time())
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            self.counters['dropped'] += 1
+
+    def open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(self.path, 'a', encoding='utf-8')
+        self.size = self.file.tell()
+        self.opened_at = time.time()
+        if self.size > 0 and self.rotate_interval:
+            # 재시작시 이어 쓰는 파일은 마지막 수정 시각 기준으로 시간 로테이션
+            self.opened_at = min(self.opened_at, os.path.getmtime(self.path))
+
+    def should_rotate(self) -> bool:
+        if self.size >= self.max_bytes:
+            return True
+        # 빈 파일은 시간이 지나도 로테이션하지 않음
+        return bool(self.rotate_interval) and self.size > 0 and time.time() - self.opened_at >= self.rotate_interval
+
+    def rotate(self):
+        """현재 파일을 시각이 붙은 이름으로 옮기고 (압축) 오래된 파일 정리"""
+        self.file.close()
+        self.file = None
+        stem, suffix = os.path.splitext(self.path)
+        # 같은 초에 여러 번 로테이션해도 이름순 = 시간순이 되도록 일련번호를 붙임
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        sequence = 0
+        target = f"{stem}.{stamp}-{sequence:03d}{suffix}"
+        while os.path.exists(target) or os.path.exists(target + '.gz'):
+            sequence += 1
+            target = f"{stem}.{stamp}-{sequence:03d}{suffix}"
+        os.replace(self.path, target)
+
+        if self.compress:
+            with open(target, 'rb') as source, gzip.open(target + '.gz', 'wb') as compressed:
+                shutil.copyfileobj(source, compressed)
+            os.remove(target)
+
+        for old_path in rotated_files(self.path)[:-self.backup_count or None]:
+            os.remove(old_path)
+        self.counters['rotations'] += 1
+        self.open()
+
+    def writer_loop(self):
+        last_flush = time.monotonic()
+        while not (self.stopping.is_set() and self.queue.empty()):
+            try:
+                entry = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                entry = None
+
+            try:
+                if self.file is None:
+                    self.open()
+                if entry is not None:
+                    line = json.dumps(entry, separators=(',', ':'), ensure_ascii=False, default=str) + '\n'
+                    self.file.write(line)
+                    self.size += len(line.encode('utf-8'))
+                    self.counters['written'] += 1
+                if time.monotonic() - last_flush >= self.flush_interval or self.queue.empty():
+                    self.file.flush()
+                    last_flush = time.monotonic()
+                if self.should_rotate():
+                    self.rotate()
+            except Exception as e:
+                self.counters['errors'] += 1
+                print(f"  ⚠️ 결정 저널 쓰기 실패: {e}", flush=True)
+                time.sleep(self.flush_interval)
+
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def close(self, timeout: Optional[float] = 5):
+        """남은 레코드를 쓰고 스레드 종료"""
+        self.stopping.set()
+        self.thread.join(timeout)
+
+    def format_stats(self) -> str:
+        counters = self.counters
+        return (f"저널 {counters['written']}건 / 대기 {self.queue.qsize()} / 버림 {counters['dropped']} "
+                f"/ 로테이션 {counters['rotations']}")
@@ -1,15 +1,15 @@
 #!/usr/bin/env python3
 # ec2_running_count_loop.py
-import boto3
 import csv
 import time
 from datetime import datetime
 import sys
+from aws_client import api_client
 
 def get_running_instances_count(region='ap-northeast-2'):
-    """실행 중인 EC2 인스턴스 개수를 반환"""
+    """실행 중인 EC2 인스턴스 개수를 반환 (조회 실패시 None)"""
     try:
-        ec2 = boto3.client('ec2', region_name=region)
+        ec2 = api_client('ec2', region_name=region)
         
         response = ec2.describe_instances(
             Filters=[
@@ -29,7 +29,7 @@ def get_running_instances_count(region='ap-northeast-2'):
     
     except Exception as e:
         print(f"에러 발생: {e}")
-        return 0
+        return None
 
 def write_to_csv(filename, timestamp, region, count):
     """CSV 파일에 데이터 기록"""
@@ -70,6 +70,11 @@ def main():
             
             # 실행 중인 인스턴스 개수 조회
             running_count = get_running_instances_count(region)
+            if running_count is None:
+                # 조회 실패를 0개로 기록하지 않음
+                print(f"조회 실패: {timestamp} - 기록 건너뜀")
+                time.sleep(60)
+                continue
             
             # CSV에 기록
             write_to_csv(output_file, timestamp, region, running_count)
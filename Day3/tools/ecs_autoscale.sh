@@ -8,16 +8,40 @@ sleep 1
 mkdir -p /home/ec2-user/apdev/logs
 
 echo "🚀 오토스케일러 시작 (로그 로테이션 적용)"
-echo "📊 설정: 캐시 30초, 로그 쿼리 10초, AND 조건"
+echo "📊 설정: 메트릭 캐시 30초(만료시 백그라운드 갱신), 로그 쿼리 10초, AND 조건"
 echo "⚡ 임계값: 응답시간 0.5초 & CPU 85% & 메모리 80%"
-echo "💾 로그: /home/ec2-user/apdev/logs/autoscaler.log (10MB 로테이션)"
+echo "💾 로그: /home/ec2-user/apdev/autoscaler.log (콘솔 출력)"
+echo "📝 결정 저널: /home/ec2-user/apdev/logs/decisions-smart.jsonl (JSONL, 10MB/1시간 로테이션, gzip 10개 보관)"
+echo "♻️ 웜 스타트 상태: /home/ec2-user/apdev/logs/state-smart.bin (15초마다 원자적 저장, 재시작시 복원)"
 echo ""
 
-# 백그라운드 실행
-nohup python -u ecs_svc_scaling.py >> autoscaler.log 2>&1 &
+# 백그라운드 실행 - services.json의 클러스터마다 SHARDS개 워커 (예: SHARDS=4 ./ecs_autoscale.sh)
+# LEASE_TABLE을 지정하면 다른 호스트에서 같은 스크립트로 띄운 복제본과 리더 선출 (리더만 스케일링, 장애시 수 초 내 인계)
+SHARDS=${SHARDS:-1}
+LEASE_TABLE=${LEASE_TABLE:-}
+# TRIGGER_PORT를 지정하면 알람/SNS 푸시 트리거 활성화 (기본 로컬 전용)
+# 외부 주소(TRIGGER_HOST)로 바인딩하려면 TRIGGER_TOKEN 필수 - 환경변수로 전달되고 SNS 구독 URL에 ?token=...으로 포함
+TRIGGER_PORT=${TRIGGER_PORT:-}
+TRIGGER_HOST=${TRIGGER_HOST:-127.0.0.1}
+export TRIGGER_TOKEN
+# TARGET_TRACKING=1이면 고정 +1/+2 대신 메트릭/목표 비율로 증감량 계산 (기본 고정 증감)
+TARGET_TRACKING=${TARGET_TRACKING:-}
+CLUSTERS=$(python service_registry.py --clusters)
+WORKERS=$(( $(echo "$CLUSTERS" | wc -l) * SHARDS ))
+WORKER=0
+SCALER_PIDS=""
+for CLUSTER in $CLUSTERS; do
+    for SHARD in $(seq 0 $((SHARDS - 1))); do
+        nohup python -u ecs_svc_scaling.py --cluster "$CLUSTER" --shard "$SHARD/$SHARDS" \
+            --worker-index $WORKER --workers $WORKERS ${LEASE_TABLE:+--lease-table "$LEASE_TABLE"} \
+            ${TRIGGER_PORT:+--trigger-port "$TRIGGER_PORT" --trigger-host "$TRIGGER_HOST"} \
+            ${TARGET_TRACKING:+--target-tracking} >> autoscaler.log 2>&1 &
+        SCALER_PIDS="$SCALER_PIDS $!"
+        WORKER=$((WORKER + 1))
+    done
+done
 
-SCALER_PID=$!
-echo "✅ 오토스케일러 시작됨 (PID: $SCALER_PID)"
+echo "✅ 오토스케일러 시작됨 (워커 ${WORKERS}개, PID:${SCALER_PIDS})"
 echo ""
 echo "📋 명령어:"
 echo "  로그 보기: tail -f /home/ec2-user/apdev/autoscaler.log"
@@ -25,4 +49,13 @@ echo "  종료: pkill -f ecs_svc_scaling.py"
 echo "  상태 확인: ps aux | grep ecs_svc_scaling"
 echo ""
 echo "🔥 인스턴스: 최소 3개, 원하는 3개, 최대 10개"
+echo "🖥️ 용량 계획: 태스크 확장 전 인스턴스 선확장, 빈 인스턴스 반납"
+if [ -n "$LEASE_TABLE" ]; then
+    echo "👑 리더 선출: DynamoDB $LEASE_TABLE (리스 10초, 2초마다 갱신 - 대기 복제본은 평가만 계속)"
+fi
+if [ -n "$TRIGGER_PORT" ]; then
+    echo "📡 푸시 트리거: http://$TRIGGER_HOST:$TRIGGER_PORT/ (워커마다 +10)"
+fi
+echo "🧩 서비스 설정: services.json (클러스터/서비스/임계값, ECS 태그 검색) - python service_registry.py --shards N 으로 배치 확인"
 echo "📊 로그 확인: tail -f /home/ec2-user/apdev/autoscaler.log"
+echo "🔁 저널 리플레이: python backtest.py --timeline /home/ec2-user/apdev/logs/decisions-smart.jsonl"
@@ -0,0 +1,82 @@
+"""
+ECS 클러스터 스냅샷
+모니터링 대상 서비스의 desired/running/pending 카운트와 태스크 정의를 DescribeServices 일괄 호출로 조회
+"""
+
+import time
+from typing import Dict, List, Optional
+
+# DescribeServices 요청당 최대 서비스 수
+MAX_SERVICES_PER_REQUEST = 10
+
+
+class ClusterSnapshot:
+    def __init__(self, ecs, cluster_name: str, service_names: List[str]):
+        """
+        클러스터 스냅샷 초기화
+
+        Args:
+            ecs: boto3 ECS 클라이언트
+            cluster_name: ECS 클러스터 이름
+            service_names: 모니터링 서비스 이름 리스트
+        """
+        self.ecs = ecs
+        self.cluster_name = cluster_name
+        self.service_names = list(service_names)
+        self.services = {}
+        self.updated_at = None
+
+    def refresh(self) -> bool:
+        """
+        모든 서비스 상태를 다시 조회 (10개 단위 일괄 호출)
+
+        Returns:
+            성공 여부 (실패시 이전 스냅샷 유지)
+        """
+        services = {}
+        try:
+            for offset in range(0, len(self.service_names), MAX_SERVICES_PER_REQUEST):
+                response = self.ecs.describe_services(
+                    cluster=self.cluster_name,
+                    services=self.service_names[offset:offset + MAX_SERVICES_PER_REQUEST]
+                )
+                for service in response['services']:
+                    services[service['serviceName']] = self.to_counts(service)
+        except Exception as e:
+            print(f"  ⚠️ 서비스 스냅샷 조회 실패: {e}", flush=True)
+            return False
+
+        self.services = services
+        self.updated_at = time.time()
+        return True
+
+    @staticmethod
+    def to_counts(service: Dict) -> Dict:
+        """DescribeServices/UpdateService 응답의 서비스 객체에서 카운트/태스크 정의 추출"""
+        return {
+            'desired': service.get('desiredCount', 0),
+            'running': service.get('runningCount', 0),
+            'pending': service.get('pendingCount', 0),
+            'status': service.get('status', 'UNKNOWN'),
+            'task_definition': service.get('taskDefinition')
+        }
+
+    def update(self, service: Dict):
+        """UpdateService 응답으로 해당 서비스 스냅샷 즉시 갱신 (추가 API 호출 없음)"""
+        if service and 'serviceName' in service:
+            self.services[service['serviceName']] = self.to_counts(service)
+
+    def get(self, service_name: str) -> Optional[Dict]:
+        """서비스 카운트 조회 (스냅샷이 없으면 먼저 조회)"""
+        if self.updated_at is None:
+            self.refresh()
+        return self.services.get(service_name)
+
+    def desired_count(self, service_name: str) -> int:
+        service = self.get(service_name)
+        return service['desired'] if service else 0
+
+    def task_definitions(self) -> Dict[str, str]:
+        """서비스별 현재 태스크 정의 ARN (배포되면 다음 refresh부터 바뀜)"""
+        return {name: service['task_definition'] for name, service in self.services.items()
+                if service.get('task_definition')}
@@ -1,73 +1,130 @@
-import boto3
-import json
-import re
+import bisect
 import time
 from datetime import datetime, timedelta, timezone
-from statistics import mean, stdev
 import concurrent.futures
-from collections import deque
+import functools
+from metric_collector import ServiceMetricCollector
+from metric_cache import MetricCache
+from ecs_snapshot import ClusterSnapshot
+from tick_engine import TickEngine
+from logs_insights import LatencyInsightsQuery, InsightsQueryScheduler
+from latency_tracker import LatencyTracker
+from latency_parser import LatencyParser
+from scaling_policy import PATTERN_WINDOW, SmartTrafficPolicy, classify_shift
+from ring_buffer import TimeSeriesRing
+from change_point import ChangePointDetector, format_shift
+from traffic_forecast import prescale_target
+from capacity_planner import CapacityPlanner
+from aws_client import LIMITER, api_client
+from trigger_server import TriggerServer
+from poll_scheduler import AdaptivePollScheduler
+from metrics_exporter import AutoscalerMetrics, MetricsServer
+from decision_journal import DecisionJournal, api_latency_delta
+from service_registry import ServiceRegistry, parse_worker_args, tick_api_calls, tick_budget
+from leader_lease import LeaderLease, ensure_table, lease_client
+from state_store import StateStore
+
+# 서비스 평가 워커 스레드 상한
+MAX_EVAL_WORKERS = 16
+# 서비스별 히스토리 보관 샘플 수 (15초 틱 기준 1시간) - 패턴 통계는 최근 PATTERN_WINDOW개로 샘플마다 O(1) 갱신
+HISTORY_CAPACITY = 240
+# 재시작시 복원/저장할 히스토리 최대 나이 (초) - 최대 평가 주기 60초 x 20개
+STATE_MAX_AGE = 1200
+# 시작시 CloudWatch에서 채울 히스토리 범위 (분, 1분 간격)와 대기 상한 (초)
+BACKFILL_MINUTES = 20
+BACKFILL_TIMEOUT = 5
+# 비동기 p95 결과를 쓸 최대 나이 (초) - 기본 평가 틱 5회 (한산할 때 최대 평가 주기 60초보다 길게)
+INSIGHTS_MAX_AGE = 75
 
 class SmartTrafficAutoscaler:
-    def __init__(self, cluster_name, asg_name=None):
-        self.ecs = boto3.client('ecs', region_name='ap-northeast-2')
-        self.logs = boto3.client('logs', region_name='ap-northeast-2')
-        self.cloudwatch = boto3.client('cloudwatch', region_name='ap-northeast-2')
-        self.autoscaling = boto3.client('autoscaling', region_name='ap-northeast-2')
+    def __init__(self, cluster_name, asg_name=None, latency_mode='insights', offline=False, alb_name=None,
+                 target_tracking=False, trigger_port=None, metrics_port=None, journal_path=None,
+                 config_path=None, shard_index=0, shard_count=1, lease_table=None, state_path=None,
+                 backfill=True, trigger_host='127.0.0.1', trigger_token=None):
+        # API별 속도 제한 + 스로틀링 재시도 (실패시 0 대신 '지표 없음')
+        self.ecs = api_client('ecs', region_name='ap-northeast-2')
+        self.logs = api_client('logs', region_name='ap-northeast-2')
+        self.cloudwatch = api_client('cloudwatch', region_name='ap-northeast-2')
+        self.autoscaling = api_client('autoscaling', region_name='ap-northeast-2')
         self.cluster_name = cluster_name
         self.asg_name = asg_name or f"{cluster_name}-asg"
         
-        # 트래픽 패턴 분석을 위한 히스토리 저장
-        self.traffic_history = {
-            'product-svc': {'cpu': deque(maxlen=20), 'response': deque(maxlen=20), 'timestamps': deque(maxlen=20)},
-            'stress-svc': {'cpu': deque(maxlen=20), 'response': deque(maxlen=20), 'timestamps': deque(maxlen=20)},
-            'user-svc': {'cpu': deque(maxlen=20), 'response': deque(maxlen=20), 'timestamps': deque(maxlen=20)}
-        }
+        # 서비스 CPU/메모리 일괄 수집 (틱당 GetMetricData 최대 1회, 30초 캐시)
+        self.metric_cache = MetricCache()
+        self.metric_collector = ServiceMetricCollector(self.cloudwatch, cluster_name, cache=self.metric_cache)
         
-        # 서비스별 설정
-        self.services = {
-            'product-svc': {
-                'log_group': '/ecs/logs/product',
-                'response_time_threshold': 0.3,
-                'cpu_threshold_gradual': 40,
-                'cpu_threshold_spike': 90,
-                'min_tasks': 1,
-                'max_tasks': 6,
-                'last_scale_time': 0,
-                'violation_count': 0,
-                'violation_threshold': 3,
-                'current_pattern': 'unknown',
-                'pattern_confidence': 0
-            },
-            'stress-svc': {
-                'log_group': '/ecs/logs/stress',
-                'response_time_threshold': 0.3,
-                'cpu_threshold_gradual': 110,
-                'cpu_threshold_spike': 110,
-                'min_tasks': 1,
-                'max_tasks': 6,
-                'last_scale_time': 0,
-                'violation_count': 0,
-                'violation_threshold': 3,
-                'current_pattern': 'unknown',
-                'pattern_confidence': 0
-            },
-            'user-svc': {
-                'log_group': '/ecs/logs/user',
-                'response_time_threshold': 0.3,
-                'cpu_threshold_gradual': 40,
-                'cpu_threshold_spike': 90,
-                'min_tasks': 1,
-                'max_tasks': 6,
+        # 응답시간 조회 방식
+        # 'insights': 전체 로그 그룹 1회 쿼리, 서버측 p95 / 'sample': 로그 그룹별 최근 1000건 샘플
+        # 'stream': 로그 그룹별 커서로 새 이벤트만 읽어 분위수 스케치에 누적
+        self.latency_mode = latency_mode
+        self.latency_query = LatencyInsightsQuery(self.logs)
+        self.latency_scheduler = None
+        self.latency_tracker = None
+        self.latency_parser = LatencyParser(min_seconds=0.001, max_seconds=10)
+        
+        # 서비스별 설정 - services.json 레지스트리 (정적 설정 + ECS 태그 검색), 샤드 워커는 자기 몫만
+        self.registry = ServiceRegistry(config_path=config_path)
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.services = self.registry.services(cluster_name, 'smart', shard_index, shard_count,
+                                               ecs=None if offline else self.ecs)
+        for service_config in self.services.values():
+            service_config.update({
                 'last_scale_time': 0,
                 'violation_count': 0,
-                'violation_threshold': 3,
                 'current_pattern': 'unknown',
                 'pattern_confidence': 0
+            })
+        
+        # 트래픽 패턴 분석을 위한 히스토리 저장 (시각은 cpu 버퍼 기준)
+        self.traffic_history = {
+            service_name: {
+                'cpu': TimeSeriesRing(HISTORY_CAPACITY, PATTERN_WINDOW),
+                'response': TimeSeriesRing(HISTORY_CAPACITY, PATTERN_WINDOW)
             }
+            for service_name in self.services
         }
         
+        # 서비스별 CPU 수준 변화 감지 (CUSUM) - 상승 변화점 이후 일정 시간 급증 패턴
+        # ALB 요청 수 변화점(TrafficPatternAnalyzer)도 같은 핸들러로 받아 CPU보다 먼저 급증을 인지
+        self.change_detector = ChangePointDetector('cpu', min_std=2.0)
+        self.change_detector.subscribe(self.on_level_shift)
+        self.level_shifts = {}
+        
+        # 틱 단위 서비스 카운트 스냅샷 (DescribeServices 일괄 호출)
+        self.cluster_snapshot = ClusterSnapshot(self.ecs, cluster_name, list(self.services.keys()))
+        
+        # 서비스 병렬 평가 (장기 실행 워커 풀, 서비스별 데드라인)
+        self.tick_interval = 15
+        self.tick_deadline = 10
+        # 서비스가 수백 개여도 워커 스레드는 상한까지만 (대부분의 시간은 일괄 조회 결과 대기)
+        self.tick_engine = TickEngine(max_workers=max(1, min(len(self.services), MAX_EVAL_WORKERS)),
+                                      deadline=self.tick_deadline, name='svc')
+        
+        # 오프라인 리플레이는 결정 로직만 사용 (AWS 호출/백그라운드 스레드 없음)
+        self.offline = offline
+        
+        if self.latency_mode == 'insights' and not offline:
+            self.latency_scheduler = InsightsQueryScheduler(self.latency_query, max_age=INSIGHTS_MAX_AGE)
+        elif self.latency_mode == 'stream' and not offline:
+            self.latency_tracker = LatencyTracker(
+                self.logs, [config['log_group'] for config in self.services.values()]
+            )
+        
         self.scale_up_cooldown = 90  # 1분 30초
         self.scale_down_cooldown = 300
+        # target_tracking: 고정 +1/+2 대신 ceil(현재 x 메트릭/목표)로 한 번에 확장
+        self.policy = SmartTrafficPolicy(self.scale_up_cooldown, self.scale_down_cooldown, target_tracking)
+        
+        # 예측 선제 스케일링 (ALB 지정시) - 타겟 그룹 요청 수를 1분마다 갱신해 몇 분 뒤 부하 예측
+        self.traffic_analyzer = None
+        self.request_forecasts = {}
+        self.forecast_interval = 60
+        self.last_forecast_update = 0
+        if alb_name and not offline:
+            from traffic_pattern import TrafficPatternAnalyzer
+            self.traffic_analyzer = TrafficPatternAnalyzer(alb_name)
+            self.traffic_analyzer.change_detector.subscribe(self.on_level_shift)
         
         # Auto Scaling Group 설정
         self.asg_config = {
@@ -76,7 +133,181 @@ class SmartTrafficAutoscaler:
             'max_size': 10
         }
         
-        self.setup_asg()
+        # active/passive 복제본 - DynamoDB 리스를 가진 복제본만 스케일링, 대기 복제본은 평가만 계속해 히스토리 유지
+        self.leader_lease = None
+        if lease_table and not offline:
+            dynamodb = lease_client()
+            try:
+                ensure_table(dynamodb, lease_table)
+            except Exception as e:
+                print(f"⚠️ 리스 테이블 확인 실패: {e}")
+            self.leader_lease = LeaderLease(dynamodb, lease_table, f"{cluster_name}/{shard_index}")
+            self.leader_lease.subscribe(self.on_leadership_change)
+        
+        # 태스크 확장 전에 필요한 인스턴스를 먼저 요청하고 빈 인스턴스는 반납
+        self.capacity_planner = None
+        if not offline:
+            # 복제본 구성에서는 대기 복제본이 리더의 ASG desired를 덮어쓰지 않도록 첫 리더(term 1)만 초기 설정
+            if self.leader_lease is None:
+                self.setup_asg()
+            # 샤드 워커 여럿이 같은 ASG를 쓰면 빈 인스턴스 반납은 0번 샤드만
+            self.capacity_planner = CapacityPlanner(
+                self.ecs, self.autoscaling, cluster_name, self.asg_name,
+                self.asg_config['min_size'], self.asg_config['max_size'],
+                scale_in=shard_index == 0
+            )
+        
+        # 서비스별 적응형 평가 주기 - 급증/임계값 근처는 5초, 한산하고 min_tasks면 최대 60초까지 늘림
+        # 분당 API 호출 예산 안에서만 평가 틱 실행 (틱당 호출 수는 일괄 조회 단위로 추정, 예산은 샤드 크기에 맞춤)
+        calls_per_tick = tick_api_calls(len(self.services), latency_mode == 'insights')
+        self.poll_scheduler = AdaptivePollScheduler(
+            list(self.services.keys()), floor=5, ceiling=60, default=self.tick_interval,
+            calls_per_minute=tick_budget(calls_per_tick, self.tick_interval), calls_per_tick=calls_per_tick
+        )
+        
+        # 알람/SNS 푸시 트리거 (지정시 주기 폴링은 적응형 스케줄러 상한까지 늘어나는 안전망)
+        self.trigger_server = None
+        if trigger_port and not offline:
+            self.trigger_server = TriggerServer(host=trigger_host, port=trigger_port,
+                                                known_services=list(self.services.keys()), token=trigger_token)
+        
+        # 내부 상태/단계별 소요 시간 메트릭 (metrics_port 지정시 /metrics로 노출)
+        self.metrics = AutoscalerMetrics()
+        self.metrics.attach_cache(self.metric_cache)
+        self.metrics_server = None
+        if metrics_port and not offline:
+            LIMITER.observers.append(self.metrics.observe_api)
+            self.latency_query.wait_observers.append(self.metrics.observe_insights_wait)
+            self.metrics_server = MetricsServer(self.metrics.registry, port=metrics_port)
+        
+        # 결정 저널 (JSONL, 백그라운드 쓰기 + 10MB/1시간 로테이션 + gzip) - backtest.py --timeline으로 리플레이
+        self.journal = None
+        self.tick_id = 0
+        self.last_api_stats = {}
+        if journal_path and not offline:
+            self.journal = DecisionJournal(journal_path)
+        
+        # 웜 스타트 상태 (히스토리/쿨다운/위반 카운트) - 재시작 직후부터 패턴 분석과 쿨다운이 이어지도록 복원
+        self.state_store = None
+        if state_path and not offline:
+            self.state_store = StateStore(state_path)
+            self.restore_state(self.state_store.load())
+        
+        # 저장된 상태가 없거나 부족한 서비스는 CloudWatch 1분 데이터로 히스토리를 채워 첫 틱부터 패턴 분석
+        if backfill and not offline:
+            self.backfill_history()
+    
+    def backfill_history(self, timeout=BACKFILL_TIMEOUT):
+        """
+        최근 BACKFILL_MINUTES분의 서비스별 CPU/응답시간(1분 간격)을 GetMetricData 1회로 조회해 히스토리 앞쪽에 채움
+        
+        실시간 틱 간격이 아닌 1분 간격 샘플이라 변화율 계산이 시작 직후에도 왜곡되지 않음
+        timeout 안에 끝나지 않으면 채우지 않고 시작 (조회는 백그라운드에서 끝나고 결과는 버림)
+        
+        Returns:
+            채운 샘플 수
+        """
+        service_names = [name for name, history in self.traffic_history.items()
+                         if len(history['cpu']) < PATTERN_WINDOW]
+        if not service_names:
+            return 0
+        
+        # 응답시간은 ALB 타겟 그룹 p95 (타겟 그룹을 모르는 서비스는 CPU만)
+        latency_dimensions = {}
+        analyzer = self.traffic_analyzer
+        if analyzer is not None and analyzer.alb_arn:
+            for service_name in service_names:
+                target_group = self.services[service_name].get('target_group')
+                if target_group in analyzer.target_group_arns:
+                    alb_dim, tg_dim = analyzer.get_correct_dimension_values(target_group)
+                    latency_dimensions[service_name] = [
+                        {'Name': 'LoadBalancer', 'Value': alb_dim},
+                        {'Name': 'TargetGroup', 'Value': tg_dim}
+                    ]
+        
+        started = time.monotonic()
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='backfill')
+        future = executor.submit(self.metric_collector.load_history, service_names, BACKFILL_MINUTES, 60,
+                                 latency_dimensions)
+        executor.shutdown(wait=False)
+        try:
+            series = future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            print(f"⚠️ 히스토리 채우기 시간 초과 ({timeout}초) - 실시간 샘플부터 시작", flush=True)
+            return 0
+        except Exception as e:
+            print(f"⚠️ 히스토리 채우기 실패: {e}", flush=True)
+            return 0
+        
+        filled = 0
+        for service_name, samples in series.items():
+            history = self.traffic_history[service_name]
+            # 복원된 샘플보다 오래된 것만 앞에 붙임 (링 버퍼는 추가 순서대로만 쌓이므로 다시 채움)
+            timestamps = history['cpu'].timestamps()
+            first = timestamps[0] if timestamps else float('inf')
+            older = [sample for sample in samples if sample[0] < first]
+            merged = older + list(zip(timestamps, history['cpu'].samples(), history['response'].samples()))
+            history['cpu'].clear()
+            history['response'].clear()
+            for timestamp, cpu, response in merged:
+                history['cpu'].append(timestamp, cpu)
+                history['response'].append(timestamp, response)
+            self.replay_history(service_name)
+            filled += len(older)
+        print(f"📥 히스토리 채움: {len(series)}개 서비스, {filled}개 샘플 ({time.monotonic() - started:.1f}초)", flush=True)
+        return filled
+    
+    def restore_state(self, state, now=None):
+        """
+        저장된 상태 복원 (현재 설정에 있는 서비스만, STATE_MAX_AGE보다 오래된 샘플은 버림)
+        
+        Returns:
+            복원한 서비스 수
+        """
+        if not state:
+            return 0
+        now = time.time() if now is None else now
+        restored = 0
+        for service_name, saved in state['services'].items():
+            if service_name not in self.services:
+                continue
+            service_config = self.services[service_name]
+            service_config['last_scale_time'] = min(saved['last_scale_time'], now)
+            
+            history = self.traffic_history[service_name]
+            for timestamp, cpu, response in zip(saved['timestamps'], saved['cpu'], saved['response']):
+                if now - STATE_MAX_AGE <= timestamp <= now:
+                    history['cpu'].append(timestamp, cpu)
+                    history['response'].append(timestamp, response)
+            # 위반 카운트/패턴은 최근 히스토리가 남아 있을 때만 이어감 (오래 꺼져 있었으면 처음부터)
+            if len(history['cpu']):
+                service_config['violation_count'] = saved['violation_count']
+                service_config['current_pattern'] = saved['pattern']
+                service_config['pattern_confidence'] = saved['confidence']
+                self.replay_history(service_name)
+            restored += 1
+        age = now - state['saved_at']
+        print(f"♻️ 상태 복원: {restored}개 서비스 ({age:.0f}초 전 저장)", flush=True)
+        return restored
+    
+    def capture_state(self):
+        """현재 히스토리/쿨다운/위반 카운트 스냅샷 (히스토리는 재시작시 복원할 STATE_MAX_AGE 이내 샘플만)"""
+        now = time.time()
+        services = {}
+        for service_name, service_config in self.services.items():
+            history = self.traffic_history[service_name]
+            timestamps = history['cpu'].timestamps()
+            start = bisect.bisect_left(timestamps, now - STATE_MAX_AGE)
+            services[service_name] = {
+                'last_scale_time': service_config['last_scale_time'],
+                'violation_count': service_config['violation_count'],
+                'pattern': service_config['current_pattern'],
+                'confidence': service_config['pattern_confidence'],
+                'timestamps': timestamps[start:],
+                'cpu': history['cpu'].samples()[start:],
+                'response': history['response'].samples()[start:]
+            }
+        return {'saved_at': now, 'services': services}
     
     def setup_asg(self):
         """초기 ASG 설정"""
@@ -91,148 +322,87 @@ class SmartTrafficAutoscaler:
         except Exception as e:
             print(f"ASG 설정 실패: {e}")
     
-    def analyze_traffic_pattern(self, service_name, cpu_utilization, response_time):
-        """트래픽 패턴 분석"""
-        history = self.traffic_history[service_name]
-        current_time = time.time()
-        
-        history['cpu'].append(cpu_utilization)
-        history['response'].append(response_time)
-        history['timestamps'].append(current_time)
+    def analyze_traffic_pattern(self, service_name, cpu_utilization, response_time, current_time=None,
+                                sample_time=None):
+        """
+        트래픽 패턴 분석
         
-        if len(history['cpu']) < 10:
-            return 'unknown', 0, 40
+        sample_time은 CPU 데이터포인트 시각 (없으면 current_time) - 1분 집계/캐시 때문에 같은 데이터포인트를
+        여러 틱에서 다시 받으면 히스토리와 변화점 감지기에는 한 번만 넣음
+        """
+        history = self.traffic_history[service_name]
+        current_time = time.time() if current_time is None else current_time
+        sample_time = current_time if sample_time is None else sample_time
         
-        recent_cpu = list(history['cpu'])[-10:]
-        recent_times = list(history['timestamps'])[-10:]
+        last_time = history['cpu'].last_time
+        if last_time is None or sample_time > last_time:
+            history['cpu'].append(sample_time, cpu_utilization)
+            history['response'].append(sample_time, response_time)
+            # 수준 변화를 감지하면 on_level_shift가 level_shifts에 기록
+            self.change_detector.update(service_name, sample_time, cpu_utilization)
         
+        service_config = self.services[service_name]
         try:
-            # 변화율 계산
-            cpu_changes = []
-            for i in range(1, len(recent_cpu)):
-                if recent_times[i] - recent_times[i-1] > 0:
-                    rate = (recent_cpu[i] - recent_cpu[i-1]) / (recent_times[i] - recent_times[i-1])
-                    cpu_changes.append(abs(rate))
-            
-            if not cpu_changes:
-                return 'unknown', 0, 40
-            
-            avg_change_rate = mean(cpu_changes)
-            max_change_rate = max(cpu_changes)
-            
-            # 변동성 계산
-            cpu_std = stdev(recent_cpu) if len(recent_cpu) > 1 else 0
-            cpu_mean = mean(recent_cpu)
-            coefficient_of_variation = (cpu_std / cpu_mean) if cpu_mean > 0 else 0
-            
-            # 패턴 결정
-            service_config = self.services[service_name]
-            
-            if max_change_rate > 10 or coefficient_of_variation > 0.5:
-                pattern = 'spike'
-                cpu_threshold = service_config['cpu_threshold_spike']
-                confidence = min(80, max_change_rate * 5)
-            elif avg_change_rate > 1 or coefficient_of_variation > 0.3:
-                pattern = 'gradual'
-                cpu_threshold = service_config['cpu_threshold_gradual']
-                confidence = 60
-            else:
-                pattern = 'gradual'  # 기본값
-                cpu_threshold = service_config['cpu_threshold_gradual']
-                confidence = 40
-            
-            return pattern, confidence, cpu_threshold
-            
-        except Exception:
-            return 'unknown', 0, self.services[service_name]['cpu_threshold_gradual']
-    
-    def get_current_task_count(self, service_name):
-        try:
-            response = self.ecs.describe_services(
-                cluster=self.cluster_name,
-                services=[service_name]
+            return classify_shift(
+                history['cpu'].count, self.level_shifts.get(service_name),
+                self.change_detector.trend(service_name), current_time,
+                service_config['cpu_threshold_gradual'], service_config['cpu_threshold_spike']
             )
-            if response['services']:
-                return response['services'][0]['desiredCount']
-            return 0
         except Exception:
-            return 0
+            return 'unknown', 0, service_config['cpu_threshold_gradual']
     
-    def get_cpu_utilization(self, service_name, minutes=3):
-        """CPU 사용률 조회"""
-        end_time = datetime.now(timezone.utc)
-        start_time = end_time - timedelta(minutes=minutes)
+    def on_level_shift(self, event):
+        """
+        변화점 이벤트 구독자 (서비스 CPU 감지기 + ALB 요청 수 감지기)
         
-        try:
-            response = self.cloudwatch.get_metric_statistics(
-                Namespace='AWS/ECS',
-                MetricName='CPUUtilization',
-                Dimensions=[
-                    {'Name': 'ServiceName', 'Value': service_name},
-                    {'Name': 'ClusterName', 'Value': self.cluster_name}
-                ],
-                StartTime=start_time,
-                EndTime=end_time,
-                Period=60,
-                Statistics=['Average'],
-                Unit='Percent'
-            )
-            
-            if response['Datapoints']:
-                datapoints = sorted(response['Datapoints'], key=lambda x: x['Timestamp'], reverse=True)
-                latest = datapoints[0]
-                return latest.get('Average', 0)
-            return 0
-            
-        except Exception:
-            return 0
+        요청 수 이벤트는 타겟 그룹 이름으로 오므로 서비스로 바꿔 같은 level_shifts에 기록
+        """
+        service_name = event['series']
+        if event['metric'] != 'cpu':
+            service_name = next((name for name, config in self.services.items()
+                                 if config.get('target_group') == event['series']), None)
+            if service_name is None:
+                return
+        self.level_shifts[service_name] = event
+        self.metrics.record_level_shift(service_name, event)
+        if self.offline:
+            return
+        print(f"  {format_shift(event)}", flush=True)
+        if self.journal:
+            self.journal.record({'type': 'level_shift', 'scaler': 'smart', 'tick': self.tick_id,
+                                 **event, 'service': service_name})
     
-    def get_memory_utilization(self, service_name, minutes=3):
-        """메모리 사용률 조회"""
-        end_time = datetime.now(timezone.utc)
-        start_time = end_time - timedelta(minutes=minutes)
-        
-        try:
-            response = self.cloudwatch.get_metric_statistics(
-                Namespace='AWS/ECS',
-                MetricName='MemoryUtilization',
-                Dimensions=[
-                    {'Name': 'ServiceName', 'Value': service_name},
-                    {'Name': 'ClusterName', 'Value': self.cluster_name}
-                ],
-                StartTime=start_time,
-                EndTime=end_time,
-                Period=60,
-                Statistics=['Average', 'Maximum'],
-                Unit='Percent'
-            )
-            
-            if response['Datapoints']:
-                datapoints = sorted(response['Datapoints'], key=lambda x: x['Timestamp'], reverse=True)
-                latest = datapoints[0]
-                return latest.get('Maximum', latest.get('Average', 0))
-            return 0
-            
-        except Exception:
-            return 0
+    def replay_history(self, service_name):
+        """복원/채운 히스토리로 변화점 감지기 상태를 다시 만듦 (이벤트 알림 없이 마지막 변화점만 기록)"""
+        self.change_detector.reset(service_name)
+        history = self.traffic_history[service_name]['cpu']
+        for timestamp, cpu in zip(history.timestamps(), history.samples()):
+            event = self.change_detector.update(service_name, timestamp, cpu, notify=False)
+            if event:
+                self.level_shifts[service_name] = event
+    
+    def get_current_task_count(self, service_name):
+        """틱 스냅샷에서 desired 태스크 수 조회"""
+        return self.cluster_snapshot.desired_count(service_name)
     
     def get_average_response_time(self, log_group_name, minutes=2):
         """응답시간 조회 - 간소화"""
         end_time = datetime.now(timezone.utc)
         start_time = end_time - timedelta(minutes=minutes)
         
-        # 로그 그룹이 존재하지 않거나 데이터가 없는 경우 0 반환
+        # 로그 그룹이 없거나 조회/파싱에 실패하면 0초 대신 None ('지표 없음' - 평가 건너뜀)
         try:
             # 로그 그룹 존재 확인
             self.logs.describe_log_groups(logGroupNamePrefix=log_group_name, limit=1)
-        except Exception:
-            return 0
+        except Exception as e:
+            print(f"  ⚠️ {log_group_name} 로그 그룹 조회 실패: {e}")
+            return None
         
         query = """
         fields @timestamp, @message
         | filter @message like /ms|response|duration/
         | sort @timestamp desc
-        | limit 50
+        | limit 1000
         """
         
         try:
@@ -256,88 +426,87 @@ class SmartTrafficAutoscaler:
                 if result['status'] == 'Complete':
                     break
                 elif result['status'] == 'Failed':
-                    return 0
+                    return None
                     
                 time.sleep(0.2)
                 wait_count += 1
             
             if result['status'] != 'Complete':
-                return 0
-            
-            response_times = []
-            
-            # 간단한 정규식 패턴만 사용
-            patterns = [
-                (r'(\d+(?:\.\d+)?)ms\b', 1000),
-                (r'"response_time"\s*:\s*(\d+(?:\.\d+)?)', 1000),
-                (r'"latency"\s*:\s*(\d+(?:\.\d+)?)', 1000),
-            ]
+                return None
             
+            messages = []
             for log_entry in result['results']:
-                try:
-                    log_message = ""
-                    for field in log_entry:
-                        if field['field'] == '@message':
-                            log_message = field['value']
-                            break
-                    
-                    if not log_message:
-                        continue
-                    
-                    # JSON 파싱 시도
-                    try:
-                        if log_message.strip().startswith('{'):
-                            log_data = json.loads(log_message)
-                            for key in ['latency', 'response_time', 'duration']:
-                                if key in log_data:
-                                    time_value = float(log_data[key])
-                                    if 0.001 <= time_value <= 10:
-                                        response_times.append(time_value)
-                                        break
-                    except:
-                        pass
-                    
-                    # 정규식 매칭
-                    for pattern, divisor in patterns:
-                        match = re.search(pattern, log_message, re.IGNORECASE)
-                        if match:
-                            try:
-                                time_value = float(match.group(1))
-                                time_seconds = time_value / divisor
-                                
-                                if 0.001 <= time_seconds <= 10:
-                                    response_times.append(time_seconds)
-                                    break
-                            except ValueError:
-                                continue
-                            
-                except Exception:
-                    continue
+                for field in log_entry:
+                    if field['field'] == '@message':
+                        messages.append(field['value'])
+                        break
+            
+            response_times = self.latency_parser.parse_batch(messages, stream=log_group_name)
             
             if response_times:
                 sorted_times = sorted(response_times)
                 p95_index = int(len(sorted_times) * 0.95)
                 return sorted_times[p95_index] if p95_index < len(sorted_times) else sorted_times[-1]
             
-            return 0
+            return None
             
-        except Exception:
-            return 0
+        except Exception as e:
+            print(f"  ⚠️ {log_group_name} 응답시간 조회 실패: {e}")
+            return None
+    
+    def is_leader(self):
+        """스케일링 권한 여부 (리스를 쓰지 않으면 항상 True)"""
+        return self.leader_lease is None or self.leader_lease.is_leader()
+    
+    def on_leadership_change(self, leader, term):
+        """리더 획득/상실 - 히스토리/캐시는 대기 중에도 갱신했으므로 바로 이어서 결정"""
+        if leader and term == 1 and not self.offline:
+            self.setup_asg()
+        if self.journal:
+            self.journal.record({'type': 'leader', 'leader': leader, 'term': term,
+                                 'owner': self.leader_lease.owner_id})
+    
+    def sync_standby_scale_times(self, previous_counts):
+        """
+        대기 복제본: 스냅샷 desired 변화로 리더의 스케일링 시각을 추정해 쿨다운 유지
+        
+        넘겨받자마자 리더가 방금 한 스케일링을 다시 하지 않도록 last_scale_time을 맞춘다 (추가 API 호출 없음)
+        """
+        now = time.time()
+        for service_name, service_config in self.services.items():
+            before = previous_counts.get(service_name)
+            after = self.cluster_snapshot.services.get(service_name)
+            if before and after and before['desired'] != after['desired']:
+                service_config['last_scale_time'] = now
     
     def scale_service(self, service_name, desired_count, reason):
         current_time = time.time()
         service_config = self.services[service_name]
         
+        if not self.is_leader():
+            print(f"  💤 {service_name}: 대기 복제본 - 스케일링 생략 ({reason})")
+            return False
+        
         desired_count = max(service_config['min_tasks'], 
                           min(service_config['max_tasks'], desired_count))
         
+        if self.capacity_planner:
+            self.capacity_planner.ensure_capacity(service_name, self.get_current_task_count(service_name), desired_count)
+        
+        # 로컬 리스 판단 이후 다른 복제본이 넘겨받았을 수 있으므로 ECS 쓰기 직전에 term을 다시 확인
+        if self.leader_lease and not self.leader_lease.fence():
+            print(f"  ⛔ {service_name}: 리더 term 확인 실패 - 스케일링 생략 ({reason})")
+            return False
+        
         try:
-            self.ecs.update_service(
+            response = self.ecs.update_service(
                 cluster=self.cluster_name,
                 service=service_name,
                 desiredCount=desired_count
             )
             
+            # 변경된 카운트를 스냅샷에 즉시 반영
+            self.cluster_snapshot.update(response.get('service'))
             service_config['last_scale_time'] = current_time
             print(f"  → 스케일링: {service_name} = {desired_count}개 태스크 ({reason})")
             return True
@@ -346,7 +515,44 @@ class SmartTrafficAutoscaler:
             print(f"  → 스케일링 실패: {service_name} - {e}")
             return False
     
-    def auto_scale_service(self, service_name):
+    def collect_service_metrics(self):
+        """모든 서비스 CPU/메모리 일괄 조회 (insights/stream 모드면 p95 응답시간 포함)"""
+        metrics = self.metric_collector.collect(list(self.services.keys()))
+        
+        if self.latency_mode == 'insights':
+            log_groups = [config['log_group'] for config in self.services.values()]
+            # 이전 틱에 시작한 쿼리 결과를 사용하고, 다음 틱용 쿼리를 미리 시작
+            latencies, age = self.latency_scheduler.latest()
+            if latencies is None:
+                # 완료된 결과가 없거나 INSIGHTS_MAX_AGE보다 오래됐을 때만 동기 조회 (실패하면 '지표 없음')
+                latencies, age = self.latency_query.run(log_groups), 0
+            self.latency_scheduler.request(log_groups)
+            for service_name, service_config in self.services.items():
+                service_metrics = metrics.setdefault(service_name, {})
+                if latencies is None:
+                    # 쿼리 실패/스로틀링 - 0초로 대체하지 않고 '지표 없음'
+                    service_metrics['response_time'] = None
+                    continue
+                # 결과에 없는 로그 그룹(샘플 없음)도 0초가 아니라 '지표 없음'
+                latency = latencies.get(service_config['log_group'], {})
+                service_metrics['response_time'] = latency.get('p95')
+                service_metrics['response_time_age'] = age
+        elif self.latency_mode == 'stream':
+            processed = self.latency_tracker.poll()
+            for service_name, service_config in self.services.items():
+                service_metrics = metrics.setdefault(service_name, {})
+                log_group = service_config['log_group']
+                if processed.get(log_group) is None:
+                    # 조회 실패/스로틀링 - 윈도우에 남은 이전 샘플로 판단하지 않음
+                    service_metrics['response_time'] = None
+                    continue
+                # 윈도우가 비어 있으면 None ('지표 없음')
+                service_metrics['response_time'] = self.latency_tracker.percentile(log_group, 0.95)
+                service_metrics['response_time_p99'] = self.latency_tracker.percentile(log_group, 0.99)
+        
+        return metrics
+    
+    def auto_scale_service(self, service_name, metrics=None):
         service_config = self.services[service_name]
         
         current_tasks = self.get_current_task_count(service_name)
@@ -354,84 +560,313 @@ class SmartTrafficAutoscaler:
             print(f"  {service_name}: 서비스 없음")
             return
         
-        # 메트릭 수집
-        cpu_utilization = self.get_cpu_utilization(service_name)
-        memory_utilization = self.get_memory_utilization(service_name)
-        avg_response_time = self.get_average_response_time(service_config['log_group'])
+        # 메트릭 수집 (틱 단위 일괄 조회 결과 사용)
+        if metrics is None:
+            metrics = self.metric_collector.collect([service_name]).get(service_name, {})
+        cpu_utilization = metrics.get('cpu')
+        memory_utilization = metrics.get('memory', 0)
+        if 'response_time' in metrics:
+            avg_response_time = metrics['response_time']
+        else:
+            avg_response_time = self.get_average_response_time(service_config['log_group'])
+        
+        # 조회 실패를 0%/0초로 보면 잘못 축소될 수 있으므로 이번 평가는 건너뜀
+        if cpu_utilization is None or avg_response_time is None:
+            print(f"  {service_name}: 📭 지표 없음 (조회 실패/스로틀링) - 평가 건너뜀")
+            return
+        
+        # 간단한 상태 출력
+        response_age = metrics.get('response_time_age')
+        age_note = f"({response_age:.0f}초 전 결과)" if response_age else ""
+        print(f"  {service_name}: 태스크={current_tasks}, 응답시간={avg_response_time:.3f}초{age_note}, CPU={cpu_utilization:.1f}%, 메모리={memory_utilization:.1f}%")
+        
+        decision = self.decide_scaling(service_name, current_tasks, cpu_utilization, avg_response_time,
+                                       sample_time=metrics.get('cpu_time'))
+        self.metrics.record_decision(service_name, current_tasks, decision,
+                                     service_config['current_pattern'], service_config['pattern_confidence'])
+        self.poll_scheduler.update(service_name, service_config['current_pattern'], decision['load_ratio'],
+                                   current_tasks <= service_config['min_tasks'])
+        
+        # 임계값 위반이 없어도 예측 부하가 CPU 목표를 넘으면 미리 확장
+        prescale_count = None
+        if decision['new_count'] is None:
+            prescale_count = self.decide_prescale(service_name, current_tasks, cpu_utilization)
+        self.journal_decision(service_name, current_tasks, metrics, cpu_utilization, memory_utilization,
+                              avg_response_time, decision, prescale_count)
+        
+        if decision['new_count'] is not None:
+            self.scale_service(service_name, decision['new_count'], decision['reason'])
+        elif prescale_count is not None:
+            self.scale_service(service_name, prescale_count, "predicted load")
+    
+    def journal_decision(self, service_name, current_tasks, metrics, cpu_utilization, memory_utilization,
+                         avg_response_time, decision, prescale_count=None):
+        """평가 1건을 결정 저널에 기록 (backtest 타임라인 필드 + 임계값/패턴/결정)"""
+        if self.journal is None:
+            return
+        service_config = self.services[service_name]
+        forecast = self.request_forecasts.get(service_name)
+        self.journal.record({
+            'type': 'decision',
+            'scaler': 'smart',
+            'tick': self.tick_id,
+            'service': service_name,
+            'tasks': current_tasks,
+            'cpu': cpu_utilization,
+            'memory': memory_utilization,
+            'p95': avg_response_time,
+            'p95_age': metrics.get('response_time_age'),
+            'thresholds': {
+                'response_time': service_config['response_time_threshold'],
+                'cpu': decision['cpu_threshold'],
+                'violations': service_config['violation_threshold']
+            },
+            'pattern': service_config['current_pattern'],
+            'confidence': service_config['pattern_confidence'],
+            'forecast': forecast['forecast'] if forecast else None,
+            'decision': {
+                'stage': decision['stage'],
+                'new_count': decision['new_count'],
+                'prescale': prescale_count,
+                'reason': decision['reason'],
+                'violation_count': decision['violation_count'],
+                'load_ratio': round(decision['load_ratio'], 3)
+            }
+        })
+    
+    def update_request_forecasts(self):
+        """타겟 그룹 요청 수 조회 및 예측 갱신 (forecast_interval마다 1회)"""
+        if self.traffic_analyzer is None:
+            return
+        now = time.time()
+        if now - self.last_forecast_update < self.forecast_interval:
+            return
+        self.last_forecast_update = now
+        
+        analyzer = self.traffic_analyzer
+        for service_name, service_config in self.services.items():
+            target_group = service_config.get('target_group')
+            if target_group not in analyzer.target_group_arns:
+                continue
+            try:
+                requests = analyzer.get_target_group_metrics(target_group, analyzer.period_minutes)
+                if requests is None:
+                    continue
+                analysis = analyzer.analyze_pattern(target_group, requests)
+            except Exception as e:
+                print(f"  ⚠️ {target_group} 요청 수 예측 실패: {e}")
+                continue
+            self.request_forecasts[service_name] = {
+                'requests': requests,
+                'forecast': analysis['forecast'],
+                'mape': analysis['forecast_error']['mape']
+            }
+            mape = analysis['forecast_error']['mape']
+            mape_str = f" (MAPE {mape:.0f}%)" if mape is not None else ""
+            print(f"  🔮 {service_name}: 요청 {requests:.0f} → {analyzer.forecast_horizon}분 뒤 예측 "
+                  f"{analysis['forecast']:.0f}{mape_str}")
+    
+    def decide_prescale(self, service_name, current_tasks, cpu_utilization, now=None):
+        """예측 요청 수 기반 선제 스케일링 태스크 수 (필요 없거나 쿨다운 중이면 None)"""
+        forecast = self.request_forecasts.get(service_name)
+        if not forecast:
+            return None
+        
+        service_config = self.services[service_name]
+        now = time.time() if now is None else now
+        if now - service_config['last_scale_time'] < self.scale_up_cooldown:
+            return None
+        
+        return prescale_target(
+            current_tasks, cpu_utilization, forecast['requests'], forecast['forecast'],
+            service_config['cpu_threshold_gradual'], service_config['max_tasks']
+        )
+    
+    def decide_scaling(self, service_name, current_tasks, cpu_utilization, avg_response_time, now=None,
+                       sample_time=None):
+        """
+        스케일링 결정 (AWS 호출 없음 - 실시간 루프와 오프라인 리플레이 공용)
+        
+        패턴 히스토리와 위반 카운트는 갱신하지만 last_scale_time은 실제 스케일링 시점에 갱신
+        sample_time은 CPU 데이터포인트 시각 (analyze_traffic_pattern 참고)
+        """
+        service_config = self.services[service_name]
+        now = time.time() if now is None else now
         
         # 패턴 분석
         pattern, confidence, cpu_threshold = self.analyze_traffic_pattern(
-            service_name, cpu_utilization, avg_response_time
+            service_name, cpu_utilization, avg_response_time, now, sample_time
         )
         
         service_config['current_pattern'] = pattern
         service_config['pattern_confidence'] = confidence
         
-        # 간단한 상태 출력
-        print(f"  {service_name}: 태스크={current_tasks}, 응답시간={avg_response_time:.3f}초, CPU={cpu_utilization:.1f}%, 메모리={memory_utilization:.1f}%")
+        # 스케일링 결정 (OR 조건) - 순수 정책 코어에 위임
+        state = {
+            'current_tasks': current_tasks,
+            'cpu': cpu_utilization,
+            'response_time': avg_response_time,
+            'violation_count': service_config['violation_count'],
+            'last_scale_time': service_config['last_scale_time'],
+            'now': now,
+            'cpu_threshold': cpu_threshold,
+            'spike': pattern == 'spike',
+            'pattern': pattern
+        }
+        decision = self.policy.decide(service_config, state)
+        service_config['violation_count'] = decision['violation_count']
+        decision['load_ratio'] = max(avg_response_time / service_config['response_time_threshold'],
+                                     cpu_utilization / cpu_threshold)
+        decision['cpu_threshold'] = cpu_threshold
+        return decision
+    
+    def evaluate_services(self, service_names):
+        """서비스 평가 1회 (스냅샷 갱신 → 메트릭 일괄 수집 → 병렬 평가)"""
+        tick_start = time.monotonic()
+        self.tick_id += 1
+        previous_counts = dict(self.cluster_snapshot.services)
+        with self.metrics.stage('snapshot'):
+            self.cluster_snapshot.refresh()
+        leader = self.is_leader()
+        if not leader:
+            self.sync_standby_scale_times(previous_counts)
+        if self.capacity_planner and leader:
+            with self.metrics.stage('capacity'):
+                # 샤드 워커는 클러스터 일부 서비스만 알므로 인스턴스 사용량 기준으로 반납 판단
+                desired_counts = None
+                if self.shard_count == 1:
+                    desired_counts = {name: self.get_current_task_count(name) for name in self.services}
+                self.capacity_planner.tick(desired_counts, self.cluster_snapshot.task_definitions())
+        with self.metrics.stage('metrics'):
+            tick_metrics = self.collect_service_metrics()
+        with self.metrics.stage('forecast'):
+            self.update_request_forecasts()
         
-        # 스케일링 결정 (OR 조건)
-        response_exceeded = avg_response_time > service_config['response_time_threshold']
-        cpu_exceeded = cpu_utilization > cpu_threshold
+        # 서비스 병렬 평가 - 한 서비스의 느린 로그 쿼리가 다른 서비스를 막지 않음
+        jobs = {
+            service_name: functools.partial(self.auto_scale_service, service_name, tick_metrics.get(service_name, {}))
+            for service_name in service_names
+        }
+        deadlines = {
+            service_name: self.services[service_name].get('tick_deadline', self.tick_deadline)
+            for service_name in service_names
+        }
+        with self.metrics.stage('evaluate'):
+            status = self.tick_engine.run_tick(jobs, deadlines)
+        for service_name, state in status.items():
+            if state == 'timeout':
+                print(f"  {service_name}: 데드라인 초과 - 다음 반복에서 결과 반영")
+            elif state == 'busy':
+                print(f"  {service_name}: 이전 평가 진행 중 - 건너뜀")
+        tick_duration = time.monotonic() - tick_start
+        self.metrics.tick_duration.observe(value=tick_duration)
+        self.journal_tick(service_names, status, tick_duration)
+        if self.state_store:
+            # 디스크 쓰기는 백그라운드 스레드가 최소 15초 간격으로 최신 상태만 기록
+            self.state_store.submit(self.capture_state())
+    
+    def journal_tick(self, service_names, status, tick_duration):
+        """틱 요약 (소요 시간, 서비스별 상태, 직전 틱 이후 API별 호출 수/평균 지연)을 결정 저널에 기록"""
+        if self.journal is None:
+            return
+        api_stats = LIMITER.stats()
+        self.journal.record({
+            'type': 'tick',
+            'scaler': 'smart',
+            'tick': self.tick_id,
+            'services': list(service_names),
+            'status': status,
+            'duration': round(tick_duration, 3),
+            'api': api_latency_delta(self.last_api_stats, api_stats)
+        })
+        self.last_api_stats = api_stats
+    
+    def wait_for_next_tick(self, wait_time):
+        """다음 평가까지 대기 - 트리거가 오면 해당 서비스의 평가 시각을 당기고 바로 반환"""
+        if self.trigger_server is None:
+            time.sleep(wait_time)
+            return
         
-        if response_exceeded or cpu_exceeded:
-            service_config['violation_count'] += 1
-            
-            if service_config['violation_count'] >= service_config['violation_threshold']:
-                current_time = time.time()
-                cooldown = self.scale_up_cooldown
-                cooldown_remaining = cooldown - (current_time - service_config['last_scale_time'])
-                
-                if cooldown_remaining <= 0:
-                    increment = 2 if pattern == 'spike' and cpu_utilization > 80 else 1
-                    new_count = min(current_tasks + increment, service_config['max_tasks'])
-                    
-                    if new_count > current_tasks:
-                        self.scale_service(service_name, new_count, f"high load ({pattern})")
-                        service_config['violation_count'] = 0
-        else:
-            service_config['violation_count'] = 0
-            
-            # 스케일 다운
-            if (avg_response_time < 0.15 and 
-                cpu_utilization < 20 and 
-                current_tasks > service_config['min_tasks']):
-                
-                current_time = time.time()
-                if current_time - service_config['last_scale_time'] > self.scale_down_cooldown:
-                    new_count = max(service_config['min_tasks'], current_tasks - 1)
-                    self.scale_service(service_name, new_count, "low load")
+        triggered = self.trigger_server.wait(wait_time)
+        if triggered:
+            # 알람은 최신 데이터포인트 기준이므로 해당 서비스의 캐시된 메트릭만 버리고 다시 조회
+            self.metric_cache.invalidate('ServiceName', sorted(triggered))
+            # 평가는 run()의 due()를 거쳐 API 예산을 차감
+            self.poll_scheduler.wake(sorted(triggered))
     
     def run(self):
         print("🚀 ECS Auto Scaler 시작")
         print(f"📋 모니터링 서비스: {list(self.services.keys())}")
+        if self.shard_count > 1:
+            print(f"🧩 {self.cluster_name} 샤드 {self.shard_index}/{self.shard_count} ({len(self.services)}개 서비스)")
+        if self.leader_lease:
+            self.leader_lease.start()
+        if self.trigger_server:
+            self.trigger_server.start()
+        if self.metrics_server:
+            self.metrics_server.start()
         
         iteration = 0
         while True:
             try:
-                iteration += 1
-                print(f"\n--- 반복 #{iteration} ({datetime.now().strftime('%H:%M:%S')}) ---")
-                
-                for service_name in self.services.keys():
-                    try:
-                        self.auto_scale_service(service_name)
-                    except Exception as e:
-                        print(f"  {service_name}: 오류 - {e}")
+                # 평가 시각이 된 서비스만 평가 (주기는 서비스별 패턴/부하에 따라 조정)
+                due_services = self.poll_scheduler.due()
+                if due_services:
+                    iteration += 1
+                    print(f"\n--- 반복 #{iteration} ({datetime.now().strftime('%H:%M:%S')}) {', '.join(due_services)} ---")
+                    
+                    self.evaluate_services(due_services)
+                    print(f"  📦 {self.metric_cache.format_stats()} | 🌐 {LIMITER.format_stats()}")
+                    print(f"  ⏱️ 평가 주기: {self.poll_scheduler.format_status()}")
+                    if self.journal:
+                        print(f"  📝 {self.journal.format_stats()}")
                 
-                print("15초 대기...")
-                time.sleep(15)
+                self.wait_for_next_tick(self.poll_scheduler.next_wakeup())
                 
             except KeyboardInterrupt:
                 print("\n종료")
+                self.tick_engine.shutdown()
+                self.metric_cache.shutdown()
+                if self.latency_scheduler:
+                    self.latency_scheduler.stop()
+                if self.trigger_server:
+                    self.trigger_server.stop()
+                if self.metrics_server:
+                    self.metrics_server.stop()
+                if self.leader_lease:
+                    self.leader_lease.release()
+                if self.journal:
+                    self.journal.close()
+                if self.state_store:
+                    self.state_store.submit(self.capture_state())
+                    self.state_store.close()
                 break
             except Exception as e:
                 print(f"오류: {e}")
                 time.sleep(60)
 
 def main():
+    args = parse_worker_args('트래픽 패턴 기반 ECS 오토스케일러')
+    # 같은 계정의 워커끼리 API 한도를 나눠 씀
+    LIMITER.share /= max(1, args.workers)
+    cluster_config = ServiceRegistry(config_path=args.config).cluster(args.cluster)
+    suffix = f"-{args.cluster}-{args.shard_index}" if args.workers > 1 else ""
+    
     autoscaler = SmartTrafficAutoscaler(
-        cluster_name="apdev-ecs-cluster",
-        asg_name="apdev-ecs-asg"
+        cluster_name=args.cluster,
+        asg_name=cluster_config.get('asg'),
+        alb_name=cluster_config.get('alb'),
+        target_tracking=args.target_tracking,
+        trigger_port=args.trigger_port + 10 * args.worker_index if args.trigger_port else None,
+        trigger_host=args.trigger_host,
+        trigger_token=args.trigger_token,
+        metrics_port=9101 + 10 * args.worker_index,
+        journal_path=f"/home/ec2-user/apdev/logs/decisions-smart{suffix}.jsonl",
+        state_path=f"/home/ec2-user/apdev/logs/state-smart{suffix}.bin",
+        config_path=args.config,
+        shard_index=args.shard_index,
+        shard_count=args.shard_count,
+        lease_table=args.lease_table
     )
     autoscaler.run()
 
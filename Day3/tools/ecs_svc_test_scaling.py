@@ -1,60 +1,70 @@
-import boto3
 import json
-import re
 import time
 from datetime import datetime, timedelta
 from statistics import mean
 import concurrent.futures
+import functools
+from ecs_snapshot import ClusterSnapshot
+from tick_engine import TickEngine
+from latency_parser import LatencyParser
+from metric_cache import MetricCache
+from metric_collector import FleetCpuCollector
+from scaling_policy import DualMetricPolicy
+from capacity_planner import CapacityPlanner
+from trigger_server import TriggerServer
+from aws_client import LIMITER, api_client
+from metrics_exporter import AutoscalerMetrics, MetricsServer
+from decision_journal import DecisionJournal, api_latency_delta
+from service_registry import ServiceRegistry, parse_worker_args
+
+# 서비스 평가 워커 스레드 상한
+MAX_EVAL_WORKERS = 16
 
 class DualMetricAutoscaler:
-    def __init__(self, cluster_name, asg_name=None):
-        self.ecs = boto3.client('ecs', region_name='ap-northeast-2')
-        self.logs = boto3.client('logs', region_name='ap-northeast-2')
-        self.cloudwatch = boto3.client('cloudwatch', region_name='ap-northeast-2')
-        self.autoscaling = boto3.client('autoscaling', region_name='ap-northeast-2')
+    def __init__(self, cluster_name, asg_name=None, offline=False, target_tracking=False, trigger_port=None,
+                 metrics_port=None, journal_path=None, config_path=None, shard_index=0, shard_count=1,
+                 trigger_host='127.0.0.1', trigger_token=None):
+        # API별 속도 제한 + 스로틀링 재시도 (실패시 추정값 대신 '지표 없음')
+        self.ecs = api_client('ecs', region_name='ap-northeast-2')
+        self.logs = api_client('logs', region_name='ap-northeast-2')
+        self.cloudwatch = api_client('cloudwatch', region_name='ap-northeast-2')
+        self.autoscaling = api_client('autoscaling', region_name='ap-northeast-2')
         self.cluster_name = cluster_name
         self.asg_name = asg_name or f"{cluster_name}-asg"
         
-        # 실시간 모니터링 설정 (캐시 없음)
+        # 실시간 모니터링 설정 (CloudWatch 메트릭은 30초 캐시, 만료시 백그라운드 갱신)
+        self.metric_cache = MetricCache()
         self.log_query_timeout = 5   # 5초 빠른 타임아웃
-        self.log_sample_size = 100   # 적은 샘플로 빠른 처리
+        self.log_sample_size = 1000  # 컴파일된 일괄 파서로 큰 샘플도 빠르게 처리
+        self.latency_parser = LatencyParser(min_seconds=0.0001, max_seconds=60)
+        # EC2 플릿 CPU - 인스턴스 수와 무관하게 GetMetricData 1회, 틱 안에서 모든 서비스가 공유
+        self.fleet_cpu = FleetCpuCollector(self.cloudwatch, cache=self.metric_cache)
         
-        # 서비스별 설정 (메모리 제거, 실시간 모니터링)
-        self.services = {
-            'product-svc': {
-                'log_group': '/ecs/logs/product',
-                'response_time_threshold': 0.3,
-                'cpu_threshold': 95,  # 더 낮은 임계값
-                'min_tasks': 1,
-                'max_tasks': 6,
-                'last_scale_time': 0,
-                'violation_count': 0,
-                'violation_threshold': 2  # 더 빠른 반응
-            },
-            'stress-svc': {
-                'log_group': '/ecs/logs/stress',
-                'response_time_threshold': 0.5,
-                'cpu_threshold': 80,
-                'min_tasks': 1,
-                'max_tasks': 6,
-                'last_scale_time': 0,
-                'violation_count': 0,
-                'violation_threshold': 2
-            },
-            'user-svc': {
-                'log_group': '/ecs/logs/user',
-                'response_time_threshold': 0.3,
-                'cpu_threshold': 95,
-                'min_tasks': 1,
-                'max_tasks': 6,
-                'last_scale_time': 0,
-                'violation_count': 0,
-                'violation_threshold': 2
-            }
-        }
+        # 서비스별 설정 - services.json 레지스트리 (정적 설정 + ECS 태그 검색), 샤드 워커는 자기 몫만
+        self.registry = ServiceRegistry(config_path=config_path)
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.services = self.registry.services(cluster_name, 'dual', shard_index, shard_count,
+                                               ecs=None if offline else self.ecs)
+        for service_config in self.services.values():
+            service_config.update({'last_scale_time': 0, 'violation_count': 0})
+        
+        # 틱 단위 서비스 카운트 스냅샷 (DescribeServices 일괄 호출)
+        self.cluster_snapshot = ClusterSnapshot(self.ecs, cluster_name, list(self.services.keys()))
+        
+        # 서비스 병렬 평가용 엔진과 메트릭 조회용 풀 (틱마다 새로 만들지 않음)
+        self.tick_deadline = 10
+        # 서비스가 수백 개여도 워커 스레드는 상한까지만
+        workers = max(1, min(len(self.services), MAX_EVAL_WORKERS))
+        self.tick_engine = TickEngine(max_workers=workers, deadline=self.tick_deadline, name='svc')
+        self.metric_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers * 2, thread_name_prefix='metric'
+        )
         
         self.scale_up_cooldown = 30   # 더 짧은 쿨다운
         self.scale_down_cooldown = 180
+        # target_tracking: 고정 +1 대신 ceil(현재 x 메트릭/목표)로 한 번에 확장
+        self.policy = DualMetricPolicy(self.scale_up_cooldown, self.scale_down_cooldown, target_tracking)
         
         # Auto Scaling Group 설정
         self.asg_config = {
@@ -63,8 +73,41 @@ class DualMetricAutoscaler:
             'max_size': 10
         }
         
-        # ASG 초기 설정
-        self.setup_asg()
+        # ASG 초기 설정 (오프라인 리플레이는 결정 로직만 사용)
+        self.offline = offline
+        self.capacity_planner = None
+        if not offline:
+            self.setup_asg()
+            # 태스크 확장 전에 필요한 인스턴스를 먼저 요청하고 빈 인스턴스는 반납
+            # 샤드 워커 여럿이 같은 ASG를 쓰면 빈 인스턴스 반납은 0번 샤드만
+            self.capacity_planner = CapacityPlanner(
+                self.ecs, self.autoscaling, cluster_name, self.asg_name,
+                self.asg_config['min_size'], self.asg_config['max_size'],
+                scale_in=shard_index == 0
+            )
+        
+        # 알람/SNS 푸시 트리거 (지정시 1초 폴링 대신 30초 안전망 폴링)
+        self.poll_interval = 1
+        self.trigger_server = None
+        if trigger_port and not offline:
+            self.trigger_server = TriggerServer(host=trigger_host, port=trigger_port,
+                                                known_services=list(self.services.keys()), token=trigger_token)
+            self.poll_interval = 30
+        
+        # 내부 상태/단계별 소요 시간 메트릭 (metrics_port 지정시 /metrics로 노출)
+        self.metrics = AutoscalerMetrics()
+        self.metrics.attach_cache(self.metric_cache)
+        self.metrics_server = None
+        if metrics_port and not offline:
+            LIMITER.observers.append(self.metrics.observe_api)
+            self.metrics_server = MetricsServer(self.metrics.registry, port=metrics_port)
+        
+        # 결정 저널 (JSONL, 백그라운드 쓰기 + 10MB/1시간 로테이션 + gzip) - backtest.py --timeline으로 리플레이
+        self.journal = None
+        self.tick_id = 0
+        self.last_api_stats = {}
+        if journal_path and not offline:
+            self.journal = DecisionJournal(journal_path)
     
     def setup_asg(self):
         """초기 ASG 설정"""
@@ -87,6 +130,10 @@ class DualMetricAutoscaler:
             )
             if response['AutoScalingGroups']:
                 asg = response['AutoScalingGroups'][0]
+                # 인스턴스 집합이 바뀐 경우에만 플릿 CPU 쿼리 재생성
+                self.fleet_cpu.set_instances(
+                    [i['InstanceId'] for i in asg['Instances'] if i['LifecycleState'] == 'InService']
+                )
                 return {
                     'desired': asg['DesiredCapacity'],
                     'running': len([i for i in asg['Instances'] if i['LifecycleState'] == 'InService']),
@@ -97,67 +144,55 @@ class DualMetricAutoscaler:
         return {'desired': 0, 'running': 0, 'total': 0}
     
     def get_current_task_count(self, service_name):
-        try:
-            response = self.ecs.describe_services(
-                cluster=self.cluster_name,
-                services=[service_name]
+        """틱 스냅샷에서 desired 태스크 수 조회"""
+        return self.cluster_snapshot.desired_count(service_name)
+    
+    def get_metric_datapoints(self, namespace, metric_name, dimensions, period=300, minutes=5):
+        """get_metric_statistics 데이터포인트 조회 (메트릭 캐시 경유)"""
+        def load():
+            end_time = datetime.now()
+            start_time = end_time - timedelta(minutes=minutes)
+            response = self.cloudwatch.get_metric_statistics(
+                Namespace=namespace,
+                MetricName=metric_name,
+                Dimensions=dimensions,
+                StartTime=start_time,
+                EndTime=end_time,
+                Period=period,
+                Statistics=['Average', 'Maximum']
             )
-            return response['services'][0]['desiredCount']
-        except:
-            return 0
+            return response['Datapoints']
+        
+        return self.metric_cache.get_metric(namespace, metric_name, dimensions, period, load)
     
     def get_cpu_utilization(self, service_name):
-        end_time = datetime.now()
-        start_time = end_time - timedelta(minutes=5)
-        
-        # EC2 인스턴스 CPU 직접 조회
-        instance_ids = self.get_asg_instance_ids()
-        if instance_ids:
-            all_cpu_values = []
-            for instance_id in instance_ids:
-                try:
-                    response = self.cloudwatch.get_metric_statistics(
-                        Namespace='AWS/EC2',
-                        MetricName='CPUUtilization',
-                        Dimensions=[{'Name': 'InstanceId', 'Value': instance_id}],
-                        StartTime=start_time,
-                        EndTime=end_time,
-                        Period=300,
-                        Statistics=['Average', 'Maximum']
-                    )
-                    
-                    if response['Datapoints']:
-                        latest = max(response['Datapoints'], key=lambda x: x['Timestamp'])
-                        cpu_value = latest.get('Maximum', latest.get('Average', 0))
-                        all_cpu_values.append(cpu_value)
-                except Exception:
-                    pass
-            
-            if all_cpu_values:
-                return sum(all_cpu_values) / len(all_cpu_values)
+        """플릿 CPU → 서비스 CPU 순으로 조회 (둘 다 실패/데이터 없음이면 None - 추정값으로 스케일링하지 않음)"""
+        # EC2 플릿 CPU (인스턴스별 최대값의 평균을 메트릭 수식으로 한 번에 조회)
+        if self.fleet_cpu.instance_ids is None:
+            self.fleet_cpu.set_instances(self.get_asg_instance_ids())
+        try:
+            fleet = self.fleet_cpu.collect()
+            if fleet is not None:
+                return fleet['avg']
+        except Exception as e:
+            print(f"⚠️ 플릿 CPU 조회 실패: {e}", flush=True)
         
         # ECS 서비스 메트릭 시도
         try:
-            response = self.cloudwatch.get_metric_statistics(
-                Namespace='AWS/ECS',
-                MetricName='CPUUtilization',
-                Dimensions=[
+            datapoints = self.get_metric_datapoints(
+                'AWS/ECS', 'CPUUtilization',
+                [
                     {'Name': 'ServiceName', 'Value': service_name},
                     {'Name': 'ClusterName', 'Value': self.cluster_name}
-                ],
-                StartTime=start_time,
-                EndTime=end_time,
-                Period=300,
-                Statistics=['Average', 'Maximum']
+                ]
             )
             
-            if response['Datapoints']:
-                latest = max(response['Datapoints'], key=lambda x: x['Timestamp'])
-                return latest.get('Maximum', latest.get('Average', 0))
-        except Exception:
-            pass
-        
-        return 75.0  # 트래픽 있음 추정값
+            if datapoints:
+                latest = max(datapoints, key=lambda x: x['Timestamp'])
+                return latest.get('Maximum', latest.get('Average'))
+        except Exception as e:
+            print(f"⚠️ {service_name} CPU 조회 실패: {e}", flush=True)
+        return None
     
     def get_asg_instance_ids(self):
         try:
@@ -172,13 +207,14 @@ class DualMetricAutoscaler:
         return []
     
     def get_average_response_time(self, log_group_name):
+        """최근 로그 샘플의 평균 응답시간 (쿼리 실패/로그 없음/파싱 실패면 None - 추정값으로 스케일링하지 않음)"""
         end_time = datetime.now()
         start_time = end_time - timedelta(minutes=2)
         
-        query = """
+        query = f"""
         fields @timestamp, @message
         | sort @timestamp desc
-        | limit 100
+        | limit {self.log_sample_size}
         """
         
         try:
@@ -197,58 +233,33 @@ class DualMetricAutoscaler:
                 if result['status'] == 'Complete':
                     break
                 elif result['status'] == 'Failed':
-                    return 0.5
+                    return None
                 time.sleep(0.2)
                 wait_count += 1
             
             if result['status'] != 'Complete':
-                return 0.5
+                return None
             
             if len(result['results']) == 0:
-                return 0.4
-            
-            response_times = []
-            patterns = [
-                (r'\|\s*(\d+(?:\.\d+)?)ms\s*\|', 1000),
-                (r'\|\s*(\d+(?:\.\d+)?)µs\s*\|', 1000000),
-                (r'(\d+(?:\.\d+)?)ms', 1000),
-                (r'(\d+(?:\.\d+)?)µs', 1000000),
-            ]
+                return None
             
+            messages = []
             for log_entry in result['results']:
-                try:
-                    message = ""
-                    for field in log_entry:
-                        if field['field'] == '@message':
-                            message = field['value']
-                            break
-                    
-                    if not message:
-                        continue
-                    
-                    for pattern, divisor in patterns:
-                        matches = re.findall(pattern, message)
-                        for match in matches:
-                            try:
-                                time_value = float(match)
-                                time_seconds = time_value / divisor
-                                if 0.0001 <= time_seconds <= 60:
-                                    response_times.append(time_seconds)
-                                    break
-                            except ValueError:
-                                continue
-                        if response_times and len(response_times) >= 10:
-                            break
-                except Exception:
-                    continue
+                for field in log_entry:
+                    if field['field'] == '@message':
+                        messages.append(field['value'])
+                        break
+            
+            response_times = self.latency_parser.parse_batch(messages, stream=log_group_name)
             
             if response_times:
                 return mean(response_times)
             else:
-                return 0.6
+                return None
                 
-        except Exception:
-            return 0.5
+        except Exception as e:
+            print(f"⚠️ {log_group_name} 응답시간 조회 실패: {e}", flush=True)
+            return None
             
 
     
@@ -259,13 +270,19 @@ class DualMetricAutoscaler:
         desired_count = max(service_config['min_tasks'], 
                           min(service_config['max_tasks'], desired_count))
         
+        # 태스크가 PENDING으로 남지 않도록 필요한 인스턴스를 먼저 요청
+        if self.capacity_planner:
+            self.capacity_planner.ensure_capacity(service_name, self.get_current_task_count(service_name), desired_count)
+        
         try:
-            self.ecs.update_service(
+            response = self.ecs.update_service(
                 cluster=self.cluster_name,
                 service=service_name,
                 desiredCount=desired_count
             )
             
+            # 변경된 카운트를 스냅샷에 즉시 반영
+            self.cluster_snapshot.update(response.get('service'))
             service_config['last_scale_time'] = current_time
             print(f"✅ {service_name}: {desired_count}개 태스크로 스케일링 ({reason})", flush=True)
             return True
@@ -275,13 +292,13 @@ class DualMetricAutoscaler:
             return False
     
     def get_metrics_parallel(self, service_name, service_config):
-        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-            cpu_future = executor.submit(self.get_cpu_utilization, service_name)
-            response_future = executor.submit(self.get_average_response_time, service_config['log_group'])
-            
-            cpu_utilization = cpu_future.result(timeout=10)
-            avg_response_time = response_future.result(timeout=10)
-            
+        deadline = time.monotonic() + service_config.get('tick_deadline', self.tick_deadline)
+        cpu_future = self.metric_executor.submit(self.get_cpu_utilization, service_name)
+        response_future = self.metric_executor.submit(self.get_average_response_time, service_config['log_group'])
+        
+        cpu_utilization = cpu_future.result(timeout=max(0, deadline - time.monotonic()))
+        avg_response_time = response_future.result(timeout=max(0, deadline - time.monotonic()))
+        
         return cpu_utilization, avg_response_time
     
     def auto_scale_service(self, service_name):
@@ -291,91 +308,211 @@ class DualMetricAutoscaler:
         
         # 병렬로 메트릭 수집
         try:
-            cpu_utilization, avg_response_time = self.get_metrics_parallel(service_name, service_config)
+            with self.metrics.stage('metrics'):
+                cpu_utilization, avg_response_time = self.get_metrics_parallel(service_name, service_config)
         except concurrent.futures.TimeoutError:
             print(f"  ⏰ {service_name} 메트릭 수집 타임아웃", flush=True)
             return
         
+        if cpu_utilization is None or avg_response_time is None:
+            print(f"📭 {service_name}: 지표 없음 (조회 실패/스로틀링) - 평가 건너뜀", flush=True)
+            return
+        
         # 기본 상태 로깅 (한 줄로)
         print(f"{service_name}: {current_tasks}개 태스크, 응답시간: {avg_response_time:.6f}초, CPU: {cpu_utilization:.1f}%", flush=True)
         
-        # 스케일링 결정 로직
-        should_scale_up = False
-        scale_reason = ""
+        decision = self.decide_scaling(service_name, current_tasks, cpu_utilization, avg_response_time)
+        self.metrics.record_decision(service_name, current_tasks, decision)
+        self.journal_decision(service_name, current_tasks, cpu_utilization, avg_response_time, decision)
+        for message in decision['messages']:
+            print(message, flush=True)
+        if decision['new_count'] is not None:
+            self.scale_service(service_name, decision['new_count'], decision['reason'])
+    
+    def journal_decision(self, service_name, current_tasks, cpu_utilization, avg_response_time, decision):
+        """평가 1건을 결정 저널에 기록 (backtest 타임라인 필드 + 임계값/결정)"""
+        if self.journal is None:
+            return
+        service_config = self.services[service_name]
+        self.journal.record({
+            'type': 'decision',
+            'scaler': 'dual',
+            'tick': self.tick_id,
+            'service': service_name,
+            'tasks': current_tasks,
+            'cpu': cpu_utilization,
+            'p95': avg_response_time,
+            'thresholds': {
+                'response_time': service_config['response_time_threshold'],
+                'cpu': service_config['cpu_threshold'],
+                'violations': service_config['violation_threshold']
+            },
+            'decision': {
+                'stage': decision['stage'],
+                'new_count': decision['new_count'],
+                'reason': decision['reason'],
+                'violation_count': decision['violation_count']
+            }
+        })
+    
+    def decide_scaling(self, service_name, current_tasks, cpu_utilization, avg_response_time, now=None):
+        """
+        스케일링 결정 (AWS 호출/출력 없음 - 실시간 루프와 오프라인 리플레이 공용)
+        
+        위반 카운트는 갱신하지만 last_scale_time은 실제 스케일링 시점에 갱신
+        """
+        service_config = self.services[service_name]
+        now = time.time() if now is None else now
+        
+        # 스케일링 결정 (AND 조건) - 순수 정책 코어에 위임
+        state = {
+            'current_tasks': current_tasks,
+            'cpu': cpu_utilization,
+            'response_time': avg_response_time,
+            'violation_count': service_config['violation_count'],
+            'last_scale_time': service_config['last_scale_time'],
+            'now': now,
+            'cpu_threshold': service_config['cpu_threshold']
+        }
+        decision = self.policy.decide(service_config, state)
+        service_config['violation_count'] = decision['violation_count']
         
-        response_exceeded = avg_response_time > service_config['response_time_threshold']
-        cpu_exceeded = cpu_utilization > service_config['cpu_threshold']
+        messages = []
+        stage = decision['stage']
+        if stage in ('violation', 'cooldown', 'at_max', 'scale_up'):
+            scale_reason = self.policy.scale_up_reason(service_config, state)
+            messages.append(f"  🎯 {service_name} 스케일링 조건 만족 ({state['violation_count'] + 1}/{service_config['violation_threshold']}): {scale_reason}")
+        if stage == 'cooldown':
+            messages.append(f"  ⏳ {service_name} 스케일링 쿨다운 중 ({int(decision['cooldown_remaining'])}초 남음)")
+        elif stage == 'at_max':
+            messages.append(f"  ⚠️ 이미 최대 태스크 수 도달: {current_tasks}개")
+        elif stage == 'scale_up':
+            messages.append(f"  🔥 {decision['new_count'] - current_tasks}개 증가: {decision['reason']}")
+        elif stage == 'scale_down':
+            messages.append(f"  ⬇️ {decision['reason']}")
+        decision['messages'] = messages
         
-        if response_exceeded and cpu_exceeded:
-            should_scale_up = True
-            scale_reason = f"응답시간 {avg_response_time:.3f}s > {service_config['response_time_threshold']}s & CPU {cpu_utilization:.1f}% > {service_config['cpu_threshold']}%"
+        return decision
+    
+    def evaluate_services(self, service_names):
+        """서비스 평가 1회 (스냅샷 갱신 → 병렬 평가)"""
+        tick_start = time.monotonic()
+        self.tick_id += 1
+        with self.metrics.stage('snapshot'):
+            self.cluster_snapshot.refresh()
+        if self.capacity_planner:
+            with self.metrics.stage('capacity'):
+                # 샤드 워커는 클러스터 일부 서비스만 알므로 인스턴스 사용량 기준으로 반납 판단
+                desired_counts = None
+                if self.shard_count == 1:
+                    desired_counts = {name: self.get_current_task_count(name) for name in self.services}
+                self.capacity_planner.tick(desired_counts, self.cluster_snapshot.task_definitions())
         
-        # 스케일 업 (연속 조건 만족 체크)
-        if should_scale_up:
-            service_config['violation_count'] += 1
-            print(f"  🎯 {service_name} 스케일링 조건 만족 ({service_config['violation_count']}/{service_config['violation_threshold']}): {scale_reason}", flush=True)
-            
-            # 연속 위반 체크
-            if service_config['violation_count'] >= service_config['violation_threshold']:
-                # 쿨다운 체크
-                current_time = time.time()
-                cooldown_remaining = self.scale_up_cooldown - (current_time - service_config['last_scale_time'])
-                if cooldown_remaining > 0:
-                    print(f"  ⏳ {service_name} 스케일링 쿨다운 중 ({int(cooldown_remaining)}초 남음)", flush=True)
-                    return
-                
-                new_count = min(current_tasks + 1, service_config['max_tasks'])
-                
-                if new_count > current_tasks:
-                    print(f"  🔥 1개 증가: {scale_reason}", flush=True)
-                    self.scale_service(service_name, new_count, scale_reason)
-                    service_config['violation_count'] = 0  # 스케일링 후 리셋
-                else:
-                    print(f"  ⚠️ 이미 최대 태스크 수 도달: {current_tasks}개", flush=True)
-        else:
-            # 조건 만족하지 않으면 위반 카운트 리셋
-            service_config['violation_count'] = 0
-            
-            # 스케일 다운 (완화된 조건)
-            if (avg_response_time < 0.2 and 
-                cpu_utilization < 30 and 
-                current_tasks > service_config['min_tasks']):
-                
-                current_time = time.time()
-                if current_time - service_config['last_scale_time'] > 180:  # 3분 쿨다운
-                    new_count = max(service_config['min_tasks'], current_tasks - 1)
-                    reason = f"리소스 여유 (응답시간: {avg_response_time:.3f}s, CPU: {cpu_utilization:.1f}%)"
-                    print(f"  ⬇️ {reason}", flush=True)
-                    self.scale_service(service_name, new_count, reason)
+        # 서비스 병렬 평가 - 느린 서비스가 다른 서비스의 스케일링을 막지 않음
+        jobs = {
+            service_name: functools.partial(self.auto_scale_service, service_name)
+            for service_name in service_names
+        }
+        with self.metrics.stage('evaluate'):
+            status = self.tick_engine.run_tick(jobs)
+        for service_name, state in status.items():
+            if state == 'busy':
+                print(f"  ⏰ {service_name} 이전 평가 진행 중 - 건너뜀", flush=True)
+        tick_duration = time.monotonic() - tick_start
+        self.metrics.tick_duration.observe(value=tick_duration)
+        self.journal_tick(service_names, status, tick_duration)
+    
+    def journal_tick(self, service_names, status, tick_duration):
+        """틱 요약 (소요 시간, 서비스별 상태, 직전 틱 이후 API별 호출 수/평균 지연)을 결정 저널에 기록"""
+        if self.journal is None:
+            return
+        api_stats = LIMITER.stats()
+        self.journal.record({
+            'type': 'tick',
+            'scaler': 'dual',
+            'tick': self.tick_id,
+            'services': list(service_names),
+            'status': status,
+            'duration': round(tick_duration, 3),
+            'api': api_latency_delta(self.last_api_stats, api_stats)
+        })
+        self.last_api_stats = api_stats
+    
+    def wait_for_next_poll(self):
+        """다음 폴링까지 대기 - 트리거가 오면 해당 서비스를 즉시 평가하고 계속 대기"""
+        if self.trigger_server is None:
+            time.sleep(self.poll_interval)
+            return
+        
+        deadline = time.time() + self.poll_interval
+        while True:
+            triggered = self.trigger_server.wait(max(0, deadline - time.time()))
+            if not triggered:
+                return
+            # 알람은 최신 데이터포인트 기준이므로 해당 서비스의 캐시된 메트릭만 버리고 다시 조회
+            self.metric_cache.invalidate('ServiceName', sorted(triggered))
+            self.evaluate_services(sorted(triggered))
     
     def run(self):
         print("이중 메트릭 오토스케일러 시작 (AND 조건: 응답시간 & CPU 모두 초과시 스케일링 - 연속 2번 위반시 스케일링)", flush=True)
         print(f"모니터링 서비스: {list(self.services.keys())}", flush=True)
+        if self.shard_count > 1:
+            print(f"🧩 {self.cluster_name} 샤드 {self.shard_index}/{self.shard_count} ({len(self.services)}개 서비스)", flush=True)
+        if self.trigger_server:
+            self.trigger_server.start()
+        if self.metrics_server:
+            self.metrics_server.start()
         
         while True:
             try:
                 print(f"\n=== {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===", flush=True)
                 
                 # 인스턴스 상태 표시
-                instance_info = self.get_current_instance_count()
-                print(f"💻 인스턴스: {instance_info['running']}/{instance_info['desired']}개", flush=True)
+                with self.metrics.stage('instances'):
+                    instance_info = self.get_current_instance_count()
+                print(f"💻 인스턴스: {instance_info['running']}/{instance_info['desired']}개 | 📦 {self.metric_cache.format_stats()} | 🌐 {LIMITER.format_stats()}", flush=True)
                 
-                for service_name in self.services.keys():
-                    self.auto_scale_service(service_name)
+                self.evaluate_services(list(self.services.keys()))
                 
-                time.sleep(1)   # 1초마다 체크
+                self.wait_for_next_poll()   # 트리거 없으면 1초마다 체크
                 
             except KeyboardInterrupt:
                 print("\n오토스케일러 종료", flush=True)
+                self.tick_engine.shutdown()
+                self.metric_executor.shutdown(wait=False, cancel_futures=True)
+                self.metric_cache.shutdown()
+                if self.trigger_server:
+                    self.trigger_server.stop()
+                if self.metrics_server:
+                    self.metrics_server.stop()
+                if self.journal:
+                    self.journal.close()
                 break
             except Exception as e:
                 print(f"오류 발생: {e}", flush=True)
                 time.sleep(60)
 
 def main():
+    args = parse_worker_args('이중 메트릭 ECS 오토스케일러')
+    if args.lease_table:
+        print("⚠️ --lease-table은 SmartTrafficAutoscaler(ecs_svc_scaling.py) 전용 - 무시합니다", flush=True)
+    # 같은 계정의 워커끼리 API 한도를 나눠 씀
+    LIMITER.share /= max(1, args.workers)
+    cluster_config = ServiceRegistry(config_path=args.config).cluster(args.cluster)
+    suffix = f"-{args.cluster}-{args.shard_index}" if args.workers > 1 else ""
+    
     autoscaler = DualMetricAutoscaler(
-        cluster_name="apdev-ecs-cluster",
-        asg_name="apdev-ecs-asg"
+        cluster_name=args.cluster,
+        asg_name=cluster_config.get('asg'),
+        target_tracking=args.target_tracking,
+        trigger_port=args.trigger_port + 1 + 10 * args.worker_index if args.trigger_port else None,
+        trigger_host=args.trigger_host,
+        trigger_token=args.trigger_token,
+        metrics_port=9102 + 10 * args.worker_index,
+        journal_path=f"/home/ec2-user/apdev/logs/decisions-dual{suffix}.jsonl",
+        config_path=args.config,
+        shard_index=args.shard_index,
+        shard_count=args.shard_count
     )
     autoscaler.run()
 
@@ -0,0 +1,130 @@
+"""
+응답시간 로그 파서
+스트림별로 로그 형식(GIN 텍스트, JSON)을 한 번만 판별하고 미리 컴파일한 정규식으로 일괄 추출
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# GIN: [GIN] 2025/01/01 - 12:00:00 | 200 |    1.234567ms |   10.0.0.1 | GET "/v1/product"
+GIN_PATTERN = re.compile(r'\|\s*(\d+(?:\.\d+)?)(ns|µs|us|ms|s)\s*\|')
+# JSON: {"latency": 0.123, ...} / {"response_time": 0.123} / {"duration": 0.123}
+# 필드 목록/단위는 Logs Insights p95 쿼리(logs_insights.P95_QUERY)와 공유
+JSON_LATENCY_FIELDS = ('latency', 'response_time', 'duration')
+JSON_LATENCY_UNIT = 1.0  # JSON 응답시간 값 1 = 1초
+JSON_PATTERN = re.compile(r'"(?:' + '|'.join(JSON_LATENCY_FIELDS) + r')"\s*:\s*"?(\d+(?:\.\d+)?)')
+# 기타 텍스트: "... took 12.3ms"
+TEXT_PATTERN = re.compile(r'(\d+(?:\.\d+)?)(µs|us|ms)\b')
+
+UNIT_SECONDS = {'ns': 1e-9, 'µs': 1e-6, 'us': 1e-6, 'ms': 1e-3, 's': 1.0}
+
+
+def detect_format(message: str) -> Optional[str]:
+    """로그 한 줄의 형식 판별"""
+    if message.startswith('[GIN]') or GIN_PATTERN.search(message):
+        return 'gin'
+    if message.lstrip().startswith('{') and JSON_PATTERN.search(message):
+        return 'json'
+    if TEXT_PATTERN.search(message):
+        return 'text'
+    return None
+
+
+class LatencyParser:
+    def __init__(self, min_seconds: float = 0.0001, max_seconds: float = 60,
+                 json_unit: float = JSON_LATENCY_UNIT):
+        """
+        응답시간 파서 초기화
+
+        Args:
+            min_seconds: 유효 응답시간 하한 (초)
+            max_seconds: 유효 응답시간 상한 (초)
+            json_unit: JSON 응답시간 값의 단위 (기본값 JSON_LATENCY_UNIT, ms 단위 로그면 0.001)
+        """
+        self.min_seconds = min_seconds
+        self.max_seconds = max_seconds
+        self.json_unit = json_unit
+        self.stream_formats = {}  # {스트림 키: 형식}
+        self.parsed = 0
+        self.skipped = 0
+
+    def detect(self, messages: List[str], stream: Optional[str] = None) -> Optional[str]:
+        """
+        스트림 형식 판별 (스트림 키가 있으면 결과를 캐시)
+
+        앞쪽 메시지 중 처음으로 판별되는 형식을 스트림 전체 형식으로 사용
+        """
+        if stream is not None and stream in self.stream_formats:
+            return self.stream_formats[stream]
+
+        for message in messages[:20]:
+            fmt = detect_format(message)
+            if fmt:
+                if stream is not None:
+                    self.stream_formats[stream] = fmt
+                return fmt
+        return None
+
+    # extract_* 는 (메시지 인덱스, 초) 쌍을 반환
+    def extract_gin(self, messages: Iterable[str]) -> List[Tuple[int, float]]:
+        values = []
+        search = GIN_PATTERN.search
+        for index, message in enumerate(messages):
+            match = search(message)
+            if match:
+                values.append((index, float(match.group(1)) * UNIT_SECONDS[match.group(2)]))
+        return values
+
+    def extract_json(self, messages: Iterable[str]) -> List[Tuple[int, float]]:
+        values = []
+        search = JSON_PATTERN.search
+        unit = self.json_unit
+        for index, message in enumerate(messages):
+            match = search(message)
+            if match:
+                values.append((index, float(match.group(1)) * unit))
+        return values
+
+    def extract_text(self, messages: Iterable[str]) -> List[Tuple[int, float]]:
+        values = []
+        search = TEXT_PATTERN.search
+        for index, message in enumerate(messages):
+            match = search(message)
+            if match:
+                values.append((index, float(match.group(1)) * UNIT_SECONDS[match.group(2)]))
+        return values
+
+    def parse_indexed(self, messages: List[str], stream: Optional[str] = None) -> List[Tuple[int, float]]:
+        """
+        메시지 묶음에서 응답시간 추출
+
+        Args:
+            messages: 로그 메시지 리스트
+            stream: 형식 캐시 키 (로그 그룹 이름 등)
+
+        Returns:
+            유효 범위 안의 (메시지 인덱스, 응답시간(초)) 리스트
+        """
+        fmt = self.detect(messages, stream)
+        if fmt is None:
+            self.skipped += len(messages)
+            return []
+
+        extract = getattr(self, f'extract_{fmt}')
+        low, high = self.min_seconds, self.max_seconds
+        values = [(index, value) for index, value in extract(messages) if low <= value <= high]
+        self.parsed += len(values)
+        self.skipped += len(messages) - len(values)
+        return values
+
+    def parse_batch(self, messages: List[str], stream: Optional[str] = None) -> List[float]:
+        """메시지 묶음에서 응답시간(초)만 추출"""
+        return [value for _, value in self.parse_indexed(messages, stream)]
+
+    def parse(self, message: str, stream: Optional[str] = None) -> Optional[float]:
+        """로그 한 줄 파싱 (스트리밍 수집기용)"""
+        values = self.parse_batch([message], stream)
+        return values[0] if values else None
+
+    def stats(self) -> Dict[str, int]:
+        return {'parsed': self.parsed, 'skipped': self.skipped}
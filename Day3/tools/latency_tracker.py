@@ -0,0 +1,175 @@
+"""
+스트리밍 응답시간 추적기
+로그 그룹별 커서로 새 이벤트만 읽어 슬라이딩 윈도우 분위수 스케치에 누적
+"""
+
+import math
+import threading
+import time
+from typing import Dict, List, Optional
+
+from latency_parser import LatencyParser
+
+
+class QuantileSketch:
+    """
+    상대 오차가 보장되는 로그 버킷 분위수 스케치 (DDSketch 방식)
+
+    값 v는 ceil(log(v) / log(gamma)) 버킷에 들어가며, 같은 파라미터의
+    스케치끼리는 버킷 카운트를 더하는 것만으로 병합할 수 있다.
+    """
+
+    __slots__ = ('gamma', 'log_gamma', 'buckets', 'count')
+
+    def __init__(self, relative_accuracy: float = 0.02):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.count = 0
+
+    def add(self, value: float, weight: int = 1):
+        index = math.ceil(math.log(value) / self.log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + weight
+        self.count += weight
+
+    def merge(self, other: 'QuantileSketch'):
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        # 기존 p95 계산(sorted[int(n * q)])과 같은 순위 정의
+        rank = min(int(q * self.count), self.count - 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # 버킷 [gamma^(i-1), gamma^i] 의 대표값
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+
+class SlidingQuantileWindow:
+    """
+    고정 길이 슬롯 스케치의 링 버퍼
+
+    각 슬롯은 slot_seconds 동안의 값을 담고, 윈도우 조회는 최근 슬롯들을 병합한다.
+    조회 비용은 (슬롯 수 × 버킷 수)로 제한되어 이벤트 수와 무관하다.
+    """
+
+    def __init__(self, horizon_seconds: int = 600, slot_seconds: int = 10, relative_accuracy: float = 0.02):
+        self.slot_seconds = slot_seconds
+        self.slot_count = max(1, horizon_seconds // slot_seconds)
+        self.relative_accuracy = relative_accuracy
+        self.slots = [QuantileSketch(relative_accuracy) for _ in range(self.slot_count)]
+        self.slot_ids = [-1] * self.slot_count
+
+    def add(self, timestamp: float, value: float):
+        slot_id = int(timestamp // self.slot_seconds)
+        position = slot_id % self.slot_count
+        if self.slot_ids[position] != slot_id:
+            if slot_id < self.slot_ids[position]:
+                return  # 윈도우 밖의 오래된 이벤트
+            self.slots[position] = QuantileSketch(self.relative_accuracy)
+            self.slot_ids[position] = slot_id
+        self.slots[position].add(value)
+
+    def sketch(self, window_seconds: int, now: Optional[float] = None) -> QuantileSketch:
+        """최근 window_seconds 구간을 병합한 스케치"""
+        now = time.time() if now is None else now
+        newest = int(now // self.slot_seconds)
+        oldest = newest - min(self.slot_count, max(1, math.ceil(window_seconds / self.slot_seconds))) + 1
+        merged = QuantileSketch(self.relative_accuracy)
+        for position, slot_id in enumerate(self.slot_ids):
+            if oldest <= slot_id <= newest:
+                merged.merge(self.slots[position])
+        return merged
+
+    def quantile(self, q: float, window_seconds: int, now: Optional[float] = None) -> Optional[float]:
+        return self.sketch(window_seconds, now).quantile(q)
+
+
+class LatencyTracker:
+    def __init__(self, logs, log_groups: List[str], horizon_seconds: int = 600,
+                 backfill_seconds: int = 120, overlap_seconds: int = 5, max_pages: int = 20):
+        """
+        스트리밍 응답시간 추적기 초기화
+
+        Args:
+            logs: boto3 CloudWatch Logs 클라이언트
+            log_groups: 추적할 로그 그룹 리스트
+            horizon_seconds: 보관할 최대 윈도우 (초)
+            backfill_seconds: 최초 조회시 거슬러 올라갈 시간 (초)
+            overlap_seconds: 수집 지연/스트림 간 순서 차이를 흡수하기 위해 다시 읽는 구간 (초)
+            max_pages: 한 번의 poll에서 읽을 최대 페이지 수
+        """
+        self.logs = logs
+        self.parser = LatencyParser()
+        self.overlap_ms = overlap_seconds * 1000
+        self.max_pages = max_pages
+        self.lock = threading.Lock()
+        start_ms = int((time.time() - backfill_seconds) * 1000)
+        self.windows = {log_group: SlidingQuantileWindow(horizon_seconds) for log_group in log_groups}
+        # 로그 그룹별 커서: 마지막 이벤트 시각(ms)과 겹침 구간에서 이미 처리한 {eventId: 시각}
+        self.cursors = {log_group: {'timestamp': start_ms, 'seen': {}} for log_group in log_groups}
+        self.events_read = 0
+
+    def poll_log_group(self, log_group: str) -> int:
+        """커서 이후의 새 이벤트만 읽어 스케치에 반영, 처리한 이벤트 수 반환"""
+        cursor = self.cursors[log_group]
+        seen = cursor['seen']
+        params = {'logGroupName': log_group, 'startTime': max(0, cursor['timestamp'] - self.overlap_ms)}
+        window = self.windows[log_group]
+        newest = cursor['timestamp']
+        processed = 0
+
+        for _ in range(self.max_pages):
+            response = self.logs.filter_log_events(**params)
+            events = []
+            for event in response.get('events', []):
+                if event['eventId'] in seen:
+                    continue
+                seen[event['eventId']] = event['timestamp']
+                newest = max(newest, event['timestamp'])
+                events.append(event)
+
+            # 새 이벤트만 한 번에 파싱
+            latencies = self.parser.parse_indexed([event.get('message', '') for event in events], log_group)
+            with self.lock:
+                for index, latency in latencies:
+                    window.add(events[index]['timestamp'] / 1000, latency)
+            processed += len(events)
+
+            if not response.get('nextToken'):
+                break
+            params['nextToken'] = response['nextToken']
+
+        # 겹침 구간 밖의 eventId는 다시 읽히지 않으므로 정리
+        cursor['timestamp'] = newest
+        cutoff = newest - self.overlap_ms
+        for event_id in [event_id for event_id, timestamp in seen.items() if timestamp < cutoff]:
+            del seen[event_id]
+
+        self.events_read += processed
+        return processed
+
+    def poll(self) -> Dict[str, Optional[int]]:
+        """모든 로그 그룹 증분 조회 (로그 그룹별 처리한 이벤트 수, 조회 실패면 None)"""
+        processed = {}
+        for log_group in self.windows:
+            try:
+                processed[log_group] = self.poll_log_group(log_group)
+            except Exception as e:
+                print(f"  ⚠️ {log_group} 로그 조회 실패: {e}", flush=True)
+                processed[log_group] = None
+        return processed
+
+    def percentile(self, log_group: str, q: float = 0.95, window_seconds: int = 120) -> Optional[float]:
+        """최근 window_seconds 구간의 분위수 (데이터 없으면 None)"""
+        window = self.windows.get(log_group)
+        if window is None:
+            return None
+        with self.lock:
+            return window.quantile(q, window_seconds)
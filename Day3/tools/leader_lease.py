@@ -0,0 +1,242 @@
+"""
+DynamoDB 리스 기반 리더 선출
+여러 오토스케일러 복제본 중 리스를 가진 1개만 스케일링하고 (active/passive), 나머지는 메트릭/히스토리만 갱신하며 대기
+리스는 조건부 UpdateItem으로만 획득/갱신하고, 리더가 죽으면 lease_seconds 안에 대기 복제본이 넘겨받음
+리더는 ECS 쓰기 직전에 fence()로 owner/term을 DynamoDB에서 다시 확인 (멈췄다 깨어난 이전 리더의 쓰기 차단)
+DynamoDB Local로 테스트할 때는 DYNAMODB_ENDPOINT=http://localhost:8000 지정
+"""
+
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+
+from botocore.exceptions import ClientError
+
+from aws_client import api_client
+
+
+def lease_client(region_name: str = 'ap-northeast-2'):
+    """리스용 DynamoDB 클라이언트 (DYNAMODB_ENDPOINT가 있으면 DynamoDB Local 사용)"""
+    return api_client('dynamodb', region_name=region_name, endpoint_url=os.environ.get('DYNAMODB_ENDPOINT'))
+
+
+def ensure_table(dynamodb, table_name: str, wait: float = 30) -> bool:
+    """리스 테이블이 없으면 생성 (파티션 키 lease, 온디맨드)"""
+    try:
+        dynamodb.describe_table(TableName=table_name)
+        return True
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') != 'ResourceNotFoundException':
+            raise
+
+    print(f"🗝️ 리스 테이블 생성: {table_name}", flush=True)
+    dynamodb.create_table(
+        TableName=table_name,
+        AttributeDefinitions=[{'AttributeName': 'lease', 'AttributeType': 'S'}],
+        KeySchema=[{'AttributeName': 'lease', 'KeyType': 'HASH'}],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    deadline = time.time() + wait
+    while time.time() < deadline:
+        status = dynamodb.describe_table(TableName=table_name)['Table']['TableStatus']
+        if status == 'ACTIVE':
+            return True
+        time.sleep(1)
+    return False
+
+
+def is_condition_failure(error: ClientError) -> bool:
+    return error.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException'
+
+
+class LeaderLease:
+    def __init__(self, dynamodb, table_name: str, lease_name: str, owner_id: Optional[str] = None,
+                 lease_seconds: float = 10, renew_interval: float = 2, safety_margin: float = 2):
+        """
+        리더 리스 초기화
+
+        Args:
+            dynamodb: boto3 DynamoDB 클라이언트 (저수준)
+            table_name: 리스 테이블 이름 (파티션 키 'lease')
+            lease_name: 리스 키 (클러스터/샤드별로 하나)
+            owner_id: 이 복제본 식별자 (기본값: 호스트:PID:임의값)
+            lease_seconds: 리스 유효 시간 - 리더가 죽었을 때 넘겨받기까지 최대 시간 (초)
+            renew_interval: 갱신/획득 시도 간격 (초)
+            safety_margin: 리스 만료 이 시간 전부터는 갱신에 실패하면 스스로 리더가 아닌 것으로 봄 (초, 복제본 간 시계 오차 대비)
+        """
+        self.dynamodb = dynamodb
+        self.table_name = table_name
+        self.lease_name = lease_name
+        self.owner_id = owner_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_seconds = lease_seconds
+        self.renew_interval = renew_interval
+        self.safety_margin = safety_margin
+
+        self.term = 0              # 리더가 바뀔 때마다 1씩 증가하는 펜싱 번호
+        self.valid_until = 0.0     # 로컬 monotonic 기준 리더십 유효 시각
+        self.leader = False
+        self.listeners = []        # listener(is_leader: bool, term: int)
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self.loop, name='leader-lease', daemon=True)
+
+    def subscribe(self, listener: Callable[[bool, int], None]):
+        self.listeners.append(listener)
+
+    def is_leader(self) -> bool:
+        """리스를 갖고 있고 로컬 기준으로도 아직 유효한지 (스케일링 직전에 확인)"""
+        with self.lock:
+            return self.leader and time.monotonic() < self.valid_until
+
+    def fence(self) -> bool:
+        """
+        쓰기 직전 펜싱 확인 - 리스의 owner가 자신이고 term이 그대로일 때만 만료 시각을 연장 (조건부 UpdateItem 1회)
+
+        is_leader()는 로컬 판단이라 리스를 넘겨받은 다른 복제본이 있어도 safety_margin 안에서는 True일 수 있다.
+        ECS/ASG 쓰기 바로 앞에서 호출해 DynamoDB 기준으로 아직 같은 term의 리더인지 확인한다.
+
+        Returns:
+            확인되면 True, 조건 실패(다른 복제본이 리더)나 확인 불가(스로틀링/네트워크 오류)면 False
+        """
+        with self.lock:
+            if not (self.leader and time.monotonic() < self.valid_until):
+                return False
+            term = self.term
+
+        started = time.monotonic()
+        now = time.time()
+        try:
+            self.dynamodb.update_item(
+                TableName=self.table_name,
+                Key={'lease': {'S': self.lease_name}},
+                UpdateExpression='SET expires_at = :expires',
+                ConditionExpression='#owner = :me AND term = :term AND expires_at > :now',
+                ExpressionAttributeNames={'#owner': 'owner'},
+                ExpressionAttributeValues={':me': {'S': self.owner_id}, ':term': {'N': str(term)},
+                                           ':now': {'N': repr(now)}, ':expires': {'N': repr(now + self.lease_seconds)}}
+            )
+        except ClientError as e:
+            if is_condition_failure(e):
+                print(f"⛔ 펜싱 실패: {self.lease_name} term {term} - 다른 복제본이 리스를 가졌거나 만료됨", flush=True)
+                self.set_leader(False)
+                return False
+            print(f"⚠️ 펜싱 확인 실패: {e}", flush=True)
+            return False
+        except Exception as e:
+            print(f"⚠️ 펜싱 확인 실패: {e}", flush=True)
+            return False
+
+        with self.lock:
+            if self.term != term:
+                return False
+            self.valid_until = started + self.lease_seconds - self.safety_margin
+        return True
+
+    def try_acquire(self) -> bool:
+        """
+        리스 획득 또는 갱신 1회
+
+        - 리더: owner가 자신일 때만 만료 시각 연장
+        - 대기: 리스가 없거나 만료된 경우(또는 로컬 유효 시각이 지난 자신의 리스)에만 owner를 자신으로 바꾸고 term 증가
+
+        Returns:
+            이번 시도 후 리더 여부
+        """
+        started = time.monotonic()
+        now = time.time()
+        expires_at = now + self.lease_seconds
+        if self.leader:
+            condition = '#owner = :me'
+            update = 'SET expires_at = :expires'
+        else:
+            condition = 'attribute_not_exists(#owner) OR expires_at < :now OR #owner = :me'
+            update = 'SET #owner = :me, expires_at = :expires ADD term :one'
+        values = {':me': {'S': self.owner_id}, ':expires': {'N': repr(expires_at)}}
+        if not self.leader:
+            values.update({':now': {'N': repr(now)}, ':one': {'N': '1'}})
+
+        try:
+            response = self.dynamodb.update_item(
+                TableName=self.table_name,
+                Key={'lease': {'S': self.lease_name}},
+                UpdateExpression=update,
+                ConditionExpression=condition,
+                ExpressionAttributeNames={'#owner': 'owner'},
+                ExpressionAttributeValues=values,
+                ReturnValues='ALL_NEW'
+            )
+        except ClientError as e:
+            if is_condition_failure(e):
+                return self.set_leader(False)
+            print(f"⚠️ 리스 갱신 실패: {e}", flush=True)
+            return self.expire_if_needed()
+        except Exception as e:
+            # 스로틀링/네트워크 오류 - 로컬 유효 시각까지는 리더 유지하고 다음 간격에 다시 시도
+            print(f"⚠️ 리스 갱신 실패: {e}", flush=True)
+            return self.expire_if_needed()
+
+        term = int(response['Attributes'].get('term', {}).get('N', self.term))
+        with self.lock:
+            # 요청을 보낸 시각 기준으로 유효 시간을 잡아 네트워크 지연만큼 보수적으로 계산
+            self.valid_until = started + self.lease_seconds - self.safety_margin
+            self.term = term
+        return self.set_leader(True)
+
+    def expire_if_needed(self) -> bool:
+        """갱신하지 못한 채 로컬 유효 시각이 지났으면 리더 해제"""
+        if self.leader and not self.is_leader():
+            return self.set_leader(False)
+        return self.is_leader()
+
+    def set_leader(self, leader: bool) -> bool:
+        with self.lock:
+            changed = leader != self.leader
+            self.leader = leader
+            if not leader:
+                self.valid_until = 0.0
+            term = self.term
+        if changed:
+            if leader:
+                print(f"👑 리더 획득: {self.lease_name} (term {term}, {self.owner_id})", flush=True)
+            else:
+                print(f"💤 대기 모드: {self.lease_name} 리더 아님 (평가만 계속)", flush=True)
+            for listener in self.listeners:
+                try:
+                    listener(leader, term)
+                except Exception as e:
+                    print(f"⚠️ 리더 변경 처리 실패: {e}", flush=True)
+        return leader
+
+    def loop(self):
+        while not self.stopping.is_set():
+            self.try_acquire()
+            self.stopping.wait(self.renew_interval)
+
+    def start(self):
+        """첫 획득 시도를 동기로 하고 백그라운드 갱신 시작"""
+        self.try_acquire()
+        self.thread.start()
+
+    def release(self):
+        """정상 종료시 리스를 즉시 만료시켜 대기 복제본이 다음 시도에서 바로 넘겨받게 함"""
+        self.stopping.set()
+        # 진행 중인 갱신 응답이 반납 뒤에 도착해 다시 리더로 표시하지 않도록 갱신 스레드가 끝날 때까지 대기
+        if self.thread.is_alive():
+            self.thread.join(self.lease_seconds)
+        if not self.leader:
+            return
+        self.set_leader(False)
+        try:
+            self.dynamodb.update_item(
+                TableName=self.table_name,
+                Key={'lease': {'S': self.lease_name}},
+                UpdateExpression='SET expires_at = :zero',
+                ConditionExpression='#owner = :me',
+                ExpressionAttributeNames={'#owner': 'owner'},
+                ExpressionAttributeValues={':me': {'S': self.owner_id}, ':zero': {'N': '0'}}
+            )
+        except Exception as e:
+            print(f"⚠️ 리스 반납 실패: {e}", flush=True)
@@ -0,0 +1,247 @@
+"""
+Logs Insights 응답시간 쿼리
+모든 서비스 로그 그룹을 start_query 한 번(50개 그룹 단위)으로 조회하고 p95를 서버에서 계산
+InsightsQueryScheduler는 쿼리를 틱 사이에 미리 시작해 결정 스레드를 막지 않음
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from latency_parser import JSON_LATENCY_FIELDS, JSON_LATENCY_UNIT
+
+# GIN 텍스트 로그(| 1.23ms |)와 JSON 로그를 모두 처리 (JSON 필드/단위는 latency_parser와 같음)
+# @log 값은 "계정ID:로그그룹" 형식이므로 결과를 로그 그룹별로 분리할 수 있음
+P95_QUERY = r"""
+fields @log
+| filter @message like /ms|µs|{json_filter}/
+| parse @message /(?<lat_ms>\d+(?:\.\d+)?)ms/
+| parse @message /(?<lat_us>\d+(?:\.\d+)?)µs/
+| fields coalesce(lat_ms / 1000, lat_us / 1000000, {json_seconds}) as latency_s
+| filter latency_s >= 0.001 and latency_s <= 10
+| stats pct(latency_s, 95) as p95, count() as samples by @log
+""".format(
+    json_filter='|'.join(JSON_LATENCY_FIELDS),
+    json_seconds=', '.join(f"{field} * {JSON_LATENCY_UNIT}" for field in JSON_LATENCY_FIELDS)
+)
+
+# start_query 요청당 최대 로그 그룹 수
+MAX_LOG_GROUPS_PER_QUERY = 50
+
+
+class LatencyInsightsQuery:
+    def __init__(self, logs, minutes: int = 2, max_wait: float = 5.0, poll_interval: float = 0.2):
+        """
+        p95 응답시간 쿼리 초기화
+
+        Args:
+            logs: boto3 CloudWatch Logs 클라이언트
+            minutes: 조회 범위 (분)
+            max_wait: 쿼리 완료 최대 대기 시간 (초)
+            poll_interval: 결과 확인 간격 (초)
+        """
+        self.logs = logs
+        self.minutes = minutes
+        self.max_wait = max_wait
+        self.poll_interval = poll_interval
+        self.wait_observers = []   # observer(시작부터 종료까지 초, 상태)
+
+    def observe_wait(self, seconds: float, status: str):
+        for observer in self.wait_observers:
+            observer(seconds, status)
+
+    def start(self, log_groups: List[str]) -> List[str]:
+        """모든 로그 그룹에 대한 쿼리 시작 (50개 그룹마다 1개) 후 queryId 리스트 반환"""
+        end_time = datetime.now(timezone.utc)
+        start_time = end_time - timedelta(minutes=self.minutes)
+        query_ids = []
+        for offset in range(0, len(log_groups), MAX_LOG_GROUPS_PER_QUERY):
+            response = self.logs.start_query(
+                logGroupNames=log_groups[offset:offset + MAX_LOG_GROUPS_PER_QUERY],
+                startTime=int(start_time.timestamp()),
+                endTime=int(end_time.timestamp()),
+                queryString=P95_QUERY
+            )
+            query_ids.append(response['queryId'])
+        return query_ids
+
+    @staticmethod
+    def parse_results(results: List[List[Dict]]) -> Dict[str, Dict[str, float]]:
+        """
+        stats 결과를 로그 그룹별로 분리
+
+        Returns:
+            {로그 그룹: {'p95': 초, 'samples': 건수}}
+        """
+        latencies = {}
+        for row in results:
+            fields = {field['field']: field['value'] for field in row}
+            log_group = fields.get('@log', '').split(':', 1)[-1]
+            if not log_group:
+                continue
+            try:
+                latencies[log_group] = {
+                    'p95': float(fields.get('p95', 0)),
+                    'samples': int(float(fields.get('samples', 0)))
+                }
+            except ValueError:
+                continue
+        return latencies
+
+    def run(self, log_groups: List[str]) -> Dict[str, Dict[str, float]]:
+        """
+        쿼리를 실행하고 완료될 때까지 대기
+
+        Returns:
+            {로그 그룹: {'p95': 초, 'samples': 건수}}, 실패/타임아웃시 None (지표 없음)
+        """
+        if not log_groups:
+            return {}
+
+        try:
+            pending = self.start(log_groups)
+            started = time.monotonic()
+            deadline = started + self.max_wait
+            latencies = {}
+            while True:
+                for query_id in list(pending):
+                    result = self.logs.get_query_results(queryId=query_id)
+                    if result['status'] in ('Complete', 'Failed', 'Cancelled', 'Timeout'):
+                        self.observe_wait(time.monotonic() - started, result['status'])
+                    if result['status'] == 'Complete':
+                        latencies.update(self.parse_results(result['results']))
+                        pending.remove(query_id)
+                    elif result['status'] in ('Failed', 'Cancelled', 'Timeout'):
+                        # 일부 그룹만 결과가 있으면 나머지가 0초로 보이므로 전체를 '지표 없음' 처리
+                        return None
+                if not pending:
+                    return latencies
+                if time.monotonic() >= deadline:
+                    self.observe_wait(time.monotonic() - started, 'ClientTimeout')
+                    return None
+                time.sleep(self.poll_interval)
+        except Exception as e:
+            print(f"  ⚠️ 응답시간 쿼리 실패: {e}", flush=True)
+            return None
+
+
+class InsightsQueryScheduler:
+    """
+    파이프라인 방식의 비동기 p95 쿼리 스케줄러
+
+    틱마다 request()로 다음 틱에 쓸 쿼리를 미리 시작하고, 백그라운드 스레드가
+    백오프 간격으로 결과를 확인한다. 결정 시점에는 latest()로 가장 최근에 완료된
+    결과와 그 나이를 받으므로 쿼리가 늦어져도 응답시간이 0으로 바뀌지 않는다.
+    max_age보다 오래된 결과는 돌려주지 않는다 (쿼리가 계속 실패하면 '지표 없음').
+    """
+
+    def __init__(self, query: LatencyInsightsQuery, min_backoff: float = 0.2,
+                 max_backoff: float = 2.0, query_timeout: float = 60.0, max_age: Optional[float] = None):
+        """
+        Args:
+            query: 쿼리 시작/결과 파싱에 사용할 LatencyInsightsQuery
+            min_backoff: 첫 결과 확인 간격 (초)
+            max_backoff: 최대 결과 확인 간격 (초)
+            query_timeout: 이 시간 안에 끝나지 않은 쿼리는 포기 (초)
+            max_age: 이보다 오래된 결과는 사용하지 않음 (초, None이면 제한 없음)
+        """
+        self.query = query
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.query_timeout = query_timeout
+        self.max_age = max_age
+        self.condition = threading.Condition()
+        self.pending = None       # ([queryId, ...], 시작 시각)
+        self.result = None        # 마지막 완료 결과
+        self.result_time = None   # 마지막 완료 쿼리의 시작 시각
+        self.stopped = False
+        self.thread = threading.Thread(target=self.poll_loop, name='insights-poller', daemon=True)
+        self.thread.start()
+
+    def request(self, log_groups: List[str]) -> bool:
+        """다음 쿼리 시작 (이전 쿼리가 진행 중이면 건너뜀)"""
+        with self.condition:
+            if self.pending is not None:
+                return False
+        try:
+            query_ids = self.query.start(log_groups)
+        except Exception as e:
+            print(f"  ⚠️ 응답시간 쿼리 시작 실패: {e}", flush=True)
+            return False
+        if not query_ids:
+            return False
+        with self.condition:
+            self.pending = (query_ids, time.time())
+            self.condition.notify()
+        return True
+
+    def latest(self) -> Tuple[Optional[Dict[str, Dict[str, float]]], Optional[float]]:
+        """
+        가장 최근에 완료된 결과와 나이(초)
+
+        Returns:
+            (결과, 나이), 아직 완료된 쿼리가 없으면 (None, None), max_age보다 오래됐으면 (None, 나이)
+        """
+        with self.condition:
+            if self.result is None:
+                return None, None
+            age = time.time() - self.result_time
+            if self.max_age is not None and age > self.max_age:
+                return None, age
+            return self.result, age
+
+    def poll_loop(self):
+        """진행 중인 쿼리를 백오프 간격으로 확인"""
+        while True:
+            with self.condition:
+                while self.pending is None and not self.stopped:
+                    self.condition.wait()
+                if self.stopped:
+                    return
+                query_ids, started_at = self.pending
+
+            remaining = list(query_ids)
+            parsed = {}
+            backoff = self.min_backoff
+            while True:
+                time.sleep(backoff)
+                failed = False
+                for query_id in list(remaining):
+                    try:
+                        result = self.query.logs.get_query_results(queryId=query_id)
+                        status = result['status']
+                    except Exception as e:
+                        print(f"  ⚠️ 응답시간 쿼리 결과 조회 실패: {e}", flush=True)
+                        status = 'Failed'
+
+                    if status in ('Complete', 'Failed', 'Cancelled', 'Timeout'):
+                        self.query.observe_wait(time.time() - started_at, status)
+                    if status == 'Complete':
+                        parsed.update(self.query.parse_results(result['results']))
+                        remaining.remove(query_id)
+                    elif status in ('Failed', 'Cancelled', 'Timeout'):
+                        failed = True
+                        break
+
+                timed_out = bool(remaining) and time.time() - started_at > self.query_timeout
+                if timed_out:
+                    self.query.observe_wait(time.time() - started_at, 'ClientTimeout')
+
+                if not remaining:
+                    with self.condition:
+                        self.result = parsed
+                        self.result_time = started_at
+                        self.pending = None
+                    break
+                if failed or timed_out:
+                    # 일부 그룹만 갱신하지 않고 이전 결과 유지
+                    with self.condition:
+                        self.pending = None
+                    break
+                backoff = min(self.max_backoff, backoff * 1.5)
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
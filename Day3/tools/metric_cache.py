@@ -0,0 +1,147 @@
+"""
+메트릭 TTL 캐시
+(namespace, metric, dimensions, period) 키로 조회 결과를 메모리에 보관하고
+TTL이 지나면 오래된 값을 바로 돌려주면서 백그라운드에서 갱신 (stale-while-revalidate)
+"""
+
+import concurrent.futures
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+
+def ttl_for_period(period: int, min_ttl: float = 10.0, max_ttl: float = 30.0) -> float:
+    """
+    메트릭 집계 기간에서 TTL 계산
+
+    CloudWatch 데이터포인트는 최대 1분마다 갱신되므로 기간의 절반을 쓰되 30초를 넘지 않게 한다.
+    """
+    return max(min_ttl, min(max_ttl, period / 2))
+
+
+def metric_key(namespace: str, metric_name: str, dimensions: List[Dict], period: int, *extra) -> tuple:
+    """캐시 키 생성 (dimension 순서와 무관)"""
+    dims = tuple(sorted((dim['Name'], dim['Value']) for dim in dimensions))
+    return (namespace, metric_name, dims, period) + extra
+
+
+class MetricCache:
+    def __init__(self, max_stale_factor: float = 5.0, max_workers: int = 4):
+        """
+        메트릭 캐시 초기화
+
+        Args:
+            max_stale_factor: TTL의 몇 배까지 오래된 값을 즉시 반환할지 (넘으면 동기 조회)
+            max_workers: 백그라운드 갱신 스레드 수
+        """
+        self.max_stale_factor = max_stale_factor
+        self.entries = {}      # {키: (값, 저장 시각)}
+        self.refreshing = set()
+        self.loading = {}      # {키: Future} 동기 조회 중인 키 (같은 키 miss는 결과를 기다림)
+        self.lock = threading.Lock()
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='cache-refresh'
+        )
+        self.counters = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'refresh_errors': 0,
+                         'coalesced': 0}
+
+    def get(self, key: tuple, loader: Callable[[], object], ttl: float):
+        """
+        캐시 조회
+
+        - TTL 이내: 캐시 값 반환 (hit)
+        - TTL ~ TTL x max_stale_factor: 캐시 값 반환 + 백그라운드 갱신 (stale hit)
+        - 없거나 너무 오래됨: loader 동기 호출 (miss, 예외는 호출자에게 전달)
+          같은 키를 이미 다른 스레드가 조회 중이면 loader를 다시 부르지 않고 그 결과(예외 포함)를 기다림
+        """
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                age = now - stored_at
+                if age < ttl:
+                    self.counters['hits'] += 1
+                    return value
+                if age < ttl * self.max_stale_factor:
+                    self.counters['stale_hits'] += 1
+                    if key not in self.refreshing:
+                        self.refreshing.add(key)
+                        self.executor.submit(self.refresh, key, loader)
+                    return value
+            self.counters['misses'] += 1
+            future = self.loading.get(key)
+            if future is None:
+                future = self.loading[key] = concurrent.futures.Future()
+                leader = True
+            else:
+                self.counters['coalesced'] += 1
+                leader = False
+
+        if not leader:
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            # 기다리던 스레드가 멈추지 않도록 인터럽트까지 전달
+            with self.lock:
+                del self.loading[key]
+            future.set_exception(e)
+            raise
+        with self.lock:
+            self.entries[key] = (value, time.time())
+            del self.loading[key]
+        future.set_result(value)
+        return value
+
+    def refresh(self, key: tuple, loader: Callable[[], object]):
+        """백그라운드 갱신 (실패시 기존 값 유지)"""
+        try:
+            value = loader()
+            with self.lock:
+                self.entries[key] = (value, time.time())
+                self.counters['refreshes'] += 1
+        except Exception as e:
+            with self.lock:
+                self.counters['refresh_errors'] += 1
+            print(f"  ⚠️ 캐시 갱신 실패 {key[:2]}: {e}", flush=True)
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+
+    def get_metric(self, namespace: str, metric_name: str, dimensions: List[Dict], period: int,
+                   loader: Callable[[], object], *extra, ttl: Optional[float] = None):
+        """메트릭 키/기간 기반 TTL로 조회"""
+        key = metric_key(namespace, metric_name, dimensions, period, *extra)
+        return self.get(key, loader, ttl if ttl is not None else ttl_for_period(period))
+
+    def invalidate(self, dimension_name: Optional[str] = None, values: Optional[List[str]] = None):
+        """
+        항목 폐기 (다음 조회는 동기 조회) - 알람 트리거처럼 최신 값이 필요할 때
+
+        Args:
+            dimension_name, values: 지정시 해당 디멘션 값이 하나라도 들어간 키만 폐기 (예: 'ServiceName', 트리거된 서비스)
+                                    없으면 전체 폐기
+        """
+        with self.lock:
+            if dimension_name is None:
+                self.entries.clear()
+                return
+            targets = {(dimension_name, value) for value in values or []}
+            for key in [key for key in self.entries if targets.intersection(key[2])]:
+                del self.entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.counters, size=len(self.entries))
+
+    def format_stats(self) -> str:
+        stats = self.stats()
+        total = stats['hits'] + stats['stale_hits'] + stats['misses']
+        hit_rate = (stats['hits'] + stats['stale_hits']) / total * 100 if total else 0
+        return (f"캐시 hit {stats['hits']} / stale {stats['stale_hits']} / miss {stats['misses']} "
+                f"({hit_rate:.0f}%)")
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,339 @@
+"""
+ECS 서비스 메트릭 일괄 수집기
+모든 서비스의 CPU/메모리(Average, Maximum)를 틱당 GetMetricData 1회로 조회
+EC2 플릿 CPU는 인스턴스별 메트릭 + 메트릭 수식(AVG/MAX)으로 GetMetricData 1회에 계산
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+# GetMetricData 요청당 최대 쿼리 수
+MAX_QUERIES_PER_REQUEST = 500
+
+# (결과 키, 메트릭 이름, 통계)
+SERVICE_METRICS = [
+    ('cpu_avg', 'CPUUtilization', 'Average'),
+    ('cpu_max', 'CPUUtilization', 'Maximum'),
+    ('memory_avg', 'MemoryUtilization', 'Average'),
+    ('memory_max', 'MemoryUtilization', 'Maximum'),
+]
+
+
+class ServiceMetricCollector:
+    def __init__(self, cloudwatch, cluster_name: str, period: int = 60, minutes: int = 3, cache=None):
+        """
+        서비스 메트릭 수집기 초기화
+
+        Args:
+            cloudwatch: boto3 CloudWatch 클라이언트
+            cluster_name: ECS 클러스터 이름
+            period: 메트릭 집계 기간 (초)
+            minutes: 조회 범위 (분)
+            cache: MetricCache (없으면 매번 조회)
+        """
+        self.cloudwatch = cloudwatch
+        self.cluster_name = cluster_name
+        self.period = period
+        self.minutes = minutes
+        self.cache = cache
+
+    def build_queries(self, service_names: List[str]) -> Dict[str, tuple]:
+        """
+        서비스별 MetricDataQueries 생성
+
+        Returns:
+            {쿼리 ID: (쿼리, 서비스 이름, 결과 키)}
+        """
+        queries = {}
+        for index, service_name in enumerate(service_names):
+            for key, metric_name, stat in SERVICE_METRICS:
+                query_id = f"s{index}_{key}"
+                queries[query_id] = ({
+                    'Id': query_id,
+                    'MetricStat': {
+                        'Metric': {
+                            'Namespace': 'AWS/ECS',
+                            'MetricName': metric_name,
+                            'Dimensions': [
+                                {'Name': 'ServiceName', 'Value': service_name},
+                                {'Name': 'ClusterName', 'Value': self.cluster_name}
+                            ]
+                        },
+                        'Period': self.period,
+                        'Stat': stat,
+                        'Unit': 'Percent'
+                    },
+                    'ReturnData': True
+                }, service_name, key)
+        return queries
+
+    def fetch(self, queries: List[Dict]) -> Dict[str, List[tuple]]:
+        """
+        GetMetricData 호출 (NextToken 페이지네이션 포함)
+
+        Returns:
+            {쿼리 ID: 최신순 (데이터포인트 시각(epoch), 값) 리스트}
+        """
+        end_time = datetime.now(timezone.utc)
+        start_time = end_time - timedelta(minutes=self.minutes)
+        values = {}
+
+        for offset in range(0, len(queries), MAX_QUERIES_PER_REQUEST):
+            params = {
+                'MetricDataQueries': queries[offset:offset + MAX_QUERIES_PER_REQUEST],
+                'StartTime': start_time,
+                'EndTime': end_time,
+                'ScanBy': 'TimestampDescending'
+            }
+            while True:
+                response = self.cloudwatch.get_metric_data(**params)
+                for result in response['MetricDataResults']:
+                    values.setdefault(result['Id'], []).extend(
+                        (timestamp.timestamp(), value)
+                        for timestamp, value in zip(result.get('Timestamps', []), result.get('Values', []))
+                    )
+                if not response.get('NextToken'):
+                    break
+                params['NextToken'] = response['NextToken']
+
+        return values
+
+    def load(self, service_names: List[str]) -> Dict[str, Dict[str, float]]:
+        """GetMetricData로 최신 값 조회 (실패시 예외 전달)"""
+        queries = self.build_queries(service_names)
+        values = self.fetch([query for query, _, _ in queries.values()])
+
+        latest = {service_name: {} for service_name in service_names}
+        cpu_times = {}
+        for query_id, (_, service_name, key) in queries.items():
+            series = values.get(query_id)
+            if series:
+                timestamp, latest[service_name][key] = series[0]
+                if key == 'cpu_avg':
+                    # load_history와 같이 구간 중간 시각 기준
+                    cpu_times[service_name] = timestamp + self.period / 2
+
+        metrics = {}
+        for service_name, stats in latest.items():
+            metrics[service_name] = {
+                # 데이터포인트가 없으면 0%가 아니라 '지표 없음' (호출자가 평가를 건너뜀)
+                'cpu': stats.get('cpu_avg'),
+                'cpu_max': stats.get('cpu_max', stats.get('cpu_avg')),
+                # CPU 데이터포인트 시각 - 같은 데이터포인트를 다시 받았는지 구분하는 용도
+                'cpu_time': cpu_times.get(service_name),
+                # 기존 get_memory_utilization과 동일하게 Maximum 우선
+                'memory': stats.get('memory_max', stats.get('memory_avg', 0)),
+                'memory_avg': stats.get('memory_avg', 0)
+            }
+        return metrics
+
+    def collect(self, service_names: List[str]) -> Dict[str, Dict[str, float]]:
+        """
+        모든 서비스의 최신 CPU/메모리 값 조회
+
+        Returns:
+            {서비스 이름: {'cpu': ..., 'cpu_max': ..., 'cpu_time': ..., 'memory': ..., 'memory_avg': ...}}
+            CPU 데이터포인트가 없는 서비스는 'cpu'/'cpu_max'/'cpu_time'이 None, 조회 실패시 빈 딕셔너리
+        """
+        if not service_names:
+            return {}
+
+        try:
+            if self.cache is None:
+                return self.load(service_names)
+            dimensions = [{'Name': 'ClusterName', 'Value': self.cluster_name}] + [
+                {'Name': 'ServiceName', 'Value': service_name} for service_name in service_names
+            ]
+            # 결과 딕셔너리는 틱마다 서비스별로 수정되므로 복사본 전달
+            metrics = self.cache.get_metric(
+                'AWS/ECS', 'CPUUtilization,MemoryUtilization', dimensions, self.period,
+                lambda: self.load(service_names)
+            )
+            return {service_name: dict(values) for service_name, values in metrics.items()}
+        except Exception as e:
+            print(f"  ⚠️ 메트릭 일괄 조회 실패: {e}", flush=True)
+            return {}
+
+    def load_history(self, service_names: List[str], minutes: int = 20, period: int = 60,
+                     latency_dimensions: Optional[Dict[str, List[Dict]]] = None) -> Dict[str, List[tuple]]:
+        """
+        시작시 히스토리 채우기용 과거 시계열 (서비스별 CPU 평균 + ALB TargetResponseTime p95를 GetMetricData 1회로)
+
+        Args:
+            service_names: 서비스 이름 목록
+            minutes: 조회 범위 (분)
+            period: 샘플 간격 (초)
+            latency_dimensions: {서비스 이름: ALB LoadBalancer/TargetGroup 디멘션} (없는 서비스는 응답시간 NaN)
+
+        Returns:
+            {서비스 이름: [(구간 중간 시각(epoch), CPU, 응답시간 초), ...]} 오래된 순, 실패시 예외 전달
+        """
+        latency_dimensions = latency_dimensions or {}
+        queries = {}
+        for index, service_name in enumerate(service_names):
+            queries[f"h{index}_cpu"] = ({
+                'Id': f"h{index}_cpu",
+                'MetricStat': {
+                    'Metric': {
+                        'Namespace': 'AWS/ECS',
+                        'MetricName': 'CPUUtilization',
+                        'Dimensions': [
+                            {'Name': 'ServiceName', 'Value': service_name},
+                            {'Name': 'ClusterName', 'Value': self.cluster_name}
+                        ]
+                    },
+                    'Period': period,
+                    'Stat': 'Average',
+                    'Unit': 'Percent'
+                },
+                'ReturnData': True
+            }, service_name, 'cpu')
+            if service_name in latency_dimensions:
+                queries[f"h{index}_rt"] = ({
+                    'Id': f"h{index}_rt",
+                    'MetricStat': {
+                        'Metric': {
+                            'Namespace': 'AWS/ApplicationELB',
+                            'MetricName': 'TargetResponseTime',
+                            'Dimensions': latency_dimensions[service_name]
+                        },
+                        'Period': period,
+                        'Stat': 'p95'
+                    },
+                    'ReturnData': True
+                }, service_name, 'response')
+
+        # 구간 경계에 맞춰 조회해야 샘플이 정확히 period 간격
+        end_epoch = int(datetime.now(timezone.utc).timestamp()) // period * period
+        end_time = datetime.fromtimestamp(end_epoch, timezone.utc)
+        query_list = [query for query, _, _ in queries.values()]
+        points = {}
+        for offset in range(0, len(query_list), MAX_QUERIES_PER_REQUEST):
+            params = {
+                'MetricDataQueries': query_list[offset:offset + MAX_QUERIES_PER_REQUEST],
+                'StartTime': end_time - timedelta(minutes=minutes),
+                'EndTime': end_time,
+                'ScanBy': 'TimestampAscending'
+            }
+            while True:
+                response = self.cloudwatch.get_metric_data(**params)
+                for result in response['MetricDataResults']:
+                    series = points.setdefault(result['Id'], {})
+                    for timestamp, value in zip(result.get('Timestamps', []), result.get('Values', [])):
+                        # 1분 평균은 구간 중간 시각의 값으로 봄
+                        series[timestamp.timestamp() + period / 2] = value
+                if not response.get('NextToken'):
+                    break
+                params['NextToken'] = response['NextToken']
+
+        series = {service_name: {} for service_name in service_names}
+        for query_id, (_, service_name, key) in queries.items():
+            series[service_name][key] = points.get(query_id, {})
+
+        history = {}
+        for service_name, values in series.items():
+            response_times = values.get('response', {})
+            history[service_name] = [
+                (timestamp, cpu, response_times.get(timestamp, float('nan')))
+                for timestamp, cpu in sorted(values['cpu'].items())
+            ]
+        return history
+
+
+class FleetCpuCollector:
+    def __init__(self, cloudwatch, period: int = 300, minutes: int = 5, cache=None):
+        """
+        EC2 플릿 CPU 수집기 초기화
+
+        Args:
+            cloudwatch: boto3 CloudWatch 클라이언트
+            period: 메트릭 집계 기간 (초)
+            minutes: 조회 범위 (분)
+            cache: MetricCache (인스턴스 집합이 같으면 서비스끼리 결과 공유)
+        """
+        self.cloudwatch = cloudwatch
+        self.period = period
+        self.minutes = minutes
+        self.cache = cache
+        # (정렬된 인스턴스 ID, 쿼리) - 평가 스레드가 읽는 중에도 한 번에 교체 (아직 모르면 ID가 None)
+        self.state = (None, [])
+
+    @property
+    def instance_ids(self) -> Optional[List[str]]:
+        return self.state[0]
+
+    def set_instances(self, instance_ids: List[str]) -> bool:
+        """
+        InService 인스턴스 목록 갱신 (집합이 바뀔 때만 쿼리 재생성)
+
+        Returns:
+            인스턴스 집합이 바뀌었으면 True
+        """
+        instance_ids = sorted(instance_ids)
+        if instance_ids == self.state[0]:
+            return False
+        self.state = (instance_ids, self.build_queries(instance_ids))
+        return True
+
+    def build_queries(self, instance_ids: List[str]) -> List[Dict]:
+        """인스턴스별 Maximum(결과 미반환) + 플릿 평균/최대 수식"""
+        queries = []
+        for index, instance_id in enumerate(instance_ids):
+            queries.append({
+                'Id': f"i{index}",
+                'MetricStat': {
+                    'Metric': {
+                        'Namespace': 'AWS/EC2',
+                        'MetricName': 'CPUUtilization',
+                        'Dimensions': [{'Name': 'InstanceId', 'Value': instance_id}]
+                    },
+                    'Period': self.period,
+                    'Stat': 'Maximum'
+                },
+                'ReturnData': False
+            })
+        if queries:
+            ids = ', '.join(query['Id'] for query in queries)
+            queries.append({'Id': 'fleet_avg', 'Expression': f"AVG([{ids}])", 'ReturnData': True})
+            queries.append({'Id': 'fleet_max', 'Expression': f"MAX([{ids}])", 'ReturnData': True})
+        return queries
+
+    def load(self, queries: List[Dict]) -> Optional[Dict[str, float]]:
+        """GetMetricData 1회로 플릿 CPU 조회 (데이터 없으면 None, 실패시 예외 전달)"""
+        end_time = datetime.now(timezone.utc)
+        params = {
+            'MetricDataQueries': queries,
+            'StartTime': end_time - timedelta(minutes=self.minutes),
+            'EndTime': end_time,
+            'ScanBy': 'TimestampDescending'
+        }
+        latest = {}
+        while True:
+            response = self.cloudwatch.get_metric_data(**params)
+            for result in response['MetricDataResults']:
+                if result.get('Values') and result['Id'] not in latest:
+                    latest[result['Id']] = result['Values'][0]
+            if not response.get('NextToken'):
+                break
+            params['NextToken'] = response['NextToken']
+
+        if 'fleet_avg' not in latest:
+            return None
+        return {'avg': latest['fleet_avg'], 'max': latest.get('fleet_max', latest['fleet_avg'])}
+
+    def collect(self) -> Optional[Dict[str, float]]:
+        """
+        플릿 CPU 조회 (캐시 경유)
+
+        Returns:
+            {'avg': 인스턴스별 최대값의 평균, 'max': 최대}, 인스턴스/데이터가 없으면 None
+        """
+        # 캐시 키와 쿼리가 같은 인스턴스 집합을 보도록 상태를 한 번만 읽음
+        instance_ids, queries = self.state
+        if not instance_ids:
+            return None
+        if self.cache is None:
+            return self.load(queries)
+        dimensions = [{'Name': 'InstanceId', 'Value': instance_id} for instance_id in instance_ids]
+        return self.cache.get_metric('AWS/EC2', 'CPUUtilization', dimensions, self.period,
+                                     lambda: self.load(queries), 'fleet')
@@ -0,0 +1,259 @@
+"""
+OpenMetrics /metrics 엔드포인트
+오토스케일러 내부 상태(틱/단계 소요 시간, API별 지연, Logs Insights 대기, 캐시, 위반/결정 카운트, 패턴)를
+텍스트 형식으로 노출해 어느 단계가 틱 시간을 잡아먹는지 확인
+"""
+
+import bisect
+import contextlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+TICK_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 15, 30, 60)
+API_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+INSIGHTS_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 30, 60)
+LEVEL_SHIFT_BUCKETS = (0, 15, 30, 60, 120, 300, 600, 1800)
+
+
+def escape_label(value) -> str:
+    """라벨 값 이스케이프 (텍스트 형식 규칙: 역슬래시, 큰따옴표, 줄바꿈)"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names: Tuple[str, ...], values: Tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class Metric:
+    kind = 'unknown'
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# TYPE {self.name} {self.kind}", f"# HELP {self.name} {self.help_text}"]
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, *labels, amount: float = 1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def set_total(self, *labels, value: float):
+        """외부에서 센 누적값을 그대로 반영 (예: 캐시 통계)"""
+        with self.lock:
+            self.values[labels] = value
+
+    def render(self) -> List[str]:
+        with self.lock:
+            items = sorted(self.values.items())
+        return self.header() + [f"{self.name}_total{format_labels(self.labelnames, labels)} {format_value(value)}"
+                                for labels, value in items]
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, *labels, value: float):
+        with self.lock:
+            self.values[labels] = value
+
+    def clear(self):
+        with self.lock:
+            self.values.clear()
+
+    def render(self) -> List[str]:
+        with self.lock:
+            items = sorted(self.values.items())
+        return self.header() + [f"{self.name}{format_labels(self.labelnames, labels)} {format_value(value)}"
+                                for labels, value in items]
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (), buckets=TICK_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets) + (float('inf'),)
+
+    def observe(self, *labels, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            counts, total = self.values.get(labels, ([0] * len(self.buckets), 0.0))
+            counts[index] += 1
+            self.values[labels] = (counts, total + value)
+
+    def render(self) -> List[str]:
+        with self.lock:
+            items = sorted((labels, (list(counts), total)) for labels, (counts, total) in self.values.items())
+        lines = self.header()
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_count{format_labels(self.labelnames, labels)} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labelnames, labels)} {format_value(total)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []   # 스크레이프 직전에 호출되는 함수 (캐시 통계 등 외부 상태를 게이지로 복사)
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]):
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self.collectors:
+            try:
+                collector()
+            except Exception as e:
+                print(f"  ⚠️ 메트릭 수집 실패: {e}", flush=True)
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+
+class AutoscalerMetrics:
+    """오토스케일러 공용 메트릭 모음"""
+
+    def __init__(self, prefix: str = 'autoscaler'):
+        self.registry = MetricsRegistry()
+        register = self.registry.register
+        self.tick_duration = register(Histogram(
+            f'{prefix}_tick_duration_seconds', '평가 틱 전체 소요 시간'))
+        self.stage_duration = register(Histogram(
+            f'{prefix}_stage_duration_seconds', '틱 단계별 소요 시간', ('stage',)))
+        self.api_duration = register(Histogram(
+            'aws_api_call_duration_seconds', 'AWS API 호출 지연', ('service', 'operation'), API_BUCKETS))
+        self.api_calls = register(Counter(
+            'aws_api_calls', 'AWS API 호출 수', ('service', 'operation', 'outcome')))
+        self.insights_wait = register(Histogram(
+            'logs_insights_wait_seconds', 'Logs Insights 쿼리 시작부터 완료까지 대기 시간', ('status',),
+            INSIGHTS_BUCKETS))
+        self.cache_events = register(Counter(
+            f'{prefix}_metric_cache_events', '메트릭 캐시 누적 이벤트 수', ('event',)))
+        self.cache_entries = register(Gauge(
+            f'{prefix}_metric_cache_entries', '메트릭 캐시 항목 수'))
+        self.violations = register(Counter(
+            f'{prefix}_violations', '임계값 위반 평가 수', ('service',)))
+        self.decisions = register(Counter(
+            f'{prefix}_decisions', '스케일링 결정 수 (stage별)', ('service', 'stage')))
+        self.pattern = register(Gauge(
+            f'{prefix}_traffic_pattern', '현재 트래픽 패턴 (해당 패턴이면 1)', ('service', 'pattern')))
+        self.pattern_confidence = register(Gauge(
+            f'{prefix}_traffic_pattern_confidence', '현재 트래픽 패턴 신뢰도', ('service',)))
+        self.tasks = register(Gauge(
+            f'{prefix}_service_tasks', '서비스 desired 태스크 수', ('service',)))
+        self.level_shifts = register(Counter(
+            f'{prefix}_level_shifts', '변화점 감지 수준 변화 이벤트 수', ('service', 'metric', 'direction')))
+        self.level_shift_latency = register(Histogram(
+            f'{prefix}_level_shift_latency_seconds', '수준 변화 시작 추정 시각부터 감지까지 지연', ('metric',),
+            LEVEL_SHIFT_BUCKETS))
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """with metrics.stage('snapshot'): 블록 소요 시간 기록"""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.stage_duration.observe(name, value=time.monotonic() - started)
+
+    def observe_api(self, key: tuple, latency: float, outcome: str):
+        """ApiLimiter 관찰자 - (service, operation)별 지연/결과"""
+        self.api_duration.observe(*key, value=latency)
+        self.api_calls.inc(*key, outcome)
+
+    def observe_insights_wait(self, seconds: float, status: str):
+        self.insights_wait.observe(status, value=seconds)
+
+    def attach_cache(self, cache):
+        def collect():
+            stats = cache.stats()
+            self.cache_entries.set(value=stats.pop('size'))
+            for event, value in stats.items():
+                self.cache_events.set_total(event, value=value)
+        self.registry.add_collector(collect)
+
+    def record_decision(self, service_name: str, current_tasks: int, decision: Dict,
+                        pattern: Optional[str] = None, confidence: Optional[float] = None):
+        stage = decision.get('stage') or 'none'
+        self.decisions.inc(service_name, stage)
+        if stage in ('violation', 'cooldown', 'at_max', 'scale_up'):
+            self.violations.inc(service_name)
+        self.tasks.set(service_name, value=current_tasks)
+        if pattern is not None:
+            for name in ('spike', 'gradual', 'unknown'):
+                self.pattern.set(service_name, name, value=1 if name == pattern else 0)
+            self.pattern_confidence.set(service_name, value=confidence or 0)
+
+    def record_level_shift(self, service_name: str, event: Dict):
+        self.level_shifts.inc(service_name, event['metric'], event['direction'])
+        self.level_shift_latency.observe(event['metric'], value=event['latency'])
+
+
+class MetricsServer:
+    def __init__(self, registry: MetricsRegistry, host: str = '0.0.0.0', port: int = 9101):
+        """
+        /metrics HTTP 서버 초기화
+
+        Args:
+            registry: 노출할 MetricsRegistry
+            host, port: 바인딩 주소
+        """
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                data = registry.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass  # 스크레이프 접근 로그를 오토스케일러 로그에 섞지 않음
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.address = self.httpd.server_address
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='metrics', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        print(f"📈 메트릭 엔드포인트: http://{self.address[0]}:{self.address[1]}/metrics", flush=True)
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
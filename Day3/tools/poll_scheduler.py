@@ -0,0 +1,127 @@
+"""
+적응형 폴링 스케줄러
+서비스별 트래픽 패턴/임계값 근접도로 다음 평가 시각을 정하고 (급증·임계값 근처는 짧게, 한산하면 점점 길게)
+분당 API 호출 예산을 넘지 않도록 평가 틱을 미룸
+"""
+
+import threading
+import time
+from typing import List, Optional
+
+
+class AdaptivePollScheduler:
+    def __init__(self, service_names: List[str], floor: float = 5, ceiling: float = 60, default: float = 15,
+                 near_ratio: float = 0.8, calm_ratio: float = 0.5, backoff: float = 1.5,
+                 calls_per_minute: Optional[float] = None, calls_per_tick: int = 4):
+        """
+        스케줄러 초기화
+
+        Args:
+            service_names: 평가 대상 서비스
+            floor, ceiling: 평가 주기 하한/상한 (초)
+            default: 초기/보통 상태 주기 (초)
+            near_ratio: 메트릭/임계값 비율이 이 이상이면 임계값 근처로 보고 하한 주기 사용
+            calm_ratio: 이 미만이고 min_tasks면 한산 상태로 보고 주기를 backoff배씩 늘림
+            calls_per_minute: 분당 API 호출 예산 (None이면 제한 없음)
+            calls_per_tick: 평가 틱 1회당 예상 API 호출 수 (DescribeServices, GetMetricData, Logs 쿼리)
+        """
+        self.floor = floor
+        self.ceiling = ceiling
+        self.default = default
+        self.near_ratio = near_ratio
+        self.calm_ratio = calm_ratio
+        self.backoff = backoff
+        self.calls_per_minute = calls_per_minute
+        self.calls_per_tick = calls_per_tick
+
+        now = time.time()
+        self.intervals = {name: default for name in service_names}
+        self.next_due = {name: now for name in service_names}
+        self.states = {name: 'normal' for name in service_names}
+        self.tokens = calls_per_minute if calls_per_minute else 0
+        self.refilled_at = now
+        self.lock = threading.Lock()
+
+    def update(self, service_name: str, pattern: str, load_ratio: float, at_min_tasks: bool,
+               now: Optional[float] = None) -> float:
+        """
+        평가 결과로 다음 평가 시각 갱신
+
+        Args:
+            pattern: 'spike' | 'gradual' | 'unknown'
+            load_ratio: 응답시간/CPU 중 임계값 대비 더 높은 비율
+            at_min_tasks: 현재 태스크 수가 min_tasks인지
+
+        Returns:
+            다음 평가까지 주기 (초)
+        """
+        now = time.time() if now is None else now
+        with self.lock:
+            if pattern == 'spike' or load_ratio >= self.near_ratio:
+                interval, state = self.floor, 'hot'
+            elif load_ratio < self.calm_ratio and at_min_tasks:
+                # 한산한 상태가 이어질수록 상한까지 점점 늘림
+                previous = self.intervals[service_name] if self.states[service_name] == 'calm' else self.default
+                interval, state = min(self.ceiling, previous * self.backoff), 'calm'
+            else:
+                interval, state = self.default, 'normal'
+            interval = max(self.floor, min(self.ceiling, interval))
+            self.intervals[service_name] = interval
+            self.states[service_name] = state
+            self.next_due[service_name] = now + interval
+        return interval
+
+    def wake(self, service_names: List[str], now: Optional[float] = None):
+        """외부 트리거 등으로 즉시 평가 (다음 due 시각을 현재로)"""
+        now = time.time() if now is None else now
+        with self.lock:
+            for name in service_names:
+                if name in self.next_due:
+                    self.next_due[name] = now
+
+    def tick_cost(self) -> float:
+        """틱 1회에 차감할 토큰 - 예산(버킷 크기)보다 크면 버킷이 영원히 차지 않으므로 예산으로 자름"""
+        return min(self.calls_per_tick, self.calls_per_minute)
+
+    def refill(self, now: float):
+        if not self.calls_per_minute:
+            return
+        self.tokens = min(self.calls_per_minute,
+                          self.tokens + (now - self.refilled_at) * self.calls_per_minute / 60)
+        self.refilled_at = now
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """
+        지금 평가할 서비스 목록 (API 예산이 부족하면 빈 리스트)
+
+        반환된 서비스는 예산을 1틱 차감하고, update()가 호출될 때까지 기본 주기 뒤로 미뤄 둔다.
+        """
+        now = time.time() if now is None else now
+        with self.lock:
+            services = [name for name, due_at in self.next_due.items() if due_at <= now]
+            if not services:
+                return []
+            self.refill(now)
+            if self.calls_per_minute:
+                if self.tokens < self.tick_cost():
+                    return []
+                self.tokens -= self.tick_cost()
+            for name in services:
+                self.next_due[name] = now + self.default
+            return services
+
+    def next_wakeup(self, now: Optional[float] = None) -> float:
+        """다음 평가까지 남은 시간 (초, 예산 부족이면 토큰이 찰 때까지)"""
+        now = time.time() if now is None else now
+        with self.lock:
+            wait = max(0.0, min(self.next_due.values()) - now)
+            if self.calls_per_minute:
+                self.refill(now)
+                if self.tokens < self.tick_cost():
+                    wait = max(wait, (self.tick_cost() - self.tokens) * 60 / self.calls_per_minute)
+            return wait
+
+    def format_status(self) -> str:
+        with self.lock:
+            return ", ".join(f"{name} {self.intervals[name]:.0f}초({self.states[name]})"
+                             for name in self.intervals)
@@ -0,0 +1,263 @@
+"""
+고정 크기 시계열 링 버퍼
+array('d') 기반 원형 버퍼에 (시각, 값)을 저장하고 최근 window개 샘플의 통계를 샘플마다 O(1)로 갱신
+    - 평균/분산/표준편차/변동계수 (슬라이딩 Welford)
+    - 최소/최대, 변화율(값/초) 최소/최대 (단조 큐)
+    - 변화율 절대값 평균, 전체 샘플 EWMA
+결측값(NaN)은 저장하되 통계에서는 제외
+append는 새 객체를 만들지 않으므로 서비스마다 수 시간 분량을 들고 있어도 부담이 적음
+"""
+
+import math
+from array import array
+from typing import List, Optional
+
+# 누적 오차를 없애기 위해 이 샘플 수마다 윈도우 통계를 다시 계산
+RESUM_INTERVAL = 1024
+
+
+class MonotonicWindow:
+    """슬라이딩 윈도우 최대값 (인덱스가 증가하는 순서로 push, 상각 O(1))"""
+
+    __slots__ = ('size', 'indexes', 'values', 'head', 'length')
+
+    def __init__(self, size: int):
+        self.size = size
+        self.indexes = array('q', bytes(8 * size))
+        self.values = array('d', bytes(8 * size))
+        self.head = 0
+        self.length = 0
+
+    def clear(self):
+        self.head = 0
+        self.length = 0
+
+    def expire(self, oldest_index: int):
+        """oldest_index보다 오래된 항목 제거"""
+        while self.length and self.indexes[self.head] < oldest_index:
+            self.head = (self.head + 1) % self.size
+            self.length -= 1
+
+    def push(self, index: int, value: float):
+        # 새 값보다 작거나 같은 뒤쪽 항목은 다시 최대값이 될 수 없음
+        while self.length and self.values[(self.head + self.length - 1) % self.size] <= value:
+            self.length -= 1
+        slot = (self.head + self.length) % self.size
+        self.indexes[slot] = index
+        self.values[slot] = value
+        self.length += 1
+
+    def maximum(self) -> Optional[float]:
+        return self.values[self.head] if self.length else None
+
+
+class TimeSeriesRing:
+    """
+    (시각, 값) 원형 버퍼 + 최근 window개 샘플의 온라인 통계
+
+    변화율은 연속한 두 샘플 사이의 (값 차이 / 시각 차이)이며 시각 차이가 0 이하면 제외
+    """
+
+    __slots__ = ('capacity', 'window', 'alpha', 'times', 'values', 'rates', 'appended',
+                 'value_count', 'value_mean', 'value_m2', 'rate_sum', 'rate_count', 'ewma',
+                 'value_max', 'value_min', 'rate_max', 'rate_min')
+
+    def __init__(self, capacity: int, window: Optional[int] = None, alpha: float = 0.3):
+        """
+        링 버퍼 초기화
+
+        Args:
+            capacity: 보관할 최대 샘플 수 (넘치면 가장 오래된 것부터 덮어씀)
+            window: 통계를 계산할 최근 샘플 수 (기본값: capacity)
+            alpha: EWMA 가중치 (0~1, 클수록 최근 값 비중이 큼)
+        """
+        window = window or capacity
+        if not 2 <= window <= capacity:
+            raise ValueError(f"window는 2 이상 capacity({capacity}) 이하여야 합니다: {window}")
+        self.capacity = capacity
+        self.window = window
+        self.alpha = alpha
+        self.times = array('d', bytes(8 * capacity))
+        self.values = array('d', bytes(8 * capacity))
+        self.rates = array('d', bytes(8 * capacity))
+        self.value_max = MonotonicWindow(window)
+        self.value_min = MonotonicWindow(window)   # -값의 최대
+        self.rate_max = MonotonicWindow(window)
+        self.rate_min = MonotonicWindow(window)    # -변화율의 최대
+        self.clear()
+
+    def clear(self):
+        self.appended = 0          # 지금까지 추가한 샘플 수 (다음 샘플의 절대 인덱스)
+        self.value_count = 0       # 윈도우 안 유효(NaN 아닌) 샘플 수
+        self.value_mean = 0.0
+        self.value_m2 = 0.0        # 윈도우 안 편차 제곱합
+        self.rate_sum = 0.0        # 윈도우 안 변화율 절대값 합
+        self.rate_count = 0
+        self.ewma = None
+        for queue in (self.value_max, self.value_min, self.rate_max, self.rate_min):
+            queue.clear()
+
+    def __len__(self) -> int:
+        return min(self.appended, self.capacity)
+
+    def append(self, timestamp: float, value: float):
+        """샘플 추가 (O(1), 할당 없음)"""
+        index = self.appended
+        capacity = self.capacity
+        window = self.window
+
+        # 윈도우에서 빠지는 값/변화율 (덮어쓰기 전에 읽음)
+        if index >= window:
+            old = self.values[(index - window) % capacity]
+            if not math.isnan(old):
+                # Welford 제거
+                self.value_count -= 1
+                if self.value_count:
+                    delta = old - self.value_mean
+                    self.value_mean -= delta / self.value_count
+                    self.value_m2 = max(0.0, self.value_m2 - delta * (old - self.value_mean))
+                else:
+                    self.value_mean = self.value_m2 = 0.0
+            old_rate = self.rates[(index - window + 1) % capacity]
+            if not math.isnan(old_rate):
+                self.rate_sum -= abs(old_rate)
+                self.rate_count -= 1
+
+        rate = math.nan
+        if index > 0:
+            previous = (index - 1) % capacity
+            elapsed = timestamp - self.times[previous]
+            if elapsed > 0:
+                rate = (value - self.values[previous]) / elapsed
+
+        slot = index % capacity
+        self.times[slot] = timestamp
+        self.values[slot] = value
+        self.rates[slot] = rate
+        self.appended = index + 1
+
+        oldest = index - window + 1
+        self.value_max.expire(oldest)
+        self.value_min.expire(oldest)
+        if not math.isnan(value):
+            # Welford 추가
+            self.value_count += 1
+            delta = value - self.value_mean
+            self.value_mean += delta / self.value_count
+            self.value_m2 += delta * (value - self.value_mean)
+            self.value_max.push(index, value)
+            self.value_min.push(index, -value)
+
+        # 윈도우 안 변화율은 window-1개 (첫 샘플의 변화율은 윈도우 밖 샘플과의 차이)
+        self.rate_max.expire(oldest + 1)
+        self.rate_min.expire(oldest + 1)
+        if not math.isnan(rate):
+            self.rate_sum += abs(rate)
+            self.rate_count += 1
+            self.rate_max.push(index, rate)
+            self.rate_min.push(index, -rate)
+        if self.rate_count == 0:
+            self.rate_sum = 0.0
+
+        self.ewma = value if self.ewma is None else self.alpha * value + (1 - self.alpha) * self.ewma
+
+        if self.appended % RESUM_INTERVAL == 0:
+            self.resum()
+
+    def resum(self):
+        """윈도우 합계를 저장된 샘플로 다시 계산 (부동소수점 누적 오차 제거)"""
+        first = self.appended - min(self.appended, self.window)
+        values = [self.values[i % self.capacity] for i in range(first, self.appended)]
+        values = [value for value in values if not math.isnan(value)]
+        self.value_count = len(values)
+        self.value_mean = math.fsum(values) / len(values) if values else 0.0
+        self.value_m2 = math.fsum((value - self.value_mean) ** 2 for value in values)
+        rates = [self.rates[i % self.capacity] for i in range(first + 1, self.appended)]
+        rates = [abs(rate) for rate in rates if not math.isnan(rate)]
+        self.rate_sum = math.fsum(rates)
+        self.rate_count = len(rates)
+
+    @property
+    def count(self) -> int:
+        """통계에 포함된 샘플 수 (최근 window개 중 NaN이 아닌 것)"""
+        return self.value_count
+
+    @property
+    def full(self) -> bool:
+        return self.appended >= self.window
+
+    @property
+    def last(self) -> Optional[float]:
+        return self.values[(self.appended - 1) % self.capacity] if self.appended else None
+
+    @property
+    def last_time(self) -> Optional[float]:
+        return self.times[(self.appended - 1) % self.capacity] if self.appended else None
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.value_mean if self.value_count else None
+
+    @property
+    def variance(self) -> Optional[float]:
+        """표본 분산 (샘플 2개 미만이면 None)"""
+        count = self.count
+        if count < 2:
+            return None
+        return self.value_m2 / (count - 1)
+
+    @property
+    def stdev(self) -> Optional[float]:
+        variance = self.variance
+        return None if variance is None else math.sqrt(variance)
+
+    @property
+    def cv(self) -> float:
+        """변동계수 (표준편차/평균, 평균이 0 이하이거나 샘플이 부족하면 0)"""
+        mean, stdev = self.mean, self.stdev
+        return stdev / mean if stdev is not None and mean > 0 else 0.0
+
+    @property
+    def minimum(self) -> Optional[float]:
+        value = self.value_min.maximum()
+        return None if value is None else -value
+
+    @property
+    def maximum(self) -> Optional[float]:
+        return self.value_max.maximum()
+
+    @property
+    def mean_abs_rate(self) -> Optional[float]:
+        """윈도우 안 변화율 절대값 평균 (유효한 변화율이 없으면 None)"""
+        return self.rate_sum / self.rate_count if self.rate_count else None
+
+    @property
+    def max_rate(self) -> Optional[float]:
+        """가장 가파른 증가율"""
+        return self.rate_max.maximum()
+
+    @property
+    def min_rate(self) -> Optional[float]:
+        """가장 가파른 감소율 (음수)"""
+        value = self.rate_min.maximum()
+        return None if value is None else -value
+
+    @property
+    def max_abs_rate(self) -> Optional[float]:
+        if not self.rate_count:
+            return None
+        return max(self.max_rate, -self.min_rate)
+
+    def timestamps(self) -> List[float]:
+        """보관 중인 샘플 시각 (오래된 순, 복사본)"""
+        return self.ordered(self.times)
+
+    def samples(self) -> List[float]:
+        """보관 중인 샘플 값 (오래된 순, 복사본)"""
+        return self.ordered(self.values)
+
+    def ordered(self, data: array) -> List[float]:
+        if self.appended <= self.capacity:
+            return data[:self.appended].tolist()
+        slot = self.appended % self.capacity
+        return (data[slot:] + data[:slot]).tolist()
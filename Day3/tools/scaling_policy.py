@@ -0,0 +1,302 @@
+"""
+스케일링 정책 코어
+AWS 호출/출력 없이 상태 스냅샷만으로 결정을 계산하는 순수 함수 모음
+단건 decide()는 실시간 루프용, decide_batch()는 여러 서비스/파라미터 조합을 NumPy 배열로 한 번에 평가
+"""
+
+import math
+from typing import Dict, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # 배치 평가에만 필요
+    np = None
+
+# 히스토리가 부족할 때 analyze_traffic_pattern이 돌려주던 기본 CPU 임계값
+UNKNOWN_CPU_THRESHOLD = 40
+PATTERN_WINDOW = 10
+# 상승 변화점 감지 후 급증 패턴으로 보는 시간 (초)
+SPIKE_HOLD = 180
+
+
+def require_numpy():
+    if np is None:
+        raise RuntimeError("배치 평가에는 numpy가 필요합니다 (pip install numpy)")
+
+
+def classify_shift(sample_count: int, last_shift: Optional[Dict], trend: Optional[str], now: float,
+                   cpu_threshold_gradual: float, cpu_threshold_spike: float) -> Tuple[str, float, float]:
+    """
+    변화점 감지 결과로 트래픽 패턴 분류 (고정 변화율/변동계수 기준 대신)
+
+    Args:
+        sample_count: 패턴 윈도우 안 샘플 수 (PATTERN_WINDOW 미만이면 unknown)
+        last_shift: 마지막 수준 변화 이벤트 (CPU 또는 요청 수, 없으면 None)
+        trend: 아직 감지 전인 누적 방향 ('up' | 'down' | None)
+        now: 현재 시각
+
+    Returns:
+        (패턴, 신뢰도, 적용할 CPU 임계값)
+    """
+    if sample_count < PATTERN_WINDOW:
+        return 'unknown', 0, UNKNOWN_CPU_THRESHOLD
+    # 상승 변화점 감지 후 SPIKE_HOLD 동안은 급증
+    if last_shift and last_shift['direction'] == 'up' and now - last_shift['timestamp'] <= SPIKE_HOLD:
+        return 'spike', round(last_shift['confidence'] * 100, 1), cpu_threshold_spike
+    if trend:
+        return 'gradual', 60, cpu_threshold_gradual
+    return 'gradual', 40, cpu_threshold_gradual  # 기본값
+
+
+def target_tracking_count(current_tasks: int, ratio: float, min_tasks: int, max_tasks: int,
+                          max_step_up: int, max_step_down: int, scale_down_damping: float) -> int:
+    """
+    목표 추적 태스크 수 계산
+
+    필요 태스크 수 = ceil(현재 태스크 수 x 메트릭/목표)
+    확장은 한 번에 max_step_up까지, 축소는 차이의 scale_down_damping 비율만큼 (최대 max_step_down)
+
+    Args:
+        ratio: 메트릭/목표 비율 (여러 메트릭이면 최댓값)
+    """
+    desired = math.ceil(current_tasks * ratio)
+    if desired > current_tasks:
+        desired = min(desired, current_tasks + max_step_up)
+    elif desired < current_tasks:
+        step = min(max_step_down, math.ceil((current_tasks - desired) * scale_down_damping))
+        desired = current_tasks - step
+    return max(min_tasks, min(max_tasks, desired))
+
+
+def classify_shift_batch(sample_count, shift_age, shift_confidence, trending,
+                         cpu_threshold_gradual, cpu_threshold_spike):
+    """
+    classify_shift의 배치 버전
+
+    Args:
+        sample_count: (N,) 패턴 윈도우 안 샘플 수
+        shift_age: (N,) 마지막 상승 변화점 이후 경과 시간 (초, 상승 변화점이 없으면 NaN)
+        shift_confidence: (N,) 마지막 상승 변화점 신뢰도 (0~1)
+        trending: (N,) 아직 감지 전인 누적 방향이 있는지 (bool)
+        cpu_threshold_gradual, cpu_threshold_spike: (N,) 배열 또는 스칼라
+
+    Returns:
+        {'spike': bool 배열, 'known': bool 배열, 'confidence': 배열, 'cpu_threshold': 배열}
+    """
+    require_numpy()
+    known = np.asarray(sample_count) >= PATTERN_WINDOW
+    shift_age = np.asarray(shift_age, dtype=float)
+    # NaN 비교는 False이므로 상승 변화점이 없으면 급증 아님
+    spike = known & (shift_age <= SPIKE_HOLD)
+    trending = known & np.asarray(trending, dtype=bool)
+    confidence = np.where(spike, np.round(np.asarray(shift_confidence, dtype=float) * 100, 1),
+                          np.where(trending, 60, np.where(known, 40, 0)))
+    cpu_threshold = np.where(spike, cpu_threshold_spike,
+                             np.where(known, cpu_threshold_gradual, UNKNOWN_CPU_THRESHOLD))
+    return {'spike': spike, 'known': known, 'confidence': confidence, 'cpu_threshold': cpu_threshold}
+
+
+class ThresholdPolicy:
+    """
+    임계값 + 연속 위반 + 쿨다운 기반 정책
+
+    상태 스냅샷 키:
+        current_tasks, cpu, response_time, violation_count, last_scale_time, now,
+        cpu_threshold (적용할 CPU 임계값), spike (급증 패턴 여부, 선택)
+    서비스 설정 키:
+        response_time_threshold, min_tasks, max_tasks, violation_threshold
+
+    target_tracking 모드에서는 위반/쿨다운 판단은 같고, 증감량만 메트릭/목표 비율로 계산
+    """
+
+    name = 'threshold'
+    combine = 'or'             # 'or': 응답시간 또는 CPU 초과 / 'and': 둘 다 초과
+    scale_down_response = 0.15
+    scale_down_cpu = 20
+    spike_increment = 1        # 급증 패턴 + CPU 80% 초과시 증가량
+    target_fraction = 0.7      # 목표 추적 모드의 목표값 = 임계값 x 0.7 (스케일링 후 여유분)
+
+    def __init__(self, scale_up_cooldown: float, scale_down_cooldown: float, target_tracking: bool = False,
+                 max_step_up: int = 4, max_step_down: int = 2, scale_down_damping: float = 0.5):
+        """
+        Args:
+            target_tracking: True면 고정 +1/+2 대신 메트릭/목표 비율로 필요한 태스크 수를 한 번에 계산
+            max_step_up, max_step_down: 목표 추적 모드 1회 최대 증감량
+            scale_down_damping: 목표 추적 모드 축소시 차이 중 반영할 비율
+        """
+        self.scale_up_cooldown = scale_up_cooldown
+        self.scale_down_cooldown = scale_down_cooldown
+        self.target_tracking = target_tracking
+        self.max_step_up = max_step_up
+        self.max_step_down = max_step_down
+        self.scale_down_damping = scale_down_damping
+
+    def load_ratio(self, config: Dict, state: Dict) -> float:
+        """응답시간/CPU 중 목표 대비 더 높은 비율"""
+        return max(state['response_time'] / (config['response_time_threshold'] * self.target_fraction),
+                   state['cpu'] / (state['cpu_threshold'] * self.target_fraction))
+
+    def tracking_count(self, config: Dict, state: Dict) -> int:
+        return target_tracking_count(
+            state['current_tasks'], self.load_ratio(config, state), config['min_tasks'], config['max_tasks'],
+            self.max_step_up, self.max_step_down, self.scale_down_damping
+        )
+
+    def decide(self, config: Dict, state: Dict) -> Dict:
+        """
+        단건 결정 (입력 상태를 변경하지 않음)
+
+        Returns:
+            {'new_count': 새 태스크 수 또는 None, 'reason': 사유, 'stage': 단계,
+             'violation_count': 갱신된 위반 카운트, 'cooldown_remaining': 남은 쿨다운(초)}
+            stage: 'scale_up' | 'cooldown' | 'at_max' | 'violation' | 'scale_down' | None
+        """
+        current_tasks = state['current_tasks']
+        cpu = state['cpu']
+        response_time = state['response_time']
+        elapsed = state['now'] - state['last_scale_time']
+        violation_count = state['violation_count']
+
+        response_exceeded = response_time > config['response_time_threshold']
+        cpu_exceeded = cpu > state['cpu_threshold']
+        if self.combine == 'and':
+            exceeded = response_exceeded and cpu_exceeded
+        else:
+            exceeded = response_exceeded or cpu_exceeded
+
+        decision = {'new_count': None, 'reason': None, 'stage': None,
+                    'violation_count': violation_count, 'cooldown_remaining': 0}
+
+        if exceeded:
+            violation_count += 1
+            decision['violation_count'] = violation_count
+            decision['stage'] = 'violation'
+            if violation_count < config['violation_threshold']:
+                return decision
+
+            cooldown_remaining = self.scale_up_cooldown - elapsed
+            if cooldown_remaining > 0:
+                decision['stage'] = 'cooldown'
+                decision['cooldown_remaining'] = cooldown_remaining
+                return decision
+
+            if self.target_tracking:
+                new_count = max(self.tracking_count(config, state), min(current_tasks + 1, config['max_tasks']))
+            else:
+                increment = self.spike_increment if state.get('spike') and cpu > 80 else 1
+                new_count = min(current_tasks + increment, config['max_tasks'])
+            if new_count > current_tasks:
+                decision.update(new_count=new_count, stage='scale_up', violation_count=0,
+                                reason=self.scale_up_reason(config, state))
+            else:
+                decision['stage'] = 'at_max'
+            return decision
+
+        decision['violation_count'] = 0
+        if (response_time < self.scale_down_response and
+                cpu < self.scale_down_cpu and
+                current_tasks > config['min_tasks'] and
+                elapsed > self.scale_down_cooldown):
+            new_count = self.tracking_count(config, state) if self.target_tracking else current_tasks - 1
+            new_count = max(config['min_tasks'], new_count)
+            if new_count < current_tasks:
+                decision.update(new_count=new_count, stage='scale_down',
+                                reason=self.scale_down_reason(config, state))
+        return decision
+
+    def scale_up_reason(self, config: Dict, state: Dict) -> str:
+        return "high load"
+
+    def scale_down_reason(self, config: Dict, state: Dict) -> str:
+        return "low load"
+
+    def decide_batch(self, config: Dict, state: Dict) -> Dict:
+        """
+        배치 결정 - 모든 입력은 같은 길이의 배열 또는 스칼라
+
+        서비스/파라미터 조합 축은 벡터화하고, 시간 축은 violation_count/last_scale_time이
+        이전 결정에 의존하므로 호출자가 반복하면서 반환된 상태를 다음 스텝에 넘긴다.
+
+        Returns:
+            {'new_count': 배열(변경 없으면 current_tasks), 'scale_up': bool, 'scale_down': bool,
+             'violation_count': 배열}
+        """
+        require_numpy()
+        current_tasks = np.asarray(state['current_tasks'])
+        cpu = np.asarray(state['cpu'], dtype=float)
+        response_time = np.asarray(state['response_time'], dtype=float)
+        violation_count = np.asarray(state['violation_count'])
+        elapsed = np.asarray(state['now'], dtype=float) - np.asarray(state['last_scale_time'], dtype=float)
+        min_tasks = np.asarray(config['min_tasks'])
+        max_tasks = np.asarray(config['max_tasks'])
+
+        response_exceeded = response_time > np.asarray(config['response_time_threshold'])
+        cpu_exceeded = cpu > np.asarray(state['cpu_threshold'])
+        if self.combine == 'and':
+            exceeded = response_exceeded & cpu_exceeded
+        else:
+            exceeded = response_exceeded | cpu_exceeded
+
+        counted = np.where(exceeded, violation_count + 1, 0)
+        if self.target_tracking:
+            ratio = np.maximum(
+                response_time / (np.asarray(config['response_time_threshold']) * self.target_fraction),
+                cpu / (np.asarray(state['cpu_threshold']) * self.target_fraction)
+            )
+            desired = np.ceil(current_tasks * ratio).astype(int)
+            step_down = np.minimum(self.max_step_down,
+                                   np.ceil((current_tasks - desired) * self.scale_down_damping).astype(int))
+            tracked = np.where(desired > current_tasks, np.minimum(desired, current_tasks + self.max_step_up),
+                               np.where(desired < current_tasks, current_tasks - step_down, current_tasks))
+            tracked = np.clip(tracked, min_tasks, max_tasks)
+            up_target = np.maximum(tracked, np.minimum(current_tasks + 1, max_tasks))
+            down_target = np.maximum(min_tasks, tracked)
+        else:
+            spike = np.asarray(state.get('spike', False))
+            increment = np.where(spike & (cpu > 80), self.spike_increment, 1)
+            up_target = np.minimum(current_tasks + increment, max_tasks)
+            down_target = np.maximum(min_tasks, current_tasks - 1)
+        scale_up = (exceeded & (counted >= np.asarray(config['violation_threshold'])) &
+                    (elapsed >= self.scale_up_cooldown) & (up_target > current_tasks))
+
+        scale_down = (~exceeded & (response_time < self.scale_down_response) &
+                      (cpu < self.scale_down_cpu) & (current_tasks > min_tasks) &
+                      (elapsed > self.scale_down_cooldown) & (down_target < current_tasks))
+
+        new_count = np.where(scale_up, up_target, np.where(scale_down, down_target, current_tasks))
+        return {
+            'new_count': new_count,
+            'scale_up': scale_up,
+            'scale_down': scale_down,
+            'violation_count': np.where(scale_up, 0, counted)
+        }
+
+
+class SmartTrafficPolicy(ThresholdPolicy):
+    """SmartTrafficAutoscaler 정책 - 응답시간 OR CPU, 급증 패턴이면 2개씩 증가"""
+
+    name = 'smart'
+    combine = 'or'
+    scale_down_response = 0.15
+    scale_down_cpu = 20
+    spike_increment = 2
+
+    def scale_up_reason(self, config: Dict, state: Dict) -> str:
+        return f"high load ({state.get('pattern', 'unknown')})"
+
+
+class DualMetricPolicy(ThresholdPolicy):
+    """DualMetricAutoscaler 정책 - 응답시간 AND CPU, 항상 1개씩 증가"""
+
+    name = 'dual'
+    combine = 'and'
+    scale_down_response = 0.2
+    scale_down_cpu = 30
+    spike_increment = 1
+
+    def scale_up_reason(self, config: Dict, state: Dict) -> str:
+        return (f"응답시간 {state['response_time']:.3f}s > {config['response_time_threshold']}s & "
+                f"CPU {state['cpu']:.1f}% > {state['cpu_threshold']}%")
+
+    def scale_down_reason(self, config: Dict, state: Dict) -> str:
+        return f"리소스 여유 (응답시간: {state['response_time']:.3f}s, CPU: {state['cpu']:.1f}%)"
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+선언형 서비스 레지스트리
+클러스터별 서비스/로그 그룹/임계값을 설정 파일(JSON 또는 YAML)과 ECS 태그 검색(list_services)으로 구성하고
+서비스 이름의 안정적인 해시로 워커(샤드)마다 나눠 맡김
+
+설정 병합 순서 (뒤가 우선):
+    defaults → defaults[스케일러] → 서비스 → 서비스[스케일러]
+태그 검색은 discover.tag=discover.value 태그가 붙은 서비스를 찾고, 'autoscale:<필드>' 태그로 값을 덮어씀
+"""
+
+import argparse
+import json
+import math
+import os
+import zlib
+from typing import Dict, List, Optional
+
+from ecs_snapshot import MAX_SERVICES_PER_REQUEST
+from logs_insights import MAX_LOG_GROUPS_PER_QUERY
+from metric_collector import MAX_QUERIES_PER_REQUEST, SERVICE_METRICS
+
+try:
+    import yaml
+except ImportError:  # YAML 설정을 쓸 때만 필요
+    yaml = None
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'services.json')
+SCALERS = ('smart', 'dual')
+OVERRIDE_TAG_PREFIX = 'autoscale:'
+
+# list_services 페이지 크기
+LIST_PAGE_SIZE = 100
+
+
+def load_config(path: Optional[str] = None) -> Dict:
+    """설정 파일 로드 (.yaml/.yml이면 PyYAML 필요)"""
+    path = path or DEFAULT_CONFIG_PATH
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith(('.yaml', '.yml')):
+            if yaml is None:
+                raise RuntimeError(f"YAML 설정({path})을 읽으려면 PyYAML이 필요합니다 (pip install pyyaml)")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def merge_service(defaults: Dict, service: Dict, scaler: str) -> Dict:
+    """defaults와 서비스 설정을 스케일러 기준으로 병합 (다른 스케일러 전용 키는 제외)"""
+    merged = {}
+    for layer in (defaults, defaults.get(scaler, {}), service, service.get(scaler, {})):
+        merged.update({key: value for key, value in layer.items() if key not in SCALERS})
+    return merged
+
+
+def default_log_group(service_name: str) -> str:
+    """로그 그룹 관례: product-svc → /ecs/logs/product"""
+    base = service_name[:-len('-svc')] if service_name.endswith('-svc') else service_name
+    return f"/ecs/logs/{base}"
+
+
+def parse_tag_value(value: str):
+    """태그 값은 문자열뿐이므로 숫자로 보이면 숫자로 변환"""
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            continue
+    return value
+
+
+def shard_of(cluster_name: str, service_name: str, shard_count: int) -> int:
+    """서비스가 속한 샤드 번호 (프로세스/재시작과 무관하게 안정적인 crc32 해시)"""
+    if shard_count <= 1:
+        return 0
+    return zlib.crc32(f"{cluster_name}/{service_name}".encode()) % shard_count
+
+
+def tick_api_calls(service_count: int, log_queries: bool = True) -> int:
+    """
+    평가 틱 1회의 예상 API 호출 수 (일괄 호출 단위로 계산하므로 서비스 수에 대해 준선형)
+
+    DescribeServices 10개 단위 + GetMetricData 500쿼리 단위 + Logs Insights 50그룹 단위(쿼리 시작/결과 조회)
+    """
+    if service_count <= 0:
+        return 1
+    calls = math.ceil(service_count / MAX_SERVICES_PER_REQUEST)
+    calls += math.ceil(service_count * len(SERVICE_METRICS) / MAX_QUERIES_PER_REQUEST)
+    if log_queries:
+        calls += 2 * math.ceil(service_count / MAX_LOG_GROUPS_PER_QUERY)
+    return calls
+
+
+def tick_budget(calls_per_tick: int, tick_interval: float, minimum: float = 60) -> float:
+    """
+    분당 API 호출 예산 (AdaptivePollScheduler calls_per_minute)
+
+    기본 60회지만 샤드의 서비스가 많아 틱당 호출 수가 커지면 기본 주기(tick_interval)마다
+    1틱은 돌 수 있게 늘림 - 예산이 틱 비용보다 작으면 평가가 멈춤
+    """
+    return max(minimum, calls_per_tick * 60 / tick_interval)
+
+
+def discover_services(ecs, cluster_name: str, tag_key: str, tag_value: Optional[str] = None) -> Dict[str, Dict]:
+    """
+    ECS 태그로 오토스케일링 대상 서비스 검색
+
+    list_services(페이지당 100개)와 describe_services(include=TAGS, 10개 단위)만 사용하므로
+    서비스 수가 늘어도 호출 수는 1/10 비율로 증가
+
+    Returns:
+        {서비스 이름: 태그에서 읽은 설정}
+    """
+    arns = []
+    params = {'cluster': cluster_name, 'maxResults': LIST_PAGE_SIZE}
+    while True:
+        response = ecs.list_services(**params)
+        arns.extend(response['serviceArns'])
+        if not response.get('nextToken'):
+            break
+        params['nextToken'] = response['nextToken']
+
+    services = {}
+    for offset in range(0, len(arns), MAX_SERVICES_PER_REQUEST):
+        response = ecs.describe_services(
+            cluster=cluster_name,
+            services=arns[offset:offset + MAX_SERVICES_PER_REQUEST],
+            include=['TAGS']
+        )
+        for service in response['services']:
+            tags = {tag['key']: tag['value'] for tag in service.get('tags', [])}
+            if tag_key not in tags or (tag_value is not None and tags[tag_key] != tag_value):
+                continue
+            overrides = {
+                key[len(OVERRIDE_TAG_PREFIX):]: parse_tag_value(value)
+                for key, value in tags.items() if key.startswith(OVERRIDE_TAG_PREFIX)
+            }
+            services[service['serviceName']] = overrides
+    return services
+
+
+class ServiceRegistry:
+    def __init__(self, config: Optional[Dict] = None, config_path: Optional[str] = None):
+        """
+        레지스트리 초기화
+
+        Args:
+            config: 설정 딕셔너리 (없으면 config_path 또는 기본 services.json 로드)
+            config_path: 설정 파일 경로
+        """
+        self.config = config if config is not None else load_config(config_path)
+        self.defaults = self.config.get('defaults', {})
+        self.cluster_configs = self.config.get('clusters', {})
+
+    def clusters(self) -> List[str]:
+        return list(self.cluster_configs.keys())
+
+    def cluster(self, cluster_name: str) -> Dict:
+        """클러스터 설정 (asg, alb 등) - 설정에 없는 클러스터는 빈 딕셔너리"""
+        return self.cluster_configs.get(cluster_name, {})
+
+    def service_entries(self, cluster_name: str, ecs=None) -> Dict[str, Dict]:
+        """
+        클러스터의 전체 서비스 원본 설정 (정적 설정 + 태그 검색 결과)
+
+        같은 서비스가 둘 다에 있으면 정적 설정 위에 태그 값을 덮어씀
+        """
+        cluster_config = self.cluster(cluster_name)
+        entries = {name: dict(entry) for name, entry in cluster_config.get('services', {}).items()}
+
+        discover = cluster_config.get('discover')
+        if discover and ecs is not None:
+            try:
+                found = discover_services(ecs, cluster_name, discover['tag'], discover.get('value'))
+            except Exception as e:
+                print(f"⚠️ {cluster_name} 서비스 태그 검색 실패 (정적 설정만 사용): {e}", flush=True)
+                found = {}
+            for name, overrides in found.items():
+                entry = entries.setdefault(name, {})
+                entry.update(overrides)
+        return entries
+
+    def services(self, cluster_name: str, scaler: str, shard_index: int = 0, shard_count: int = 1,
+                 ecs=None) -> Dict[str, Dict]:
+        """
+        스케일러가 사용할 서비스 설정 (이 샤드 몫만)
+
+        Args:
+            cluster_name: ECS 클러스터 이름
+            scaler: 'smart' | 'dual'
+            shard_index, shard_count: 워커 샤드 번호/전체 샤드 수
+            ecs: 태그 검색용 ECS 클라이언트 (없으면 정적 설정만)
+
+        Returns:
+            {서비스 이름: 병합된 설정} (log_group이 없으면 관례에 따라 채움)
+        """
+        services = {}
+        for name, entry in sorted(self.service_entries(cluster_name, ecs).items()):
+            if shard_of(cluster_name, name, shard_count) != shard_index:
+                continue
+            config = merge_service(self.defaults, entry, scaler)
+            config.setdefault('log_group', default_log_group(name))
+            services[name] = config
+        return services
+
+
+def parse_worker_args(description: str, argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    오토스케일러 워커 공용 인자 (클러스터/샤드/워커 번호)
+
+    Returns:
+        config, cluster, shard_index, shard_count, worker_index, workers, lease_table, trigger_port, trigger_host, trigger_token,
+        target_tracking
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--config', help='서비스 레지스트리 설정 파일 (기본값: services.json)')
+    parser.add_argument('--cluster', default='apdev-ecs-cluster', help='ECS 클러스터 이름')
+    parser.add_argument('--shard', default='0/1', help='이 워커가 맡을 샤드 (번호/클러스터당 샤드 수, 예: 1/4)')
+    parser.add_argument('--worker-index', type=int, default=0,
+                        help='전체 워커 중 이 워커 번호 (트리거/메트릭 포트 = 기본 포트 + 10 x 번호)')
+    parser.add_argument('--workers', type=int, default=1, help='같은 계정에서 실행 중인 전체 워커 수 (API 한도 분배)')
+    parser.add_argument('--lease-table', help='리더 선출용 DynamoDB 테이블 (지정시 같은 샤드의 복제본 중 1개만 스케일링)')
+    parser.add_argument('--trigger-port', type=int,
+                        help='알람/SNS 푸시 트리거 기본 포트 (지정시에만 활성화, 이중 메트릭은 +1 / 미지정시 폴링만 사용)')
+    parser.add_argument('--trigger-host', default='127.0.0.1',
+                        help='트리거 바인딩 주소 (기본값: 로컬 전용, 그 외 주소는 TRIGGER_TOKEN 필수)')
+    parser.add_argument('--trigger-token', default=os.environ.get('TRIGGER_TOKEN'),
+                        help='트리거 공유 비밀 (기본값: 환경변수 TRIGGER_TOKEN, SNS 구독 URL에 ?token=...으로 포함)')
+    parser.add_argument('--target-tracking', action='store_true',
+                        help='고정 증감 대신 목표 추적(메트릭/목표 비율) 스텝 사용')
+    args = parser.parse_args(argv)
+
+    args.shard_index, args.shard_count = (int(part) for part in args.shard.split('/'))
+    if not 0 <= args.shard_index < args.shard_count:
+        parser.error(f"잘못된 샤드: {args.shard}")
+    return args
+
+
+def main():
+    parser = argparse.ArgumentParser(description='서비스 레지스트리 확인 (클러스터/샤드별 서비스 배치)')
+    parser.add_argument('--config', help='설정 파일 (기본값: services.json)')
+    parser.add_argument('--scaler', choices=SCALERS, default='smart')
+    parser.add_argument('--shards', type=int, default=1, help='클러스터당 워커 수')
+    parser.add_argument('--clusters', action='store_true', help='클러스터 이름만 한 줄씩 출력 (스크립트용)')
+    args = parser.parse_args()
+
+    registry = ServiceRegistry(config_path=args.config)
+    if args.clusters:
+        print("\n".join(registry.clusters()))
+        return
+
+    for cluster_name in registry.clusters():
+        print(f"📦 {cluster_name}")
+        for shard_index in range(args.shards):
+            services = registry.services(cluster_name, args.scaler, shard_index, args.shards)
+            print(f"  샤드 {shard_index}: {len(services)}개 - {', '.join(services)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+오토스케일러 웜 스타트 상태 저장
+서비스별 트래픽 히스토리(시각/CPU/응답시간)와 쿨다운/위반 카운트를 작은 바이너리 파일로 주기적으로 저장하고
+재시작시 복원해 패턴 분석이 'unknown'으로 되돌아가거나 쿨다운이 초기화되지 않게 함
+
+파일 형식 (리틀 엔디언):
+    헤더  'ASST' 버전(H) 저장 시각(d) 서비스 수(H)
+    서비스마다  이름 길이(H) 이름(UTF-8) last_scale_time(d) violation_count(H) 패턴(B) 신뢰도(d) 샘플 수(H)
+              timestamps/cpu/response 배열 (각각 샘플 수 x double)
+    끝       본문 CRC32(I)
+쓰기는 백그라운드 스레드가 임시 파일 → fsync → os.replace로 원자적으로 교체 (중간에 죽어도 이전 파일 유지)
+"""
+
+import array
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+MAGIC = b'ASST'
+VERSION = 1
+HEADER = struct.Struct('<4sHdH')
+SERVICE = struct.Struct('<dHBdH')
+CRC = struct.Struct('<I')
+PATTERNS = ('unknown', 'gradual', 'spike')
+
+
+def doubles(values) -> bytes:
+    data = array.array('d', values)
+    if sys.byteorder != 'little':
+        data.byteswap()
+    return data.tobytes()
+
+
+def read_doubles(data: bytes, offset: int, count: int):
+    values = array.array('d')
+    values.frombytes(data[offset:offset + 8 * count])
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values.tolist(), offset + 8 * count
+
+
+def encode_state(state: Dict) -> bytes:
+    """
+    상태 딕셔너리를 바이너리로 변환
+
+    Args:
+        state: {'saved_at': 시각, 'services': {이름: {'last_scale_time', 'violation_count', 'pattern',
+                'confidence', 'timestamps', 'cpu', 'response'}}}
+    """
+    services = state['services']
+    parts = [HEADER.pack(MAGIC, VERSION, state.get('saved_at', time.time()), len(services))]
+    for name, service in services.items():
+        encoded_name = name.encode('utf-8')
+        count = min(len(service['timestamps']), len(service['cpu']), len(service['response']))
+        pattern = PATTERNS.index(service['pattern']) if service.get('pattern') in PATTERNS else 0
+        parts.append(struct.pack('<H', len(encoded_name)) + encoded_name)
+        parts.append(SERVICE.pack(service['last_scale_time'], min(service['violation_count'], 0xFFFF),
+                                  pattern, service.get('confidence', 0), count))
+        for key in ('timestamps', 'cpu', 'response'):
+            parts.append(doubles(list(service[key])[-count:] if count else []))
+    body = b''.join(parts)
+    return body + CRC.pack(zlib.crc32(body))
+
+
+def decode_state(data: bytes) -> Dict:
+    """encode_state의 역변환 (형식/CRC가 맞지 않으면 ValueError)"""
+    if len(data) < HEADER.size + CRC.size:
+        raise ValueError("상태 파일이 너무 짧음")
+    body, (crc,) = data[:-CRC.size], CRC.unpack(data[-CRC.size:])
+    if zlib.crc32(body) != crc:
+        raise ValueError("상태 파일 CRC 불일치")
+    magic, version, saved_at, service_count = HEADER.unpack_from(body, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"지원하지 않는 상태 파일 ({magic!r} v{version})")
+
+    offset = HEADER.size
+    services = {}
+    for _ in range(service_count):
+        (name_length,) = struct.unpack_from('<H', body, offset)
+        offset += 2
+        name = body[offset:offset + name_length].decode('utf-8')
+        offset += name_length
+        last_scale_time, violation_count, pattern, confidence, count = SERVICE.unpack_from(body, offset)
+        offset += SERVICE.size
+        service = {
+            'last_scale_time': last_scale_time,
+            'violation_count': violation_count,
+            'pattern': PATTERNS[pattern] if pattern < len(PATTERNS) else 'unknown',
+            'confidence': confidence
+        }
+        for key in ('timestamps', 'cpu', 'response'):
+            service[key], offset = read_doubles(body, offset, count)
+        services[name] = service
+    return {'saved_at': saved_at, 'services': services}
+
+
+def write_atomic(path: str, data: bytes):
+    """같은 디렉토리의 임시 파일에 쓰고 fsync 후 교체"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    try:
+        directory_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(directory_fd)
+        finally:
+            os.close(directory_fd)
+    except OSError:
+        pass  # 디렉토리 fsync를 지원하지 않는 파일시스템
+
+
+def load_state(path: str) -> Optional[Dict]:
+    """상태 파일 읽기 (없거나 손상되면 None)"""
+    try:
+        with open(path, 'rb') as f:
+            return decode_state(f.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, struct.error, UnicodeDecodeError) as e:
+        print(f"⚠️ 상태 파일 무시 ({path}): {e}", flush=True)
+        return None
+
+
+class StateStore:
+    def __init__(self, path: str, interval: float = 15):
+        """
+        상태 저장소 초기화 (백그라운드 쓰기 스레드 시작)
+
+        Args:
+            path: 상태 파일 경로
+            interval: 최소 저장 간격 (초) - 그 사이에 들어온 상태는 마지막 것만 저장
+        """
+        self.path = path
+        self.interval = interval
+        self.pending = None
+        self.counters = {'saved': 0, 'errors': 0}
+        self.condition = threading.Condition()
+        self.stopped = False
+        self.last_saved = 0.0
+        self.thread = threading.Thread(target=self.writer_loop, name='state-store', daemon=True)
+        self.thread.start()
+
+    def load(self) -> Optional[Dict]:
+        return load_state(self.path)
+
+    def submit(self, state: Dict):
+        """저장할 상태 등록 (대기 없음 - 디스크 쓰기는 writer 스레드)"""
+        with self.condition:
+            self.pending = state
+            self.condition.notify()
+
+    def save(self, state: Dict) -> bool:
+        try:
+            write_atomic(self.path, encode_state(state))
+            self.counters['saved'] += 1
+            return True
+        except Exception as e:
+            self.counters['errors'] += 1
+            print(f"  ⚠️ 상태 저장 실패: {e}", flush=True)
+            return False
+
+    def writer_loop(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.stopped:
+                    self.condition.wait()
+                if self.pending is None:
+                    return
+                state, self.pending = self.pending, None
+            self.save(state)
+            self.last_saved = time.monotonic()
+            # submit()의 notify로는 깨지 않고 다음 저장 시각까지 대기 (close()만 대기를 끊음)
+            with self.condition:
+                while not self.stopped:
+                    remaining = self.last_saved + self.interval - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+
+    def close(self, timeout: Optional[float] = 5):
+        """남은 상태를 저장하고 스레드 종료"""
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        self.thread.join(timeout)
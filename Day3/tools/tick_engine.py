@@ -0,0 +1,80 @@
+"""
+서비스별 병렬 틱 엔진
+장기 실행 워커 풀에서 모든 서비스를 동시에 평가하고 서비스별 데드라인을 적용
+"""
+
+import concurrent.futures
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+class TickEngine:
+    def __init__(self, max_workers: int, deadline: float = 10.0, name: str = 'tick'):
+        """
+        틱 엔진 초기화
+
+        Args:
+            max_workers: 워커 스레드 수 (보통 서비스 수)
+            deadline: 서비스별 기본 데드라인 (초)
+            name: 워커 스레드 이름 접두어
+        """
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name
+        )
+        self.deadline = deadline
+        self.in_flight = {}  # {서비스 이름: 데드라인을 넘겨 아직 실행 중인 Future}
+        self.lock = threading.Lock()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> concurrent.futures.Future:
+        """워커 풀에 작업 제출"""
+        return self.executor.submit(fn, *args, **kwargs)
+
+    def run_tick(self, jobs: Dict[str, Callable], deadlines: Optional[Dict[str, float]] = None) -> Dict[str, str]:
+        """
+        서비스별 작업을 병렬 실행하고 각 데드라인까지 대기
+
+        이전 틱에서 데드라인을 넘긴 서비스는 끝날 때까지 다시 제출하지 않으므로
+        느린 서비스가 워커를 점유해도 다른 서비스의 평가는 지연되지 않는다.
+
+        Args:
+            jobs: {서비스 이름: 인자 없는 호출 가능 객체}
+            deadlines: {서비스 이름: 데드라인(초)} (없으면 기본값)
+
+        Returns:
+            {서비스 이름: 'done' | 'error' | 'timeout' | 'busy'}
+        """
+        deadlines = deadlines or {}
+        started = time.monotonic()
+        futures = {}
+        status = {}
+
+        with self.lock:
+            for service_name, job in jobs.items():
+                running = self.in_flight.get(service_name)
+                if running is not None and not running.done():
+                    status[service_name] = 'busy'
+                    continue
+                self.in_flight.pop(service_name, None)
+                futures[service_name] = self.executor.submit(job)
+
+        # 데드라인이 짧은 서비스부터 확인
+        for service_name in sorted(futures, key=lambda name: deadlines.get(name, self.deadline)):
+            future = futures[service_name]
+            remaining = deadlines.get(service_name, self.deadline) - (time.monotonic() - started)
+            try:
+                future.result(timeout=max(0, remaining))
+                status[service_name] = 'done'
+            except concurrent.futures.TimeoutError:
+                status[service_name] = 'timeout'
+                with self.lock:
+                    self.in_flight[service_name] = future
+            except Exception as e:
+                print(f"  {service_name}: 오류 - {e}", flush=True)
+                status[service_name] = 'error'
+
+        return status
+
+    def shutdown(self):
+        """워커 풀 종료 (실행 중인 작업은 기다리지 않음)"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,88 @@
+"""
+요청 수 단기 예측
+ALB RequestCount 시계열에 Holt 선형 지수평활(레벨 + 추세)을 적용해 몇 분 뒤 부하를 예측하고
+1스텝 예측 오차(MAE/MAPE)를 기록
+"""
+
+import math
+from typing import Dict, Optional
+
+
+class HoltForecaster:
+    def __init__(self, alpha: float = 0.5, beta: float = 0.3):
+        """
+        Holt 선형 예측기 초기화
+
+        Args:
+            alpha: 레벨 평활 계수 (클수록 최근 값에 민감)
+            beta: 추세 평활 계수
+        """
+        self.alpha = alpha
+        self.beta = beta
+        self.level = None
+        self.trend = 0.0
+        self.samples = 0
+        # 1스텝 예측 오차 누적
+        self.abs_error_sum = 0.0
+        self.pct_error_sum = 0.0
+        self.pct_error_count = 0
+        self.error_count = 0
+        self.last_error = None
+
+    def update(self, value: float):
+        """새 관측값 반영 (직전 1스텝 예측과 비교해 오차 기록)"""
+        if self.level is None:
+            self.level = value
+            self.samples = 1
+            return
+
+        predicted = self.forecast(1)
+        error = value - predicted
+        self.last_error = error
+        self.abs_error_sum += abs(error)
+        self.error_count += 1
+        if value > 0:
+            self.pct_error_sum += abs(error) / value
+            self.pct_error_count += 1
+
+        previous_level = self.level
+        self.level = self.alpha * value + (1 - self.alpha) * (self.level + self.trend)
+        if self.samples == 1:
+            self.trend = self.level - previous_level
+        else:
+            self.trend = self.beta * (self.level - previous_level) + (1 - self.beta) * self.trend
+        self.samples += 1
+
+    def forecast(self, steps: int = 1) -> float:
+        """steps 스텝 뒤 예측값 (0 미만은 0)"""
+        if self.level is None:
+            return 0.0
+        return max(0.0, self.level + steps * self.trend)
+
+    def error_stats(self) -> Dict[str, Optional[float]]:
+        """1스텝 예측 오차 (MAE, MAPE %)"""
+        return {
+            'mae': self.abs_error_sum / self.error_count if self.error_count else None,
+            'mape': self.pct_error_sum / self.pct_error_count * 100 if self.pct_error_count else None,
+            'samples': self.error_count
+        }
+
+
+def prescale_target(current_tasks: int, cpu_utilization: float, current_requests: float,
+                    forecast_requests: float, cpu_target: float, max_tasks: int) -> Optional[int]:
+    """
+    예측 요청 수로 필요한 태스크 수 계산
+
+    태스크당 CPU가 요청 수에 비례한다고 보고, 현재 태스크 수에서의 예측 CPU가
+    목표를 넘으면 목표 이하가 되는 태스크 수를 반환 (필요 없으면 None)
+    """
+    if current_requests <= 0 or cpu_utilization <= 0 or forecast_requests <= current_requests:
+        return None
+
+    predicted_cpu = cpu_utilization * forecast_requests / current_requests
+    if predicted_cpu <= cpu_target:
+        return None
+
+    desired = math.ceil(current_tasks * predicted_cpu / cpu_target)
+    desired = min(desired, max_tasks)
+    return desired if desired > current_tasks else None
@@ -297,16 +297,18 @@ AWS ALB 트래픽 패턴 분석 툴 - 디버그 버전
 apdev-alb의 product-tg, stress-tg, user-tg 타겟 그룹에서 request count를 모니터링
 """
 
-import boto3
 import time
 from datetime import datetime, timedelta
 import pytz
-from collections import defaultdict, deque
-import statistics
+from collections import defaultdict
 import json
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import argparse
 import sys
+from traffic_forecast import HoltForecaster
+from ring_buffer import TimeSeriesRing
+from change_point import ChangePointDetector
+from aws_client import MetricUnavailable, api_client
 
 class TrafficPatternAnalyzer:
     def __init__(self, load_balancer_name: str, region: str = 'ap-northeast-2'):
@@ -324,8 +326,8 @@ class TrafficPatternAnalyzer:
         
         # AWS 클라이언트 초기화
         try:
-            self.cloudwatch = boto3.client('cloudwatch', region_name=region)
-            self.elbv2 = boto3.client('elbv2', region_name=region)
+            self.cloudwatch = api_client('cloudwatch', region_name=region)
+            self.elbv2 = api_client('elbv2', region_name=region)
         except Exception as e:
             print(f"❌ AWS 클라이언트 초기화 실패: {e}")
             sys.exit(1)
@@ -334,15 +336,24 @@ class TrafficPatternAnalyzer:
         self.kst = pytz.timezone('Asia/Seoul')
         
         # 데이터 저장용
-        self.traffic_data = defaultdict(deque)
+        # 타겟 그룹별 요청 수 / 변화율(%) 링 버퍼 - 평균/최소/최대는 샘플마다 O(1) 갱신
         self.history_length = 60
+        self.sustained_window = 5
+        self.traffic_data = defaultdict(lambda: TimeSeriesRing(self.history_length))
+        self.change_history = defaultdict(lambda: TimeSeriesRing(self.sustained_window))
         self.previous_values = {}
         self.pattern_thresholds = {
-            'spike': 30,
-            'drop': -25,
             'high_traffic': 50,
         }
         
+        # 요청 수 수준 변화 감지 (CUSUM, 포아송 잡음 하한) - SPIKE/DROP은 직전 값 대비 %가 아니라 지속된 변화만
+        # 오토스케일러 등 외부에서도 change_detector.subscribe()로 이벤트를 받을 수 있음
+        self.change_detector = ChangePointDetector('requests', count_data=True)
+        
+        # 요청 수 단기 예측 (Holt 선형 지수평활, 분석 주기 단위)
+        self.forecasters = defaultdict(HoltForecaster)
+        self.forecast_horizon = 3
+        
         # ALB와 타겟 그룹 정보 초기화
         self.alb_arn = None
         self.target_group_arns = {}
@@ -534,8 +545,8 @@ class TrafficPatternAnalyzer:
             print(f"❌ CloudWatch 쿼리 디버그 실패: {e}")
             return None
     
-    def get_target_group_metrics(self, target_group: str, period_minutes: int = 5) -> float:
-        """특정 타겟 그룹의 RequestCount 메트릭 가져오기"""
+    def get_target_group_metrics(self, target_group: str, period_minutes: int = 5) -> Optional[float]:
+        """특정 타겟 그룹의 RequestCount 메트릭 가져오기 (스로틀링 등으로 조회 불가면 None)"""
         try:
             alb_dim, tg_dim = self.get_correct_dimension_values(target_group)
             
@@ -566,11 +577,14 @@ class TrafficPatternAnalyzer:
                 latest = max(response['Datapoints'], key=lambda x: x['Timestamp'])
                 return latest['Sum']
             else:
-                return 0.0
+                return 0.0  # 요청이 없는 구간은 ALB가 RequestCount를 기록하지 않음
                 
+        except MetricUnavailable as e:
+            print(f"⚠️  {target_group} 메트릭 조회 불가: {e}")
+            return None
         except Exception as e:
             print(f"⚠️  {target_group} 메트릭 가져오기 실패: {e}")
-            return 0.0
+            return None
     
     def analyze_pattern(self, target_group: str, current_value: float) -> Dict:
         """트래픽 패턴 분석"""
@@ -586,40 +600,44 @@ class TrafficPatternAnalyzer:
         if target_group in self.previous_values:
             prev_value = self.previous_values[target_group]
             if prev_value > 0:
-                change_percent = ((current_value - prev_value) / prev_value) * 100
-                analysis['change_percent'] = change_percent
-                
-                if change_percent >= self.pattern_thresholds['spike']:
-                    analysis['patterns'].append('SPIKE')
-                    analysis['trend'] = 'increasing'
-                elif change_percent <= self.pattern_thresholds['drop']:
-                    analysis['patterns'].append('DROP')
-                    analysis['trend'] = 'decreasing'
-                elif change_percent > 10:
-                    analysis['trend'] = 'increasing'
-                elif change_percent < -10:
-                    analysis['trend'] = 'decreasing'
+                analysis['change_percent'] = ((current_value - prev_value) / prev_value) * 100
+        
+        timestamp = analysis['timestamp'].timestamp()
+        level_shift = self.change_detector.update(target_group, timestamp, current_value)
+        if level_shift:
+            analysis['level_shift'] = level_shift
+            if level_shift['direction'] == 'up':
+                analysis['patterns'].append('SPIKE')
+                analysis['trend'] = 'increasing'
+            else:
+                analysis['patterns'].append('DROP')
+                analysis['trend'] = 'decreasing'
+        else:
+            # 감지 전이지만 누적합이 쌓이는 중인 방향
+            drift = self.change_detector.trend(target_group)
+            if drift:
+                analysis['trend'] = 'increasing' if drift == 'up' else 'decreasing'
         
         if current_value >= self.pattern_thresholds['high_traffic']:
             analysis['patterns'].append('HIGH_TRAFFIC')
         
-        self.traffic_data[target_group].append({
-            'timestamp': analysis['timestamp'],
-            'value': current_value,
-            'change_percent': analysis['change_percent']
-        })
-        
-        if len(self.traffic_data[target_group]) > self.history_length:
-            self.traffic_data[target_group].popleft()
+        self.traffic_data[target_group].append(timestamp, current_value)
+        self.change_history[target_group].append(timestamp, analysis['change_percent'])
         
         if len(self.traffic_data[target_group]) >= 10:
-            avg_change = statistics.mean([item['change_percent'] for item in list(self.traffic_data[target_group])[-5:]])
+            avg_change = self.change_history[target_group].mean
             
             if avg_change > 10:
                 analysis['patterns'].append('SUSTAINED_INCREASE')
             elif avg_change < -10:
                 analysis['patterns'].append('SUSTAINED_DECREASE')
         
+        # 단기 예측 및 1스텝 예측 오차
+        forecaster = self.forecasters[target_group]
+        forecaster.update(current_value)
+        analysis['forecast'] = forecaster.forecast(self.forecast_horizon)
+        analysis['forecast_error'] = forecaster.error_stats()
+        
         self.previous_values[target_group] = current_value
         return analysis
     
@@ -650,6 +668,16 @@ class TrafficPatternAnalyzer:
             pattern_str = ' '.join([f"{pattern_emojis.get(p, '⚪')} {p}" for p in patterns])
             output += f" {pattern_str}"
         
+        if 'level_shift' in analysis:
+            level_shift = analysis['level_shift']
+            output += (f" [{level_shift['before']:.1f} → {level_shift['after']:.1f}, 지연 {level_shift['latency']:.0f}초,"
+                       f" 신뢰도 {level_shift['confidence']:.0%}]")
+        
+        if 'forecast' in analysis:
+            mape = analysis['forecast_error']['mape']
+            mape_str = f", MAPE {mape:.0f}%" if mape is not None else ""
+            output += f" | 🔮 +{self.forecast_horizon}: {analysis['forecast']:.1f}{mape_str}"
+        
         return output
     
     def run_debug_mode(self):
@@ -676,6 +704,9 @@ class TrafficPatternAnalyzer:
                 
                 for target_group in self.target_groups:
                     request_count = self.get_target_group_metrics(target_group, self.period_minutes)
+                    if request_count is None:
+                        print(f"📭 {target_group}: 지표 없음 (조회 불가)")
+                        continue
                     analysis = self.analyze_pattern(target_group, request_count)
                     print(self.format_analysis_output(analysis))
                 
@@ -699,17 +730,21 @@ class TrafficPatternAnalyzer:
         
         for target_group in self.target_groups:
             if target_group in self.traffic_data:
-                data = list(self.traffic_data[target_group])
-                if data:
-                    values = [item['value'] for item in data]
-                    avg_value = statistics.mean(values)
-                    max_value = max(values)
-                    min_value = min(values)
+                history = self.traffic_data[target_group]
+                if history.count:
+                    avg_value = history.mean
+                    max_value = history.maximum
+                    min_value = history.minimum
                     
                     print(f"\n🎯 {target_group}:")
                     print(f"   평균: {avg_value:.1f} requests")
                     print(f"   최대: {max_value:.1f} requests")
                     print(f"   최소: {min_value:.1f} requests")
+                    
+                    error = self.forecasters[target_group].error_stats()
+                    if error['mae'] is not None:
+                        mape_str = f", MAPE {error['mape']:.1f}%" if error['mape'] is not None else ""
+                        print(f"   예측 오차: MAE {error['mae']:.1f} requests{mape_str} ({error['samples']}회)")
 
 def main():
     parser = argparse.ArgumentParser(description='AWS ALB 트래픽 패턴 분석 툴')
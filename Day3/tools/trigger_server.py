@@ -0,0 +1,219 @@
+"""
+푸시 트리거 엔드포인트
+CloudWatch 알람 / SNS 알림 JSON을 로컬 HTTP로 받아 해당 서비스를 즉시 평가하도록 오토스케일러 루프를 깨움
+(정해진 주기의 폴링은 느린 안전망으로만 사용)
+
+인증: token을 지정하면 모든 요청에 ?token=... 쿼리 또는 X-Trigger-Token 헤더가 필요
+(SNS 구독 엔드포인트 URL에 ?token=...을 붙이면 SNS 요청에도 그대로 포함됨)
+로컬(127.0.0.1) 외 주소로 바인딩하려면 token 필수, SNS 구독 확인 URL은 sns.<리전>.amazonaws.com만 호출
+"""
+
+import hmac
+import ipaddress
+import json
+import re
+import threading
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set
+
+
+# SNS 구독 확인 URL로 허용하는 호스트 (임의 URL 호출 방지)
+SNS_HOST = re.compile(r'^sns\.[a-z0-9-]+\.amazonaws\.com(\.cn)?$')
+
+
+def is_sns_url(url: str) -> bool:
+    """https://sns.<리전>.amazonaws.com/... 형식인지"""
+    try:
+        parsed = urllib.parse.urlsplit(url)
+    except ValueError:
+        return False
+    return parsed.scheme == 'https' and bool(SNS_HOST.match(parsed.hostname or '')) and parsed.port in (None, 443)
+
+
+def is_loopback(host: str) -> bool:
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return host == 'localhost'
+
+
+def alarm_service_names(alarm: Dict) -> List[str]:
+    """CloudWatch 알람 메시지(SNS 형식 또는 EventBridge detail)에서 ServiceName 디멘션 추출"""
+    names = []
+    # SNS 알람 메시지: Trigger.Dimensions = [{'name': 'ServiceName', 'value': ...}]
+    trigger = alarm.get('Trigger', {})
+    for dimension in trigger.get('Dimensions', []):
+        if dimension.get('name') == 'ServiceName':
+            names.append(dimension.get('value'))
+    for metric in trigger.get('Metrics', []):
+        for dimension in metric.get('MetricStat', {}).get('Metric', {}).get('Dimensions', []):
+            if dimension.get('name') == 'ServiceName':
+                names.append(dimension.get('value'))
+
+    # EventBridge 알람 상태 변경: configuration.metrics[].metricStat.metric.dimensions = {'ServiceName': ...}
+    for metric in alarm.get('configuration', {}).get('metrics', []):
+        dimensions = metric.get('metricStat', {}).get('metric', {}).get('dimensions', {})
+        if 'ServiceName' in dimensions:
+            names.append(dimensions['ServiceName'])
+    return [name for name in names if name]
+
+
+def parse_notification(payload: Dict) -> Dict:
+    """
+    알림 페이로드 해석
+
+    지원 형식:
+        - SNS 봉투 {'Type': 'Notification', 'Message': '<알람 JSON>'}
+        - CloudWatch 알람 메시지 {'AlarmName', 'NewStateValue', 'Trigger': {...}}
+        - EventBridge 알람 이벤트 {'detail-type': 'CloudWatch Alarm State Change', 'detail': {...}}
+        - 직접 호출 {'service': 'product-svc'} 또는 {'services': [...]}
+
+    Returns:
+        {'services': 서비스 이름 리스트 (비어 있으면 전체), 'reason': 사유,
+         'subscribe_url': SNS 구독 확인 URL 또는 None}
+    """
+    result = {'services': [], 'reason': 'push', 'subscribe_url': None}
+
+    if payload.get('Type') == 'SubscriptionConfirmation':
+        result['subscribe_url'] = payload.get('SubscribeURL')
+        return result
+
+    if payload.get('Type') == 'Notification':
+        message = payload.get('Message', '')
+        try:
+            payload = json.loads(message)
+        except (TypeError, ValueError):
+            result['reason'] = f"sns: {message[:80]}"
+            return result
+
+    if 'detail' in payload:
+        detail = payload['detail']
+        result['services'] = alarm_service_names(detail)
+        state = detail.get('state', {}).get('value', '')
+        result['reason'] = f"alarm {detail.get('alarmName', '')} {state}".strip()
+    elif 'AlarmName' in payload:
+        result['services'] = alarm_service_names(payload)
+        result['reason'] = f"alarm {payload['AlarmName']} {payload.get('NewStateValue', '')}".strip()
+    else:
+        services = payload.get('services') or [payload.get('service')]
+        result['services'] = [name for name in services if name]
+        result['reason'] = payload.get('reason', 'push')
+    return result
+
+
+class TriggerServer:
+    def __init__(self, host: str = '127.0.0.1', port: int = 8089, known_services: Optional[List[str]] = None,
+                 token: Optional[str] = None):
+        """
+        트리거 서버 초기화
+
+        Args:
+            host, port: 바인딩 주소 (기본값: 로컬 전용)
+            known_services: 평가 대상 서비스 (알림의 서비스가 이 목록에 없으면 무시, 없으면 전체 평가)
+            token: 공유 비밀 (지정시 토큰이 없거나 다른 요청은 403, 로컬 외 주소로 바인딩하면 필수)
+
+        Raises:
+            ValueError: 로컬 외 주소인데 token이 없음
+        """
+        if not token and not is_loopback(host):
+            raise ValueError(f"트리거를 {host}에 바인딩하려면 토큰이 필요합니다 (TRIGGER_TOKEN)")
+        self.token = token
+        self.known_services = set(known_services or [])
+        self.pending = set()
+        self.reasons = []
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if not server.authorized(self.path, self.headers.get('X-Trigger-Token')):
+                    self.reply(403, {'error': 'forbidden'})
+                    return
+                length = int(self.headers.get('Content-Length', 0))
+                try:
+                    payload = json.loads(self.rfile.read(length) or b'{}')
+                    accepted = server.handle(payload)
+                except (TypeError, ValueError) as e:
+                    self.reply(400, {'error': str(e)})
+                    return
+                self.reply(202, {'services': accepted})
+
+            def reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass  # 오토스케일러 로그에 접근 로그를 섞지 않음
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.address = self.httpd.server_address
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='trigger', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        print(f"📡 트리거 엔드포인트: http://{self.address[0]}:{self.address[1]}/", flush=True)
+
+    def authorized(self, path: str, header_token: Optional[str]) -> bool:
+        if not self.token:
+            return True
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(path).query)
+        supplied = header_token or (query.get('token') or [''])[0]
+        return hmac.compare_digest(supplied.encode(), self.token.encode())
+
+    def handle(self, payload: Dict) -> List[str]:
+        """알림을 대기열에 넣고 루프를 깨움 (평가는 오토스케일러 루프에서 수행)"""
+        notification = parse_notification(payload)
+        if notification['subscribe_url']:
+            self.confirm_subscription(notification['subscribe_url'])
+            return []
+
+        services = set(notification['services'])
+        if self.known_services:
+            # 서비스 정보가 없는 알림(예: 클러스터 전체 알람)은 모든 서비스 평가
+            services = services & self.known_services if services else set(self.known_services)
+        if not services:
+            return []
+
+        with self.lock:
+            self.pending |= services
+            self.reasons.append(notification['reason'])
+        self.wake.set()
+        return sorted(services)
+
+    def confirm_subscription(self, url: str):
+        if not is_sns_url(url):
+            print(f"⚠️ SNS 구독 확인 URL이 아님 - 무시: {url[:80]}", flush=True)
+            return
+        try:
+            urllib.request.urlopen(url, timeout=5).read()
+            print("📡 SNS 구독 확인 완료", flush=True)
+        except Exception as e:
+            print(f"⚠️ SNS 구독 확인 실패: {e}", flush=True)
+
+    def wait(self, timeout: float) -> Set[str]:
+        """
+        트리거 또는 타임아웃까지 대기
+
+        Returns:
+            즉시 평가할 서비스 집합 (타임아웃이면 빈 집합)
+        """
+        self.wake.wait(timeout)
+        with self.lock:
+            self.wake.clear()
+            services, self.pending = self.pending, set()
+            reasons, self.reasons = self.reasons, []
+        if services:
+            print(f"📡 트리거 수신: {', '.join(sorted(services))} ({'; '.join(reasons)})", flush=True)
+        return services
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -3,7 +3,6 @@
 AWS WAF 로그에서 헤더 정보를 실시간으로 모니터링하고 1분 단위 통계를 생성하는 스크립트
 """
 
-import boto3
 import json
 import time
 import os
@@ -11,6 +10,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from collections import defaultdict, Counter
 import threading
+from aws_client import api_client
 
 class WAFHeaderMonitor:
     def __init__(self, region_name: str = 'us-east-1'):
@@ -20,7 +20,7 @@ class WAFHeaderMonitor:
         Args:
             region_name: AWS 리전 이름
         """
-        self.client = boto3.client('logs', region_name=region_name)
+        self.client = api_client('logs', region_name=region_name)
         self.log_group = 'aws-waf-logs-cloudwatch'
         self.log_stream = 'cloudfront_apdev-waf_0'
         self.last_timestamp = None